@@ -436,6 +436,10 @@ st.markdown("""
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data_commerce")
 
+# --- 서버 워밍업: 프로세스당 한 번 모든 탭 로더 캐시를 미리 채움 ---
+from core.warmup import warm_up
+warm_up(BASE_DIR, DATA_DIR)
+
 # --- 사이드바 네비게이션 ---
 import base64
 
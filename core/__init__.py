@@ -0,0 +1 @@
+# Olist Admin Dashboard - Shared Data Modules
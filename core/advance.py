@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+
+# ====== 선입금(Cash Advance) 견적 ======
+ELIGIBLE_TIERS = ("Tier 1", "Tier 2")
+# 티어별 월 할인율 (30일 기준, 남은 일수만큼 일할 계산)
+DEFAULT_MONTHLY_RATES = {"Tier 1": 0.0149, "Tier 2": 0.0199}
+DEFAULT_ADVANCE_RATIO = 1.0   # 미지급 정산금 중 선입금해 주는 비율
+
+QUOTE_COLUMNS = [
+    'seller_id', 'tier', 'receivable', 'installments', 'avg_days',
+    'monthly_rate', 'gross_amount', 'discount_cost', 'advance_amount', 'effective_rate',
+]
+
+
+def tier_key(tier):
+    """'Tier 1 (Top 1%)' 같은 티어 라벨에서 요율표 키('Tier 1')를 찾습니다."""
+    return next((key for key in ELIGIBLE_TIERS if str(tier).startswith(key)), None)
+
+
+class AdvancePricer:
+    """기준일 이후 입금될 할부 정산금으로 셀러별 선입금 견적을 계산합니다.
+
+    할인 비용 = 월 할인율 x Σ(회차 금액 x 남은 일수 / 30) 이므로 셀러마다 미지급액과 금액 가중 잔여 개월 수
+    두 합계만 미리 구해 두면, 요율이나 선입금 비율이 바뀔 때 모든 셀러 견적을 배열 연산 한 번으로 다시 냅니다.
+    receivables: core.cash_flow.ReceivablesEngine
+    """
+
+    def __init__(self, receivables, as_of=None, eligible=ELIGIBLE_TIERS):
+        schedule = receivables.schedule
+        as_of = receivables.as_of if as_of is None else pd.Timestamp(as_of)
+        keys = schedule['tier'].map(tier_key)
+        pending = schedule[(schedule['approved_day'] <= as_of) & (schedule['deposit_day'] > as_of) & keys.isin(eligible)]
+        months = (pending['deposit_day'] - as_of).dt.days.to_numpy() / 30
+        sellers = pending.assign(tier_key=keys.loc[pending.index], month_weight=pending['amount'] * months).groupby('seller_id').agg(
+            tier=('tier', 'first'), tier_key=('tier_key', 'first'), receivable=('amount', 'sum'),
+            installments=('amount', 'size'), month_weight=('month_weight', 'sum'),
+        )
+        self.as_of = as_of
+        self.sellers = sellers.sort_values('receivable', ascending=False)
+
+    def __len__(self):
+        return len(self.sellers)
+
+    def quotes(self, monthly_rates=None, advance_ratio=DEFAULT_ADVANCE_RATIO, seller_ids=None):
+        """셀러별 견적: 선입금 총액(gross), 할인 비용, 실지급액(advance), 실효 월 금리 (QUOTE_COLUMNS)."""
+        rates = {**DEFAULT_MONTHLY_RATES, **(monthly_rates or {})}
+        s = self.sellers if seller_ids is None else self.sellers[self.sellers.index.isin(seller_ids)]
+        monthly_rate = s['tier_key'].map(rates).fillna(0.0).to_numpy(dtype='float64')
+        receivable = s['receivable'].to_numpy()
+        gross = receivable * advance_ratio
+        discount = np.minimum(monthly_rate * s['month_weight'].to_numpy() * advance_ratio, gross)
+        advance = gross - discount
+        avg_months = s['month_weight'].to_numpy() / np.where(receivable > 0, receivable, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # 실효 월 금리: 실지급액 대비 할인 비용을 평균 잔여 개월 수로 나눈 값
+            effective = np.where(advance > 0, discount / advance / avg_months, np.nan)
+        return pd.DataFrame({
+            'seller_id': s.index.to_numpy(),
+            'tier': s['tier'].to_numpy(),
+            'receivable': receivable,
+            'installments': s['installments'].to_numpy(),
+            'avg_days': avg_months * 30,
+            'monthly_rate': monthly_rate,
+            'gross_amount': gross,
+            'discount_cost': discount,
+            'advance_amount': advance,
+            'effective_rate': effective,
+        })[QUOTE_COLUMNS]
+
+    def quote(self, seller_id, monthly_rates=None, advance_ratio=DEFAULT_ADVANCE_RATIO):
+        """셀러 한 명의 견적 (대상이 아니면 None)."""
+        quote = self.quotes(monthly_rates, advance_ratio, seller_ids=[seller_id])
+        return None if quote.empty else quote.iloc[0]
+
+
+def portfolio_totals(quotes):
+    """견적을 티어별로 합친 포트폴리오 (셀러 수, 미지급액, 선입금 총액, 할인 수익, 실지급액) + 합계 행."""
+    by_tier = quotes.groupby('tier').agg(
+        sellers=('seller_id', 'size'), receivable=('receivable', 'sum'), gross_amount=('gross_amount', 'sum'),
+        discount_cost=('discount_cost', 'sum'), advance_amount=('advance_amount', 'sum'),
+    )
+    by_tier.loc['Total'] = by_tier.sum()
+    by_tier['sellers'] = by_tier['sellers'].astype('int64')
+    return by_tier
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+
+# ====== 서버 측 히스토그램 ======
+DEFAULT_BINS = 30
+
+BIN_COLUMNS = ['bin_start', 'bin_end', 'bin_mid', 'count']
+
+
+def histogram_edges(values, bins=DEFAULT_BINS, value_range=None):
+    """여러 계열이 같은 구간을 쓰도록 경계만 먼저 계산합니다 (결측/무한대 제외)."""
+    values = np.asarray(values, dtype='float64')
+    return np.histogram_bin_edges(values[np.isfinite(values)], bins=bins, range=value_range)
+
+
+def histogram_bins(values, bins=DEFAULT_BINS, weights=None, value_range=None):
+    """NumPy 로 구간을 나눈 히스토그램 (bin_start, bin_end, bin_mid, count).
+
+    차트에는 원시 값 대신 구간 경계와 개수만 넘깁니다. bins 는 구간 수 또는 경계 배열,
+    weights 가 있으면 행마다 그 값만큼 셉니다 (예: 이미 집계된 order_count).
+    """
+    values = np.asarray(values, dtype='float64')
+    valid = np.isfinite(values)
+    integer = weights is None or np.asarray(weights).dtype.kind in 'iub'
+    if weights is not None:
+        weights = np.asarray(weights, dtype='float64')[valid]
+    counts, edges = np.histogram(values[valid], bins=bins, range=value_range, weights=weights)
+    return pd.DataFrame({
+        'bin_start': edges[:-1],
+        'bin_end': edges[1:],
+        'bin_mid': (edges[:-1] + edges[1:]) / 2,
+        'count': counts.astype('int64') if integer else counts,
+    })
@@ -0,0 +1,107 @@
+import os
+import hashlib
+import functools
+import threading
+import streamlit as st
+
+
+# ====== 로더 의존성 매니페스트 ======
+# "모듈.함수" -> 첫 번째 인자(기준 폴더) 기준 상대 경로 목록과 내용 지문 사용 여부
+# 파일이 바뀌면 해당 로더의 캐시 키만 바뀌고 다른 캐시 항목은 그대로 유지됩니다.
+DEPENDENCY_MANIFEST = {}
+
+# 내용 지문은 (경로, 크기, mtime) 이 바뀔 때만 다시 계산
+_FINGERPRINTS = {}
+_FINGERPRINT_LOCK = threading.Lock()
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _content_digest(path, size, mtime_ns):
+    key = (path, size, mtime_ns)
+    with _FINGERPRINT_LOCK:
+        if key in _FINGERPRINTS:
+            return _FINGERPRINTS[key]
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    with _FINGERPRINT_LOCK:
+        _FINGERPRINTS[key] = digest.hexdigest()
+    return _FINGERPRINTS[key]
+
+
+def file_signature(path, fingerprint=False):
+    """파일 하나의 캐시 키 조각.
+
+    기본은 (크기, mtime) 이고, fingerprint=True 이면 (크기, 내용 해시) 를 써서
+    같은 내용으로 다시 저장된 파일은 캐시를 유지합니다. 없는 파일은 None.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if fingerprint:
+        return (stat.st_size, _content_digest(path, stat.st_size, stat.st_mtime_ns))
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def dependency_signature(base_dir, relative_paths, fingerprint=False):
+    return tuple(
+        (rel_path, file_signature(os.path.join(base_dir, rel_path), fingerprint))
+        for rel_path in relative_paths
+    )
+
+
+def register_dependencies(name, relative_paths, fingerprint=False):
+    DEPENDENCY_MANIFEST[name] = {"paths": list(relative_paths), "fingerprint": fingerprint}
+
+
+def cached_loader(*relative_paths, fingerprint=False, extra_signature=None, **cache_kwargs):
+    """파일 상태를 캐시 키에 포함하는 st.cache_data 로더 데코레이터.
+
+    relative_paths 는 로더의 첫 번째 인자(기준 폴더) 기준 경로이며 매니페스트에 등록됩니다.
+    산출물 CSV 가 다시 만들어지면 다음 호출에서 새 키로 자동 재로딩됩니다.
+    extra_signature(로더 인자...) 를 주면 기준 폴더 밖 입력의 상태(예: ID 사전 파일)도 키에 들어갑니다.
+    """
+    def decorator(func):
+        register_dependencies(f"{func.__module__}.{func.__name__}", relative_paths, fingerprint)
+
+        # functools.wraps 로 원본 이름/소스를 물려받아 로더마다 별도의 캐시 공간을 씁니다
+        @st.cache_data(**cache_kwargs)
+        @functools.wraps(func)
+        def cached(*args, cache_signature=None, **kwargs):
+            return func(*args, **kwargs)
+
+        def signature(base_dir, *args, **kwargs):
+            parts = dependency_signature(base_dir, relative_paths, fingerprint)
+            if extra_signature is not None:
+                parts += (extra_signature(base_dir, *args, **kwargs),)
+            return parts
+
+        @functools.wraps(func)
+        def wrapper(base_dir, *args, **kwargs):
+            return cached(base_dir, *args, cache_signature=signature(base_dir, *args, **kwargs), **kwargs)
+
+        wrapper.clear = cached.clear
+        wrapper.signature = signature
+        wrapper.dependencies = tuple(relative_paths)
+        return wrapper
+    return decorator
+
+
+def manifest_status(base_dirs):
+    """매니페스트의 파일별 현재 상태 목록 (base_dirs: {"모듈.함수": 기준 폴더})."""
+    rows = []
+    for loader, entry in DEPENDENCY_MANIFEST.items():
+        base_dir = base_dirs.get(loader)
+        if base_dir is None:
+            continue
+        for rel_path in entry["paths"]:
+            path = os.path.join(base_dir, rel_path)
+            rows.append({
+                "loader": loader,
+                "path": path,
+                "exists": os.path.exists(path),
+                "signature": file_signature(path, entry["fingerprint"]),
+            })
+    return rows
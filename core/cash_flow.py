@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+
+# ====== 할부 정산 규칙 ======
+# 카드 결제는 할부 회차마다 30일 뒤, 그 외 결제는 승인 3일 뒤 입금
+INSTALLMENT_DAYS = 30
+DEPOSIT_LAG_DAYS = 3
+COST_RATIO = 0.70             # 주문(승인) 시점에 선지출되는 비용 비율
+
+
+def expand_installments(trans, installment_days=INSTALLMENT_DAYS, deposit_lag_days=DEPOSIT_LAG_DAYS,
+                        time_column='order_approved_at'):
+    """결제 건을 입금 회차로 펼칩니다 (행 단위 반복 없이 np.repeat 와 오프셋 계산).
+
+    trans: payment_type, payment_installments, payment_value, time_column (결측 없는 datetime)
+    반환: (회차별 원래 행 위치, 입금일, 입금액) 배열
+    """
+    is_card = (trans['payment_type'] == 'credit_card').to_numpy()
+    n_inst = np.where(is_card, np.maximum(trans['payment_installments'].fillna(1).to_numpy(), 1), 1).astype('int64')
+    rows = np.repeat(np.arange(len(trans)), n_inst)
+    step = np.arange(len(rows)) - np.repeat(np.cumsum(n_inst) - n_inst, n_inst) + 1
+    offset_days = np.where(is_card[rows], step * installment_days, deposit_lag_days)
+    deposit_at = trans[time_column].to_numpy()[rows] + offset_days.astype('timedelta64[D]')
+    amount = trans['payment_value'].to_numpy()[rows] / n_inst[rows]
+    return rows, deposit_at, amount
+
+
+def monthly_net_flow(trans, cost_ratio=COST_RATIO, installment_days=INSTALLMENT_DAYS,
+                     deposit_lag_days=DEPOSIT_LAG_DAYS, time_column='order_approved_at'):
+    """승인 시점 선지출(결제액 x cost_ratio)과 회차별 입금을 월 단위로 합친 순현금흐름 (date, amount).
+
+    첫 달부터 마지막 달까지 빈 달은 0 으로 채웁니다 (resample('MS') 와 같은 모양).
+    """
+    if len(trans) == 0:
+        return pd.DataFrame({'date': pd.DatetimeIndex([]), 'amount': np.array([], dtype='float64')})
+    _, deposit_at, inflow = expand_installments(trans, installment_days, deposit_lag_days, time_column)
+    approved_at = trans[time_column].to_numpy()
+    outflow = -1 * trans['payment_value'].to_numpy(dtype='float64') * cost_ratio
+
+    months = np.concatenate([approved_at.astype('datetime64[M]'), deposit_at.astype('datetime64[M]')])
+    first = months.min()
+    totals = np.bincount((months - first).astype('int64'), weights=np.concatenate([outflow, inflow]))
+    dates = first + np.arange(len(totals)).astype('timedelta64[M]')
+    return pd.DataFrame({'date': pd.DatetimeIndex(dates.astype('datetime64[ns]')), 'amount': totals})
+
+
+# ====== 플랫폼 정산 예정액 (Receivables) ======
+UNRANKED_TIER = "Unranked"
+PLATFORM = "Platform"
+
+
+class ReceivablesEngine:
+    """모든 거래를 한 번에 회차로 펼친 정산 일정.
+
+    셀러/티어/플랫폼 단위의 일·월별 지급 예정액과, 승인됐지만 아직 입금되지 않은 금액(미지급 잔액) 곡선을 계산합니다.
+    trans: seller_id, payment_type, payment_installments, payment_value, order_approved_at
+    tiers: seller_id -> tier (없으면 모든 셀러가 Unranked)
+    """
+
+    def __init__(self, trans, tiers=None, installment_days=INSTALLMENT_DAYS, deposit_lag_days=DEPOSIT_LAG_DAYS):
+        settled = trans.assign(order_approved_at=pd.to_datetime(trans['order_approved_at'], errors='coerce'))
+        settled = settled.dropna(subset=['order_approved_at'])
+        rows, deposit_at, amount = expand_installments(settled, installment_days, deposit_lag_days)
+        seller_id = settled['seller_id'].to_numpy()[rows]
+        tier = pd.Series(seller_id).map(tiers) if tiers is not None else pd.Series(np.nan, index=range(len(rows)))
+        self.schedule = pd.DataFrame({
+            'seller_id': seller_id,
+            'tier': tier.fillna(UNRANKED_TIER).astype(str).to_numpy(),
+            'approved_day': pd.DatetimeIndex(settled['order_approved_at'].to_numpy()[rows]).normalize(),
+            'deposit_day': pd.DatetimeIndex(deposit_at).normalize(),
+            'amount': amount,
+        })
+        # 데이터 기준일: 마지막 승인일. 이후로 잡힌 입금이 미래 정산 부채입니다
+        self.as_of = self.schedule['approved_day'].max() if len(self.schedule) else pd.NaT
+
+    def __len__(self):
+        return len(self.schedule)
+
+    def _keys(self, by):
+        """by: None(플랫폼 합계), 'tier' 또는 'seller_id'."""
+        if by is None:
+            return pd.Series(PLATFORM, index=self.schedule.index, name='group')
+        return self.schedule[by]
+
+    def payouts(self, by=None, freq='D', after=None):
+        """입금일 기준 지급 예정액 (group, date, payout). freq 는 'D'(일) 또는 'MS'(월초), after 가 있으면 그 이후 입금만."""
+        schedule = self.schedule
+        if after is not None:
+            schedule = schedule[schedule['deposit_day'] > pd.Timestamp(after)]
+        days = schedule['deposit_day']
+        date = days if freq == 'D' else days.dt.to_period('M').dt.start_time
+        keys = self._keys(by).loc[schedule.index]
+        result = schedule['amount'].groupby([keys.rename('group'), date.rename('date')]).sum()
+        return result.rename('payout').reset_index()
+
+    def liability_curve(self, by=None):
+        """일자별 미지급 잔액 (group, date, outstanding): 그날까지 승인된 금액 - 그날까지 입금된 금액."""
+        keys = self._keys(by).rename('group')
+        amount = self.schedule['amount']
+        booked = amount.groupby([keys, self.schedule['approved_day'].rename('date')]).sum().unstack('group', fill_value=0.0)
+        paid = amount.groupby([keys, self.schedule['deposit_day'].rename('date')]).sum().unstack('group', fill_value=0.0)
+        if booked.empty:
+            return pd.DataFrame(columns=['group', 'date', 'outstanding'])
+        days = pd.date_range(booked.index.min(), paid.index.max(), freq='D', name='date')
+        net = booked.reindex(days, fill_value=0.0).sub(paid.reindex(days, fill_value=0.0), fill_value=0.0)
+        # 부동소수점 누적 오차로 생기는 아주 작은 음수는 0 으로
+        outstanding = net.cumsum().clip(lower=0.0)
+        return outstanding.stack().rename('outstanding').reset_index()[['group', 'date', 'outstanding']]
+
+    def outstanding(self, as_of=None, by=None):
+        """as_of 시점(기본: 데이터 기준일)까지 승인됐지만 그 이후 입금될 금액 합계 (by 가 있으면 그룹별 Series)."""
+        as_of = self.as_of if as_of is None else pd.Timestamp(as_of)
+        pending = (self.schedule['approved_day'] <= as_of) & (self.schedule['deposit_day'] > as_of)
+        if by is None:
+            return float(self.schedule.loc[pending, 'amount'].sum())
+        return self.schedule.loc[pending].groupby(by)['amount'].sum().sort_values(ascending=False)
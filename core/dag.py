@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import inspect
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from core.cache_keys import file_signature
+from core.ingest import TABLE_SCHEMAS
+
+
+DAG_STATE_FILE = "dag_state.json"
+
+
+class Node:
+    """파생 산출물 하나를 만드는 작업.
+
+    func(data_dir, output_dir, work_dir) 는 outputs 에 선언한 파일을 직접 씁니다.
+    sources 는 의존하는 원시 테이블 이름(TABLE_SCHEMAS 키), deps 는 선행 노드 이름이며,
+    outputs 는 root("output" 또는 "work") 폴더 기준 상대 경로입니다.
+    프로세스 풀에서 실행되므로 func 는 모듈 최상위 함수여야 합니다.
+    """
+
+    def __init__(self, name, func, outputs, deps=(), sources=(), root="output"):
+        self.name = name
+        self.func = func
+        self.outputs = tuple(outputs)
+        self.deps = tuple(deps)
+        self.sources = tuple(sources)
+        self.root = root
+
+    def output_paths(self, output_dir, work_dir):
+        base = work_dir if self.root == "work" else output_dir
+        return [os.path.join(base, rel_path) for rel_path in self.outputs]
+
+
+def _package_modules(module):
+    """module 과, 그 모듈이 직간접으로 가져다 쓰는 같은 패키지(core.*) 모듈들 (이름순)."""
+    package = (module.__package__ or module.__name__).split('.')[0]
+    found, stack = {}, [module]
+    while stack:
+        current = stack.pop()
+        if current.__name__ in found:
+            continue
+        found[current.__name__] = current
+        for value in vars(current).values():
+            if inspect.ismodule(value):
+                target = value
+            else:
+                name = getattr(value, '__module__', None)
+                target = sys.modules.get(name) if isinstance(name, str) else None
+            if target is not None and target.__name__.split('.')[0] == package:
+                stack.append(target)
+    return [found[name] for name in sorted(found)]
+
+
+def _code_digest(func):
+    """노드 함수 모듈과 그 모듈이 쓰는 core 모듈들의 소스 해시 (공용 모듈 코드가 바뀌어도 다시 만듭니다)."""
+    digest = hashlib.blake2b(digest_size=8)
+    for module in _package_modules(inspect.getmodule(func)):
+        digest.update(inspect.getsource(module).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def node_signature(node, nodes, data_dir, output_dir, work_dir):
+    """노드 입력 상태의 해시: 원시 CSV 의 크기/mtime, 선행 노드 산출물의 내용 해시, 코드 해시."""
+    parts = [node.name, _code_digest(node.func)]
+    for table in node.sources:
+        parts.append((table, file_signature(os.path.join(data_dir, TABLE_SCHEMAS[table]["file"]))))
+    for dep in node.deps:
+        for path in nodes[dep].output_paths(output_dir, work_dir):
+            parts.append((dep, os.path.basename(path), file_signature(path, fingerprint=True)))
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _load_state(work_dir):
+    path = os.path.join(work_dir, DAG_STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(work_dir, state):
+    path = os.path.join(work_dir, DAG_STATE_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _run_node(func, data_dir, output_dir, work_dir):
+    start = time.perf_counter()
+    func(data_dir, output_dir, work_dir)
+    return time.perf_counter() - start
+
+
+def _check_graph(nodes):
+    for node in nodes.values():
+        for dep in node.deps:
+            if dep not in nodes:
+                raise KeyError(f"{node.name}: 알 수 없는 선행 노드 {dep}")
+    # 순환 의존 검사 (DFS)
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"순환 의존: {name}")
+        visiting.add(name)
+        for dep in nodes[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in nodes:
+        visit(name)
+
+
+def run_dag(dag, data_dir, output_dir, work_dir, force=False, max_workers=None):
+    """입력이 바뀐 노드만 다시 만들고, 서로 독립인 노드는 프로세스 풀에서 동시에 실행합니다.
+
+    반환값은 {노드 이름: {"status": built/skipped/failed/blocked, "seconds": 소요 시간}} 입니다.
+    """
+    nodes = {node.name: node for node in dag}
+    _check_graph(nodes)
+    os.makedirs(work_dir, exist_ok=True)
+    state = {} if force else _load_state(work_dir)
+
+    report = {}
+    pending = dict(nodes)
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # 선행 노드가 모두 끝난 노드를 확인: 실패한 선행이 있으면 건너뛰고, 입력이 그대로면 생략
+            for name in list(pending):
+                node = pending[name]
+                if any(dep not in report for dep in node.deps):
+                    continue
+                del pending[name]
+                if any(report[dep]["status"] in ("failed", "blocked") for dep in node.deps):
+                    report[name] = {"status": "blocked", "seconds": 0.0}
+                    continue
+                signature = node_signature(node, nodes, data_dir, output_dir, work_dir)
+                outputs_exist = all(os.path.exists(p) for p in node.output_paths(output_dir, work_dir))
+                if outputs_exist and state.get(name) == signature:
+                    report[name] = {"status": "skipped", "seconds": 0.0}
+                    continue
+                future = pool.submit(_run_node, node.func, data_dir, output_dir, work_dir)
+                running[future] = (name, signature)
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, signature = running.pop(future)
+                try:
+                    report[name] = {"status": "built", "seconds": future.result()}
+                    state[name] = signature
+                except Exception as e:
+                    report[name] = {"status": "failed", "seconds": 0.0, "error": f"{type(e).__name__}: {e}"}
+                    state.pop(name, None)
+                _save_state(work_dir, state)
+    return report
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.cache_keys import dependency_signature
+from core.facts import STAR_SOURCE_FILES, get_table
+
+
+# ====== 배송 분석에서 사용하는 컬럼 ======
+DELIVERY_COLUMNS = [
+    'order_status', 'customer_unique_id', 'customer_state',
+    'items_price', 'items_freight', 'delivery_days', 'review_score',
+]
+
+DEFAULT_FREIGHT_THRESHOLD = 0.20
+
+# 그룹별 평균을 내는 지표 (결측은 지표별로 제외)
+ENGINE_METRICS = ('repurchase', 'delivery_days', 'review_score', 'price', 'freight_value')
+
+
+def load_delivery_orders(data_dir):
+    """배송 완료 주문별 배송비 비중, 재구매 여부, 배송 기간, 리뷰 점수."""
+    orders = get_table(data_dir, "fact_orders", DELIVERY_COLUMNS)
+    orders = orders[orders['order_status'] == 'delivered']
+
+    # 같은 고객(customer_unique_id)이 배송 완료 주문을 2건 이상 가지면 재구매 고객
+    order_counts = orders['customer_unique_id'].map(orders['customer_unique_id'].value_counts())
+    return pd.DataFrame({
+        'customer_state': orders['customer_state'].to_numpy(),
+        'freight_ratio': (orders['items_freight'] / orders['items_price']).to_numpy(dtype='float64'),
+        'repurchase': (order_counts > 1).to_numpy(dtype='float64'),
+        'delivery_days': orders['delivery_days'].to_numpy(dtype='float64', na_value=np.nan),
+        'review_score': orders['review_score'].to_numpy(dtype='float64', na_value=np.nan),
+        'price': orders['items_price'].to_numpy(dtype='float64'),
+        'freight_value': orders['items_freight'].to_numpy(dtype='float64'),
+    })
+
+
+def group_labels(threshold):
+    pct = f"{threshold * 100:g}%"
+    return f"High (>{pct})", f"Low (<={pct})"
+
+
+class FreightRatioEngine:
+    """배송비 비중으로 정렬한 누적합 배열로, 임계값마다 두 그룹의 평균 지표를 이분 탐색 한 번에 계산합니다."""
+
+    def __init__(self, orders):
+        orders = orders[np.isfinite(orders['freight_ratio'].to_numpy())]
+        order = np.argsort(orders['freight_ratio'].to_numpy(), kind='stable')
+        self.ratio = orders['freight_ratio'].to_numpy()[order]
+        self.sums = {}
+        self.counts = {}
+        for name in ENGINE_METRICS:
+            values = orders[name].to_numpy()[order]
+            present = ~np.isnan(values)
+            # 맨 앞에 0 을 붙여 [lo, hi) 구간 합을 sums[hi] - sums[lo] 로 구합니다
+            self.sums[name] = np.concatenate([[0.0], np.cumsum(np.where(present, values, 0.0))])
+            self.counts[name] = np.concatenate([[0], np.cumsum(present)])
+
+    def __len__(self):
+        return len(self.ratio)
+
+    def split_index(self, thresholds):
+        """비중이 임계값 이하인 주문 수 (Low 그룹 크기)."""
+        return np.searchsorted(self.ratio, thresholds, side='right')
+
+    def _means(self, lo, hi):
+        means = {}
+        for name in ENGINE_METRICS:
+            count = self.counts[name][hi] - self.counts[name][lo]
+            total = self.sums[name][hi] - self.sums[name][lo]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means[name] = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        return means
+
+    def group_stats(self, threshold=DEFAULT_FREIGHT_THRESHOLD):
+        """High/Low 그룹별 주문 수와 지표 평균 (High 가 먼저)."""
+        k = int(self.split_index(threshold))
+        n = len(self)
+        high_label, low_label = group_labels(threshold)
+        rows = []
+        for label, lo, hi in ((high_label, k, n), (low_label, 0, k)):
+            row = {'group': label, 'orders': hi - lo}
+            row.update({name: float(value) for name, value in self._means(lo, hi).items()})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def sweep(self, thresholds):
+        """여러 임계값을 한 번에 계산합니다 (임계값별 Low/High 그룹 평균)."""
+        thresholds = np.asarray(thresholds, dtype='float64')
+        k = self.split_index(thresholds)
+        n = np.full_like(k, len(self))
+        result = pd.DataFrame({'threshold': thresholds, 'low_orders': k, 'high_orders': n - k})
+        for prefix, (lo, hi) in (('low', (np.zeros_like(k), k)), ('high', (k, n))):
+            for name, values in self._means(lo, hi).items():
+                result[f'{prefix}_{name}'] = values
+        return result
+
+
+def state_stats(orders):
+    """고객 주(state)별 재구매율과 평균 리뷰 점수."""
+    return (orders.groupby('customer_state', observed=True)
+            .agg(repurchase=('repurchase', 'mean'), review_score=('review_score', 'mean'),
+                 orders=('repurchase', 'size'))
+            .reset_index())
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_engine(data_dir, source_signature):
+    orders = load_delivery_orders(data_dir)
+    return FreightRatioEngine(orders), state_stats(orders)
+
+
+def get_delivery_engine(data_dir):
+    """스타 스키마가 바뀔 때만 다시 만드는 (엔진, 주별 통계)."""
+    return _load_engine(data_dir, dependency_signature(data_dir, STAR_SOURCE_FILES))
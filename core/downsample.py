@@ -0,0 +1,63 @@
+import numpy as np
+
+
+# ====== 시계열 다운샘플링 (LTTB) ======
+DEFAULT_CHART_WIDTH = 1000    # use_container_width 차트의 대략적인 가로 픽셀
+POINTS_PER_PIXEL = 1          # 픽셀당 남길 점 수
+
+
+def target_points(width=DEFAULT_CHART_WIDTH, points_per_pixel=POINTS_PER_PIXEL):
+    """차트 가로 픽셀에 맞춘 목표 점 개수."""
+    return max(3, int(width * points_per_pixel))
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]').astype('int64').astype('float64')
+    return values.astype('float64')
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets 로 남길 점의 위치 (처음/끝 점 포함, 오름차순).
+
+    첫/끝 점을 제외한 구간을 n_out - 2 개 버킷으로 나누고, 버킷마다 직전에 고른 점과 다음 버킷
+    평균이 이루는 삼각형 넓이가 가장 큰 점을 고릅니다. 튀는 값(피크)이 그대로 남습니다.
+    """
+    x, y = _as_float(x), _as_float(y)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype('int64')
+    selected = np.empty(n_out, dtype='int64')
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(df, x, columns, n_out=None):
+    """x 로 정렬된 프레임에서 columns 각 계열의 LTTB 점을 합친 행만 남깁니다.
+
+    계열마다 결측을 뺀 뒤 고르고, 최댓값/최솟값 행은 항상 남깁니다.
+    행 수가 n_out 이하이면 그대로 반환하므로 기간이 길어져도 차트로 보내는 점 수는 일정합니다.
+    """
+    n_out = n_out or target_points()
+    if len(df) <= n_out:
+        return df
+    keep = [np.array([0, len(df) - 1])]
+    for col in columns:
+        values = _as_float(df[col].to_numpy())
+        valid = np.flatnonzero(np.isfinite(values))
+        if len(valid) == 0:
+            continue
+        picked = lttb_indices(df[x].to_numpy()[valid], values[valid], n_out)
+        keep.append(valid[picked])
+        keep.append(valid[[np.argmax(values[valid]), np.argmin(values[valid])]])
+    return df.iloc[np.unique(np.concatenate(keep))]
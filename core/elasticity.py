@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.cache_keys import dependency_signature
+from core.facts import STAR_SOURCE_FILES, get_table
+
+
+# ====== 탄력성 추정에서 사용하는 컬럼 ======
+ELASTICITY_COLUMNS = {
+    "fact_items": ['order_id', 'product_id', 'price', 'category_eng', 'order_status', 'order_purchase_timestamp'],
+    "fact_orders": ['order_id', 'customer_unique_id', 'payment_value'],
+}
+
+EXCLUDED_STATUSES = ("canceled", "unavailable")
+
+MIN_SAMPLES = 30          # 판매 샘플 수가 이보다 적은 그룹은 정제 탄력성에서 제외
+MIN_PRICE_POINTS = 3      # 서로 다른 가격이 이보다 적으면 기울기를 믿을 수 없음
+OUTLIER_IQR = 1.5         # 그룹 내 로그 가격 IQR 밖 관측치는 제거
+BLACK_FRIDAY = ('2017-11-20', '2017-11-30')   # 가격 탭의 블랙프라이데이 구간과 동일
+
+# 조정 전 탄력성 구간 (price_elasticity_results.csv 의 status)
+STATUS_BINS = [-np.inf, -1.5, -0.5, 0.5, np.inf]
+STATUS_LABELS = ["매우 탄력적", "탄력적", "중립/비탄력적", "이상치/정비례"]
+
+
+def load_sales(data_dir):
+    """판매된 상품 행 (가격, 상품, 카테고리, 구매일, 고객)."""
+    items = get_table(data_dir, "fact_items", ELASTICITY_COLUMNS["fact_items"])
+    items = items[~items['order_status'].isin(EXCLUDED_STATUSES)]
+    orders = get_table(data_dir, "fact_orders", ELASTICITY_COLUMNS["fact_orders"])
+    sales = items.merge(orders[['order_id', 'customer_unique_id']], on='order_id', how='left')
+    sales['date'] = sales['order_purchase_timestamp'].dt.normalize()
+    sales['category_eng'] = sales['category_eng'].fillna('unknown')
+    return sales
+
+
+def rfm_segments(data_dir):
+    """고객별 RFM 세그먼트 (최근성/금액 사분위 점수 합: 7 이상 VIP, 3 이하 At-Risk)."""
+    items = get_table(data_dir, "fact_items", ['order_id', 'order_status', 'order_purchase_timestamp'])
+    orders = get_table(data_dir, "fact_orders", ELASTICITY_COLUMNS["fact_orders"])
+    purchases = orders.merge(items.drop_duplicates('order_id'), on='order_id')
+    purchases = purchases[purchases['order_status'] == 'delivered']
+    rfm = purchases.groupby('customer_unique_id').agg(
+        last_purchase=('order_purchase_timestamp', 'max'),
+        monetary=('payment_value', 'sum'),
+    )
+    recency = (rfm['last_purchase'].max() - rfm['last_purchase']).dt.days
+    r_score = pd.qcut(recency.rank(method='first'), 4, labels=[4, 3, 2, 1]).astype(int)
+    m_score = pd.qcut(rfm['monetary'].rank(method='first'), 4, labels=[1, 2, 3, 4]).astype(int)
+    score = r_score + m_score
+    return pd.Series(np.select([score >= 7, score <= 3], ['VIP', 'At-Risk'], 'Regular'), index=rfm.index, name='segment')
+
+
+# ====== 관측치 ======
+def daily_observations(sales, key, trim=True):
+    """그룹 x 판매일별 (로그 판매량, 로그 평균 가격, 블랙프라이데이 여부) 관측치.
+
+    trim=True 이면 그룹마다 로그 가격의 IQR 범위를 벗어난 관측치를 제거합니다.
+    """
+    daily = sales.groupby([key, 'date'], observed=True).agg(units=('price', 'size'), price=('price', 'mean')).reset_index()
+    daily = daily[daily['price'] > 0]
+    daily['x'] = np.log(daily['price'])
+    daily['y'] = np.log(daily['units'])
+    daily['season'] = daily['date'].between(*BLACK_FRIDAY).astype('float64')
+    if trim:
+        grouped = daily.groupby(key, observed=True)['x']
+        q1, q3 = grouped.transform('quantile', 0.25), grouped.transform('quantile', 0.75)
+        spread = OUTLIER_IQR * (q3 - q1)
+        daily = daily[daily['x'].between(q1 - spread, q3 + spread)]
+    return daily
+
+
+# ====== 묶음 최소제곱 ======
+def _erfc(z):
+    """z >= 0 에서의 상보 오차함수 (Abramowitz-Stegun 7.1.26, 절대 오차 1.5e-7 이하)."""
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    with np.errstate(over='ignore', invalid='ignore'):
+        return poly * np.exp(-z * z)
+
+
+def fit_batched(obs, key, season=True):
+    """그룹별 log(판매량) = a + b*log(가격) [+ c*시즌] 회귀를 한 번의 배치 연산으로 풉니다.
+
+    그룹마다 정규방정식 X'X, X'y 를 bincount 로 모은 뒤 (G, k, k) 배열을 한꺼번에 풉니다.
+    가격이 하나뿐이거나 시즌 관측이 없는 그룹은 의사역행렬로 해당 계수가 0 이 됩니다.
+    """
+    codes, groups = pd.factorize(obs[key])
+    n_groups = len(groups)
+    columns = [np.ones(len(obs)), obs['x'].to_numpy()]
+    if season:
+        columns.append(obs['season'].to_numpy())
+    y = obs['y'].to_numpy()
+    k = len(columns)
+
+    xtx = np.empty((n_groups, k, k))
+    xty = np.empty((n_groups, k))
+    for i in range(k):
+        xty[:, i] = np.bincount(codes, weights=columns[i] * y, minlength=n_groups)
+        for j in range(i, k):
+            xtx[:, i, j] = xtx[:, j, i] = np.bincount(codes, weights=columns[i] * columns[j], minlength=n_groups)
+    yy = np.bincount(codes, weights=y * y, minlength=n_groups)
+    n = xtx[:, 0, 0]
+
+    inv = np.linalg.pinv(xtx)
+    beta = np.einsum('gij,gj->gi', inv, xty)
+    rss = np.maximum(yy - np.einsum('gi,gi->g', beta, xty), 0.0)
+    tss = yy - xty[:, 0] ** 2 / n
+    dof = np.linalg.matrix_rank(xtx).astype('float64')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r_squared = np.where(tss > 1e-12, 1 - rss / tss, np.nan)
+        se = np.sqrt(rss / np.where(n > dof, n - dof, np.nan) * inv[:, 1, 1])
+        t_stat = beta[:, 1] / se
+    # 정규 근사 양측 p-value (관측치가 충분한 그룹만 남기므로 t 분포와 차이가 작음)
+    p_value = np.where(np.isfinite(t_stat), _erfc(np.abs(t_stat) / np.sqrt(2)), np.nan)
+
+    result = pd.DataFrame({
+        key: groups,
+        'elasticity': beta[:, 1],
+        'r_squared': r_squared,
+        'p_value': p_value,
+        'n_obs': n.astype('int64'),
+    })
+    if season:
+        result['season_effect'] = beta[:, 2]
+    return result
+
+
+def _group_counts(sales, key):
+    return sales.groupby(key, observed=True)['price'].agg(total_sales='size', avg_price='mean', price_unique_count='nunique')
+
+
+# ====== 결과 테이블 ======
+def estimate_elasticities(sales, segments=None):
+    """상품/카테고리/RFM 세그먼트별 탄력성 (기존 가격 탭 CSV 와 같은 컬럼명)."""
+    counts = _group_counts(sales, 'product_id')
+
+    # 조정 전: 이상치 제거/시즌 통제 없이 가격이 2개 이상인 모든 상품
+    raw_ids = counts.index[(counts['total_sales'] >= 2) & (counts['price_unique_count'] >= 2)]
+    raw_sales = sales[sales['product_id'].isin(raw_ids)]
+    raw = fit_batched(daily_observations(raw_sales, 'product_id', trim=False), 'product_id', season=False)
+    raw = raw.join(counts[['avg_price', 'total_sales']], on='product_id')
+    raw['status'] = pd.cut(raw['elasticity'], bins=STATUS_BINS, labels=STATUS_LABELS).astype(str)
+    raw = raw[['product_id', 'elasticity', 'avg_price', 'total_sales', 'status']]
+
+    # 조정 후: 최소 샘플 수, 이상치 제거, 블랙프라이데이 시즌 효과 통제
+    refined_ids = counts.index[(counts['total_sales'] >= MIN_SAMPLES) & (counts['price_unique_count'] >= MIN_PRICE_POINTS)]
+    refined_sales = sales[sales['product_id'].isin(refined_ids)]
+    refined_obs = daily_observations(refined_sales, 'product_id')
+    # IQR 제거 후에도 최소 샘플 수와 가격 수를 만족하는 상품만 적합
+    kept = refined_obs.groupby('product_id', observed=True).agg(units=('units', 'sum'), prices=('x', 'nunique'))
+    kept = kept.index[(kept['units'] >= MIN_SAMPLES) & (kept['prices'] >= MIN_PRICE_POINTS)]
+    refined = fit_batched(refined_obs[refined_obs['product_id'].isin(kept)], 'product_id')
+    refined = refined.join(counts['price_unique_count'], on='product_id').rename(columns={
+        'elasticity': 'true_elasticity', 'season_effect': 'bf_season_effect', 'p_value': 'p_value_price'})
+    refined = refined[['product_id', 'true_elasticity', 'bf_season_effect', 'r_squared', 'p_value_price', 'price_unique_count']]
+
+    # 카테고리: 상품 탄력성 분포 요약 + 카테고리 전체를 한 그룹으로 본 적합치
+    product_category = sales.drop_duplicates('product_id').set_index('product_id')['category_eng']
+    by_product = refined.assign(category=refined['product_id'].map(product_category))
+    category = by_product.groupby('category').agg(
+        mean_elasticity=('true_elasticity', 'mean'),
+        median_elasticity=('true_elasticity', 'median'),
+        product_count=('product_id', 'size'),
+        std_elasticity=('true_elasticity', 'std'),
+        avg_r_squared=('r_squared', 'mean'),
+    )
+    pooled = fit_batched(daily_observations(sales, 'category_eng'), 'category_eng').set_index('category_eng')
+    category['pooled_elasticity'] = pooled['elasticity']
+    category = category.sort_values('mean_elasticity').reset_index()
+
+    result = {"raw": raw, "refined": refined, "category": category}
+    if segments is not None:
+        seg_sales = sales.assign(segment=sales['customer_unique_id'].map(segments)).dropna(subset=['segment'])
+        rfm = fit_batched(daily_observations(seg_sales, 'segment'), 'segment')
+        result["rfm"] = rfm.rename(columns={
+            'segment': 'Segment', 'elasticity': 'Elasticity', 'p_value': 'P-value', 'r_squared': 'R-squared',
+        })[['Segment', 'Elasticity', 'P-value', 'R-squared']]
+    return result
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_elasticities(data_dir, source_signature):
+    return estimate_elasticities(load_sales(data_dir), rfm_segments(data_dir))
+
+
+def get_elasticities(data_dir):
+    """스타 스키마가 바뀔 때만 다시 추정하는 탄력성 테이블 {raw, refined, category, rfm}."""
+    return _load_elasticities(data_dir, dependency_signature(data_dir, STAR_SOURCE_FILES))
@@ -0,0 +1,303 @@
+import os
+import pandas as pd
+import streamlit as st
+
+from core.ids import get_id_dictionary, load_id_dictionary
+from core.ingest import STAR_SOURCES, TABLE_SCHEMAS, read_table, run_parallel
+from core import incremental, shared_store
+from core.cache_keys import dependency_signature, register_dependencies
+from core.time_index import sort_by_time
+
+
+# ====== 스타 스키마 구성 ======
+# fact_orders   : 주문 1건 = 1행 (결제 합계, 리뷰 평균, 배송 일수 포함)
+# fact_items    : 주문 상품 1개 = 1행 (주문 시점/상태, 고객 주, 카테고리 비정규화)
+# fact_payments : 결제 1건 = 1행
+# fact_reviews  : 리뷰 1건 = 1행 (증분 병합 때 주문별 리뷰 평균을 다시 내기 위해 보관)
+# dim_*         : 고객 / 상품 / 셀러 차원 테이블
+STAR_TABLES = ("fact_orders", "fact_items", "fact_payments", "fact_reviews", "dim_customers", "dim_products", "dim_sellers")
+
+# 스타 스키마를 만들 때 원시 테이블에서 읽는 컬럼 (None 이면 전체)
+# 리뷰 본문(review_comment_*)처럼 어느 탭도 쓰지 않는 긴 텍스트는 읽지 않습니다.
+STAR_SOURCE_COLUMNS = {
+    "orders": None,
+    "order_items": None,
+    "order_payments": None,
+    "order_reviews": ['review_id', 'order_id', 'review_score'],
+    "customers": ['customer_id', 'customer_unique_id', 'customer_zip_code_prefix', 'customer_city', 'customer_state'],
+    "products": ['product_id', 'product_category_name'],
+    "sellers": None,
+}
+
+# fact_items 에 함께 실어 두는 주문 단위 속성 (조인 없이 상품 단위 집계가 가능하도록)
+ITEM_ORDER_ATTRS = [
+    'order_status', 'order_purchase_timestamp', 'order_approved_at',
+    'order_delivered_carrier_date', 'order_delivered_customer_date',
+]
+
+
+def _build_dim_products(data_dir):
+    products = read_table(data_dir, "products", columns=STAR_SOURCE_COLUMNS["products"])
+    trans_path = os.path.join(data_dir, TABLE_SCHEMAS["category_translation"]["file"])
+    if os.path.exists(trans_path):
+        trans = read_table(data_dir, "category_translation")
+        products = products.merge(trans, on='product_category_name', how='left')
+    else:
+        products['product_category_name_english'] = pd.NA
+    products['category_eng'] = products['product_category_name_english'].fillna(products['product_category_name'])
+    return products
+
+
+def _build_dim_sellers(data_dir):
+    sellers_path = os.path.join(data_dir, TABLE_SCHEMAS["sellers"]["file"])
+    if os.path.exists(sellers_path):
+        return read_table(data_dir, "sellers")
+    return pd.DataFrame(columns=['seller_id', 'seller_zip_code_prefix', 'seller_city', 'seller_state'])
+
+
+def _order_payment_summary(payments):
+    """결제 그레인을 주문 그레인으로 접습니다 (합계, 최대 할부, 주 결제수단, 바우처 사용 여부)."""
+    summary = payments.groupby('order_id').agg(
+        payment_value=('payment_value', 'sum'),
+        payment_installments=('payment_installments', 'max'),
+    )
+    # 주 결제수단 = 결제 금액이 가장 큰 결제의 수단
+    main_type = (payments.sort_values(['payment_value', 'payment_sequential'], kind='stable')
+                 .drop_duplicates('order_id', keep='last')
+                 .set_index('order_id')['payment_type'])
+    summary['payment_type'] = main_type
+    voucher_orders = payments.loc[payments['payment_type'] == 'voucher', 'order_id'].unique()
+    summary['uses_voucher'] = summary.index.isin(voucher_orders)
+    return summary.reset_index()
+
+
+def _assemble_facts(orders, items, payments, reviews, customers, dim_products):
+    """주문/상품 팩트를 만듭니다. 전체 재구축과 증분 병합이 같은 규칙을 쓰도록 한 곳에 둡니다."""
+    # --- 주문 그레인: 1:1 또는 N:1 집계만 붙이므로 행이 늘어나지 않음 ---
+    fact_orders = orders.merge(
+        customers[['customer_id', 'customer_unique_id', 'customer_state']], on='customer_id', how='left')
+    fact_orders = fact_orders.merge(_order_payment_summary(payments), on='order_id', how='left')
+    fact_orders['uses_voucher'] = fact_orders['uses_voucher'].fillna(False).astype(bool)
+    review_avg = reviews.groupby('order_id')['review_score'].mean().rename('review_score')
+    fact_orders = fact_orders.merge(review_avg, on='order_id', how='left')
+
+    item_summary = items.groupby('order_id').agg(
+        item_count=('order_item_id', 'size'),
+        items_price=('price', 'sum'),
+        items_freight=('freight_value', 'sum'),
+    )
+    fact_orders = fact_orders.merge(item_summary, on='order_id', how='left')
+    fact_orders['item_count'] = fact_orders['item_count'].fillna(0).astype('int16')
+
+    fact_orders['delivery_days'] = (fact_orders['order_delivered_customer_date'] - fact_orders['order_purchase_timestamp']).dt.days
+    fact_orders['estimated_days'] = (fact_orders['order_estimated_delivery_date'] - fact_orders['order_purchase_timestamp']).dt.days
+    fact_orders['delay_days'] = fact_orders['delivery_days'] - fact_orders['estimated_days']
+
+    # --- 상품 그레인: 주문 속성과 상품 카테고리는 N:1 조인 ---
+    fact_items = items.merge(
+        fact_orders[['order_id', 'customer_state'] + ITEM_ORDER_ATTRS], on='order_id', how='left')
+    fact_items = fact_items.merge(dim_products[['product_id', 'category_eng']], on='product_id', how='left')
+    return fact_orders, fact_items
+
+
+def _read_latest(data_dir, table):
+    """필요한 컬럼만 읽고, 같은 키가 여러 번 추가된 경우 마지막 행만 남깁니다 (증분 병합과 같은 규칙)."""
+    df = read_table(data_dir, table, columns=STAR_SOURCE_COLUMNS[table])
+    return df.drop_duplicates(incremental.UPSERT_KEYS[table], keep='last')
+
+
+def _project_source(df, table):
+    columns = STAR_SOURCE_COLUMNS[table]
+    return df if columns is None else df[columns]
+
+
+def build_star(data_dir, ids=None):
+    """원시 Olist 테이블에서 그레인별 팩트 테이블과 차원 테이블을 만듭니다.
+
+    모든 ID 컬럼은 수집 직후 int32 코드로 바뀌므로 이후 조인과 필터는 정수 연산입니다.
+    """
+    if ids is None:
+        ids = load_id_dictionary(data_dir)
+
+    # 서로 독립인 원시 테이블은 동시에 읽고, ID 인코딩은 코드 순서가 일정하도록 순서대로 적용
+    raw = run_parallel({
+        "orders": (_read_latest, data_dir, "orders"),
+        "order_items": (_read_latest, data_dir, "order_items"),
+        "order_payments": (_read_latest, data_dir, "order_payments"),
+        "order_reviews": (_read_latest, data_dir, "order_reviews"),
+        "customers": (_read_latest, data_dir, "customers"),
+        "dim_products": (_build_dim_products, data_dir),
+        "dim_sellers": (_build_dim_sellers, data_dir),
+    })
+    orders = ids.encode_frame(raw["orders"])
+    items = ids.encode_frame(raw["order_items"])
+    payments = ids.encode_frame(raw["order_payments"])
+    reviews = ids.encode_frame(raw["order_reviews"])
+    customers = ids.encode_frame(raw["customers"])
+
+    dim_products = ids.encode_frame(raw["dim_products"])
+    dim_sellers = ids.encode_frame(raw["dim_sellers"])
+
+    fact_orders, fact_items = _assemble_facts(orders, items, payments, reviews, customers, dim_products)
+
+    ids.save()
+    return {
+        "fact_orders": fact_orders,
+        "fact_items": fact_items,
+        "fact_payments": payments,
+        "fact_reviews": reviews,
+        "dim_customers": customers,
+        "dim_products": dim_products,
+        "dim_sellers": dim_sellers,
+    }
+
+
+# ====== 증분 병합 ======
+def _concat(frames):
+    """카테고리 컬럼이 object 로 풀리지 않도록 이어 붙인 뒤 다시 카테고리로 맞춥니다."""
+    categorical = [c for c in frames[0].columns if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]
+    df = pd.concat(frames, ignore_index=True)
+    for col in categorical:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def _upsert(stored, delta, keys):
+    """같은 키는 새 행으로 덮어씁니다."""
+    return _concat([stored[delta.columns], delta]).drop_duplicates(keys, keep='last')
+
+
+def _merge_deltas(stored, deltas):
+    """새로 들어온 행이 닿는 주문만 다시 계산해 저장된 팩트 테이블에 병합합니다."""
+    keys = incremental.UPSERT_KEYS
+    affected = pd.unique(pd.concat([
+        deltas[table]['order_id'] for table in ("orders", "order_items", "order_payments", "order_reviews")
+    ], ignore_index=True))
+
+    prev_orders = stored['fact_orders']
+    orders_hit = prev_orders['order_id'].isin(affected).to_numpy()
+    items_hit = stored['fact_items']['order_id'].isin(affected).to_numpy()
+    payments_hit = stored['fact_payments']['order_id'].isin(affected).to_numpy()
+    reviews_hit = stored['fact_reviews']['order_id'].isin(affected).to_numpy()
+    customers_hit = stored['dim_customers']['customer_id'].isin(deltas['customers']['customer_id']).to_numpy()
+
+    orders = _upsert(prev_orders[orders_hit], deltas['orders'], keys['orders'])
+    items = _upsert(stored['fact_items'][items_hit], deltas['order_items'], keys['order_items'])
+    payments = _upsert(stored['fact_payments'][payments_hit], deltas['order_payments'], keys['order_payments'])
+    # 해당 주문의 저장된 리뷰 + 새 리뷰로 평균을 다시 내므로, 기존 리뷰가 있는 주문에 리뷰가 추가/수정돼도 정확
+    reviews = _upsert(stored['fact_reviews'][reviews_hit], deltas['order_reviews'], keys['order_reviews'])
+    # 고객 차원은 새로 들어온 고객 행만 교체 (read_delta 가 같은 키의 중복을 이미 정리)
+    dim_customers = _concat([
+        stored['dim_customers'][~customers_hit], deltas['customers'][stored['dim_customers'].columns]])
+    customers = dim_customers[dim_customers['customer_id'].isin(orders['customer_id'])]
+
+    new_orders, new_items = _assemble_facts(
+        orders, items, payments, reviews, customers, stored['dim_products'])
+
+    tables = dict(stored)
+    tables['fact_orders'] = _concat([prev_orders[~orders_hit], new_orders[prev_orders.columns]])
+    tables['fact_items'] = _concat([stored['fact_items'][~items_hit], new_items[stored['fact_items'].columns]])
+    tables['fact_payments'] = _concat([stored['fact_payments'][~payments_hit], payments])
+    tables['fact_reviews'] = _concat([stored['fact_reviews'][~reviews_hit], reviews])
+    tables['dim_customers'] = dim_customers
+    changed = int(pd.Series(affected).isin(prev_orders['order_id']).sum())
+    return tables, len(affected) - changed, changed
+
+
+def update_star(data_dir, ids=None):
+    """공유 스타 스키마를 최신으로 맞춥니다.
+
+    워터마크가 있고 원본 CSV 에 행만 추가됐다면 새 행(과 그 행이 닿는 주문)만 병합하고,
+    처음이거나 파일이 다시 쓰였거나 차원 테이블이 바뀌었으면 전체를 다시 만듭니다.
+    """
+    if ids is None:
+        ids = load_id_dictionary(data_dir)
+
+    watermark = incremental.load_watermark(data_dir)
+    stored_ok = all(os.path.exists(shared_store.table_path(data_dir, name)) for name in STAR_TABLES)
+
+    deltas, state = {}, None
+    if watermark is not None and stored_ok and not incremental.dimensions_changed(data_dir, watermark):
+        state = dict(watermark["tables"])
+        results = run_parallel({
+            table: (incremental.read_delta, data_dir, table, watermark) for table in incremental.INCREMENTAL_TABLES
+        })
+        for table in incremental.INCREMENTAL_TABLES:
+            delta, table_state = results[table]
+            if delta is None:
+                state = None
+                break
+            deltas[table] = ids.encode_frame(_project_source(delta, table))
+            state[table] = table_state
+
+    if state is None:
+        state = incremental.capture_state(data_dir)
+        tables = build_star(data_dir, ids)
+        summary = {"mode": "full", "new_orders": len(tables['fact_orders']), "changed_orders": 0}
+    elif all(delta.empty for delta in deltas.values()):
+        tables = None
+        summary = {"mode": "unchanged", "new_orders": 0, "changed_orders": 0}
+    else:
+        tables, new_count, changed_count = _merge_deltas(shared_store.open_tables(data_dir, STAR_TABLES), deltas)
+        ids.save()
+        summary = {"mode": "incremental", "new_orders": new_count, "changed_orders": changed_count}
+
+    if tables is not None:
+        # 팩트 테이블은 구매 시각 순으로 저장해 두어 탭에서 기간을 이분 탐색으로 자릅니다
+        tables['fact_orders'] = sort_by_time(tables['fact_orders'], tie_breakers=['order_id'])
+        tables['fact_items'] = sort_by_time(tables['fact_items'], tie_breakers=['order_id', 'order_item_id'])
+        shared_store.write_tables(data_dir, tables)
+        fact_orders = tables['fact_orders']
+    else:
+        # 원본 mtime 만 바뀐 경우: 공유 파일이 최신으로 보이도록 시각만 갱신
+        shared_store.touch_tables(data_dir, STAR_TABLES)
+        fact_orders = shared_store.open_table(data_dir, 'fact_orders')
+    watermark = incremental.save_watermark(data_dir, state, fact_orders)
+    summary["watermark"] = watermark["order_purchase_timestamp"]
+    return summary
+
+
+# 스타 스키마 캐시 키에 들어가는 원본 CSV 목록 (data_dir 기준)
+STAR_SOURCE_FILES = [TABLE_SCHEMAS[table]["file"] for table in STAR_SOURCES]
+register_dependencies(f"{__name__}.load_star", STAR_SOURCE_FILES)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_star(data_dir, source_signature):
+    ids = get_id_dictionary(data_dir)
+    if not shared_store.is_fresh(data_dir, STAR_TABLES):
+        update_star(data_dir, ids)
+    # 다른 프로세스가 만든 파일이면 그 프로세스가 추가한 ID 코드까지 반영
+    ids.refresh()
+    return {name: shared_store.open_arrow(data_dir, name) for name in STAR_TABLES}
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _load_projection(data_dir, source_signature, name, columns):
+    return shared_store.to_frame(_load_star(data_dir, source_signature)[name], columns)
+
+
+def load_star(data_dir):
+    """프로세스 전체에서 공유하는 스타 스키마 (테이블 이름 -> 메모리 매핑된 Arrow 테이블).
+
+    테이블은 공유 폴더의 Arrow IPC 파일을 메모리 매핑으로 열기 때문에
+    같은 호스트의 여러 대시보드 프로세스가 한 벌의 물리 메모리를 함께 씁니다.
+    원본 CSV 의 크기/mtime 이 캐시 키에 포함되어, 데이터가 갱신되면 재시작 없이 다시 엽니다.
+    """
+    return _load_star(data_dir, dependency_signature(data_dir, STAR_SOURCE_FILES))
+
+
+def get_table(data_dir, name, columns=None):
+    """공유 스타 스키마에서 팩트/차원 테이블 하나를 반환합니다 (읽기 전용, 수정 시 복사본을 만드세요).
+
+    columns 를 주면 그 컬럼만 DataFrame 으로 올리므로, 탭마다 필요한 컬럼을 선언해 두고 넘기세요.
+    """
+    if name not in STAR_TABLES:
+        raise KeyError(f"알 수 없는 테이블: {name}")
+    signature = dependency_signature(data_dir, STAR_SOURCE_FILES)
+    if columns is not None:
+        columns = tuple(columns)
+        missing = set(columns) - set(_load_star(data_dir, signature)[name].column_names)
+        if missing:
+            raise KeyError(f"{name} 에 없는 컬럼: {sorted(missing)}")
+    return _load_projection(data_dir, signature, name, columns)
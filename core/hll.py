@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from core.ids import MISSING_CODE
+from core.time_index import range_bounds
+
+
+# ====== HyperLogLog ======
+HLL_PRECISION = 12            # 레지스터 2^12 = 4096 개, 표준 오차 약 1.6%
+EXACT_LIMIT = 20_000          # 구간 행 수가 이 이하이면 정확히 계산 (Olist 기준 약 2~3개월 구간)
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def hash64(values):
+    """정수 코드 배열을 64비트 해시로 섞습니다 (splitmix64, 실행마다 같은 값)."""
+    x = np.asarray(values).astype('uint64') + np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over='ignore'):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return (x ^ (x >> np.uint64(31))) & _MASK64
+
+
+def _bit_length(x):
+    """uint64 배열 원소별 비트 길이 (부동소수점 없이 이분 탐색)."""
+    length = np.zeros(len(x), dtype='int64')
+    x = x.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.uint64(1) << np.uint64(shift))
+        length[big] += shift
+        x[big] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+def registers_of(values, precision=HLL_PRECISION):
+    """값마다 (레지스터 번호, 순위) 를 계산합니다."""
+    h = hash64(values)
+    tail_bits = 64 - precision
+    index = (h >> np.uint64(tail_bits)).astype('int64')
+    tail = h & np.uint64((1 << tail_bits) - 1)
+    rank = (tail_bits - _bit_length(tail) + 1).astype('uint8')
+    return index, rank
+
+
+def estimate(registers):
+    """레지스터 배열(마지막 축)에서 고유 개수를 추정합니다 (작은 값은 선형 계수 보정)."""
+    registers = np.asarray(registers)
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype('float64')), axis=-1)
+    zeros = np.count_nonzero(registers == 0, axis=-1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+def _known(values):
+    """결측과 정수 ID 의 결측 코드(MISSING_CODE)를 뺀 마스크."""
+    values = np.asarray(values)
+    valid = ~pd.isna(values)
+    if values.dtype.kind in 'iu':
+        valid &= values != MISSING_CODE
+    return valid
+
+
+class DailySketches:
+    """일자별 HyperLogLog 레지스터 (n_days, m). 임의 기간의 스케치는 해당 행들의 최댓값으로 합쳐집니다."""
+
+    def __init__(self, days, values, precision=HLL_PRECISION):
+        days = pd.DatetimeIndex(days).normalize()
+        valid = ~days.isna() & _known(values)
+        days, values = days[valid], np.asarray(values)[valid]
+        self.first_day = days.min() if len(days) else pd.Timestamp(0)
+        self.n_days = (days.max() - self.first_day).days + 1 if len(days) else 0
+        self.registers = np.zeros((self.n_days, 1 << precision), dtype='uint8')
+        if len(days):
+            index, rank = registers_of(values, precision)
+            day_index = (days - self.first_day).days.to_numpy()
+            np.maximum.at(self.registers, (day_index, index), rank)
+
+    def merged(self, start_date, end_date):
+        """기간 [start_date, end_date] 를 합친 레지스터 한 벌."""
+        lo = min(max((pd.Timestamp(start_date) - self.first_day).days, 0), self.n_days)
+        hi = min(max((pd.Timestamp(end_date) - self.first_day).days + 1, lo), self.n_days)
+        if hi == lo:
+            return np.zeros(self.registers.shape[1], dtype='uint8')
+        return self.registers[lo:hi].max(axis=0)
+
+    def count(self, start_date, end_date):
+        return int(round(float(estimate(self.merged(start_date, end_date)))))
+
+
+def union_count(sketches, start_date, end_date):
+    """여러 필터 값(예: 주별로 만든 스케치)의 합집합 고유 개수."""
+    if not sketches:
+        return 0
+    merged = np.maximum.reduce([s.merged(start_date, end_date) for s in sketches])
+    return int(round(float(estimate(merged))))
+
+
+# ====== 구간 고유 개수 ======
+class DistinctCounter:
+    """시간 정렬된 프레임의 기간별(필터별) 고유 개수.
+
+    구간 행 수가 exact_limit 이하이면 정확히 세고, 그보다 크면 일별 스케치를 합쳐 추정합니다.
+    where={차원 컬럼: 값 목록} 필터는 값별 스케치의 합집합으로 추정하며, 두 개 이상의 차원을 함께 거르면
+    스케치로 교집합을 낼 수 없으므로 정확히 셉니다. 스케치는 처음 필요할 때 만들어 보관합니다.
+    """
+
+    def __init__(self, frame, columns, time_column='order_purchase_timestamp', exact_limit=EXACT_LIMIT):
+        self.frame = frame
+        self.time_column = time_column
+        self.exact_limit = exact_limit
+        self.columns = list(columns)
+        self.sketches = {}
+
+    def sketch(self, column, dimension=None, value=None):
+        """column 의 일별 스케치 (dimension 을 주면 그 차원이 value 인 행만)."""
+        key = (column, dimension, value)
+        if key not in self.sketches:
+            frame = self.frame if dimension is None else self.frame[self.frame[dimension] == value]
+            self.sketches[key] = DailySketches(frame[self.time_column], frame[column].to_numpy())
+        return self.sketches[key]
+
+    def is_estimate(self, start_date, end_date, where=None):
+        """이 구간/필터의 count 가 스케치 추정값인지 (정확한 값이면 False)."""
+        lo, hi = range_bounds(self.frame[self.time_column].to_numpy(), start_date, end_date)
+        return hi - lo > self.exact_limit and len(where or {}) <= 1
+
+    def count(self, column, start_date, end_date, where=None):
+        if column not in self.columns:
+            raise KeyError(f"고유 개수를 세지 않는 컬럼: {column}")
+        where = where or {}
+        if not self.is_estimate(start_date, end_date, where):
+            lo, hi = range_bounds(self.frame[self.time_column].to_numpy(), start_date, end_date)
+            rows = self.frame.iloc[lo:hi]
+            for dimension, values in where.items():
+                rows = rows[rows[dimension].isin(values)]
+            values = rows[column].to_numpy()
+            return int(pd.unique(values[_known(values)]).size)
+        if not where:
+            return self.sketch(column).count(start_date, end_date)
+        dimension, values = next(iter(where.items()))
+        return union_count([self.sketch(column, dimension, value) for value in values], start_date, end_date)
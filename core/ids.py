@@ -0,0 +1,212 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.ingest import COLUMNAR_DIR_NAME, TABLE_SCHEMAS, read_table, run_parallel
+
+
+# 정수 코드로 바꾸는 32자리 hex ID 컬럼
+ID_COLUMNS = ("order_id", "seller_id", "customer_id", "customer_unique_id", "product_id")
+
+# 각 ID 종류의 기준 테이블 (사전 초기화 시 정렬된 순서로 코드를 부여)
+ID_SOURCES = {
+    "seller_id": "sellers",
+    "product_id": "products",
+    "customer_id": "customers",
+    "customer_unique_id": "customers",
+    "order_id": "orders",
+}
+
+# 결측 ID 에 부여하는 코드
+MISSING_CODE = -1
+
+ID_DICTIONARY_FILE = "id_dictionary.parquet"
+LOCK_TIMEOUT = 30             # 초, 이보다 오래된 잠금 파일은 죽은 프로세스가 남긴 것으로 보고 치움
+
+
+@contextmanager
+def _file_lock(path, timeout=LOCK_TIMEOUT):
+    """여러 대시보드 프로세스가 같은 사전 파일을 동시에 고치지 않도록 잡는 잠금 (잠금 파일 생성 기반)."""
+    lock_path = path + ".lock"
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > timeout:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"ID 사전 잠금을 얻지 못했습니다: {lock_path}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+class IdDictionary:
+    """32자리 hex ID <-> int32 코드 사전.
+
+    코드는 추가만 되고(append-only) 바뀌지 않으므로, 한 번 인코딩된 프레임은
+    사전이 커져도 그대로 유효합니다. 화면 표시 직전에만 decode 하세요.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index = {kind: pd.Index([], dtype=object) for kind in ID_COLUMNS}
+        if path and os.path.exists(path):
+            stored = pd.read_parquet(path)
+            for kind, group in stored.groupby('kind', sort=False):
+                if kind in self._index:
+                    self._index[kind] = pd.Index(group['value'].to_numpy(dtype=object))
+
+    def refresh(self):
+        """다른 프로세스가 저장한 사전이 더 길면 그 내용으로 맞춥니다 (추가 전용이므로 기존 코드는 그대로)."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        stored = pd.read_parquet(self.path)
+        with self._lock:
+            for kind, group in stored.groupby('kind', sort=False):
+                if kind in self._index and len(group) > len(self._index[kind]):
+                    self._index[kind] = pd.Index(group['value'].to_numpy(dtype=object))
+
+    def __len__(self):
+        return sum(len(idx) for idx in self._index.values())
+
+    def size(self, kind):
+        return len(self._index[kind])
+
+    def encode(self, kind, values):
+        """ID 배열을 int32 코드 배열로 바꿉니다. 처음 보는 ID 는 사전 끝에 추가됩니다."""
+        values = pd.Series(values, copy=False)
+        valid = values.notna().to_numpy()
+        codes = self._index[kind].get_indexer(values)
+        unseen = valid & (codes == MISSING_CODE)
+        if unseen.any():
+            with self._lock:
+                # 다른 스레드가 먼저 추가했을 수 있으므로 잠금 안에서 다시 확인
+                codes = self._index[kind].get_indexer(values)
+                unseen = valid & (codes == MISSING_CODE)
+                if unseen.any():
+                    new_values = pd.unique(values[unseen].to_numpy(dtype=object))
+                    self._index[kind] = self._index[kind].append(pd.Index(new_values, dtype=object))
+                    codes = self._index[kind].get_indexer(values)
+        codes[~valid] = MISSING_CODE
+        return codes.astype('int32')
+
+    def lookup(self, kind, values):
+        """사전에 이미 있는 ID 의 코드만 찾습니다. 처음 보는 ID 와 결측은 MISSING_CODE 이고 사전은 바뀌지 않습니다."""
+        return self._index[kind].get_indexer(pd.Series(values, copy=False)).astype('int32')
+
+    def register(self, kind, values):
+        """처음 보는 ID 를 사전에 추가하고 바로 저장한 뒤 코드를 반환합니다.
+
+        잠금 안에서 다른 프로세스가 저장한 사전을 먼저 반영하므로, 같은 ID 는 모든 프로세스에서 같은 코드가 됩니다.
+        """
+        codes = self.lookup(kind, values)
+        unseen = pd.Series(values, copy=False).notna().to_numpy() & (codes == MISSING_CODE)
+        if not unseen.any():
+            return codes
+        if not self.path:
+            return self.encode(kind, values)
+        with _file_lock(self.path):
+            self.refresh()
+            before = self.size(kind)
+            codes = self.encode(kind, values)
+            if self.size(kind) > before:
+                self._write(self.path)
+        return codes
+
+    def decode(self, kind, codes):
+        """int32 코드 배열을 원래 ID 문자열 배열로 되돌립니다 (표시용)."""
+        codes = np.asarray(codes, dtype='int64')
+        table = self._index[kind].to_numpy(dtype=object)
+        out = np.full(len(codes), None, dtype=object)
+        valid = codes >= 0
+        out[valid] = table[codes[valid]]
+        return out
+
+    def decode_one(self, kind, code):
+        if code is None or int(code) < 0 or int(code) >= len(self._index[kind]):
+            return None
+        return self._index[kind][int(code)]
+
+    def encode_frame(self, df, columns=ID_COLUMNS, append=True):
+        """프레임에 있는 ID 컬럼을 모두 정수 코드로 바꾼 새 프레임을 반환합니다.
+
+        append=False 이면 사전을 늘리지 않고 lookup 으로 찾습니다 (없는 ID 는 MISSING_CODE).
+        """
+        return self._convert_frame(df, columns, self.encode if append else self.lookup)
+
+    def register_frame(self, df, columns=ID_COLUMNS):
+        """encode_frame 과 같지만 새 ID 는 register 로 바로 저장합니다 (사전 저장 단계가 없는 탭 로더용)."""
+        return self._convert_frame(df, columns, self.register)
+
+    def _convert_frame(self, df, columns, convert):
+        targets = [c for c in columns if c in df.columns and df[c].dtype.kind not in 'iu']
+        if not targets:
+            return df
+        df = df.copy()
+        for col in targets:
+            df[col] = convert(col, df[col])
+        return df
+
+    def seed(self, kind, values):
+        """정렬된 순서로 코드를 부여해 두어, 코드 순서가 ID 문자열 순서와 같아지도록 합니다."""
+        unique_values = pd.Series(pd.unique(pd.Series(values).dropna().to_numpy(dtype=object)))
+        self.encode(kind, unique_values.sort_values(ignore_index=True))
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        with _file_lock(path):
+            self._write(path)
+
+    def _write(self, path):
+        with self._lock:
+            stored = pd.DataFrame({
+                'kind': np.concatenate([np.full(len(idx), kind, dtype=object) for kind, idx in self._index.items()]),
+                'value': np.concatenate([idx.to_numpy(dtype=object) for idx in self._index.values()]),
+            })
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        stored.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+def id_dictionary_path(data_dir):
+    return os.path.join(data_dir, COLUMNAR_DIR_NAME, ID_DICTIONARY_FILE)
+
+
+def load_id_dictionary(data_dir):
+    """저장된 ID 사전을 열고, 아직 코드가 없는 기준 테이블의 ID 를 정렬 순서로 등록합니다."""
+    ids = IdDictionary(id_dictionary_path(data_dir))
+    tasks = {}
+    for kind, table in ID_SOURCES.items():
+        csv_path = os.path.join(data_dir, TABLE_SCHEMAS[table]["file"])
+        if ids.size(kind) == 0 and os.path.exists(csv_path):
+            tasks[kind] = (read_table, data_dir, table, [kind])
+    # 기준 테이블은 동시에 읽고, 코드 부여는 ID 종류 순서대로
+    for kind, df in run_parallel(tasks).items():
+        ids.seed(kind, df[kind])
+    ids.save()
+    return ids
+
+
+@st.cache_resource(show_spinner=False)
+def get_id_dictionary(data_dir):
+    """프로세스 전역 ID 사전 (모든 탭이 같은 코드를 공유)."""
+    return load_id_dictionary(data_dir)
@@ -0,0 +1,148 @@
+import io
+import os
+import sys
+import json
+import hashlib
+import pandas as pd
+
+from core.ingest import STAR_SOURCES, TABLE_SCHEMAS, apply_schema
+from core import shared_store
+
+
+# ====== 증분 수집 대상 ======
+# 주문/상품/결제/리뷰/고객 CSV 는 끝에 행이 추가되는(append-only) 파일로 보고,
+# 지난번에 읽은 위치(byte offset) 이후의 새 행만 읽어 저장된 팩트 테이블에 병합합니다.
+INCREMENTAL_TABLES = ("orders", "order_items", "order_payments", "order_reviews", "customers")
+
+# 같은 키의 행이 다시 들어오면 마지막 행이 이깁니다 (상태 변경, 배송 완료 시각 갱신 등)
+UPSERT_KEYS = {
+    "orders": ["order_id"],
+    "order_items": ["order_id", "order_item_id"],
+    "order_payments": ["order_id", "payment_sequential"],
+    "order_reviews": ["review_id", "order_id"],
+    "customers": ["customer_id"],
+}
+
+WATERMARK_FILE = "watermark.json"
+
+# 파일이 통째로 다시 쓰였는지 확인할 때 비교하는 앞부분 길이
+HEAD_BYTES = 64 * 1024
+
+
+def watermark_path(data_dir):
+    return os.path.join(shared_store.shared_dir(data_dir), WATERMARK_FILE)
+
+
+def _head_digest(path, length):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(min(length, HEAD_BYTES)), digest_size=16).hexdigest()
+
+
+def _file_state(path, offset):
+    return {
+        "offset": offset,
+        "size": os.path.getsize(path),
+        "mtime": os.path.getmtime(path),
+        "head": _head_digest(path, offset),
+    }
+
+
+def capture_state(data_dir):
+    """전체 재구축 직전의 원본 파일 상태 (읽기 전에 기록하므로 읽는 중 추가된 행은 다음 증분에서 다시 병합됩니다)."""
+    state = {}
+    for table in STAR_SOURCES:
+        path = os.path.join(data_dir, TABLE_SCHEMAS[table]["file"])
+        if os.path.exists(path):
+            state[table] = _file_state(path, os.path.getsize(path))
+    return state
+
+
+# ====== 워터마크 ======
+def load_watermark(data_dir):
+    path = watermark_path(data_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermark(data_dir, state, fact_orders):
+    """읽은 위치와 마지막 주문 시각(order_purchase_timestamp)을 기록합니다."""
+    last_ts = fact_orders['order_purchase_timestamp'].max()
+    watermark = {
+        "order_purchase_timestamp": None if pd.isna(last_ts) else pd.Timestamp(last_ts).isoformat(),
+        "order_count": int(len(fact_orders)),
+        "tables": state,
+    }
+    path = watermark_path(data_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(watermark, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return watermark
+
+
+def dimensions_changed(data_dir, watermark):
+    """상품/셀러/번역 등 증분 대상이 아닌 테이블이 바뀌었으면 전체 재구축이 필요합니다."""
+    tables = watermark.get("tables", {})
+    for table in STAR_SOURCES:
+        if table in INCREMENTAL_TABLES:
+            continue
+        path = os.path.join(data_dir, TABLE_SCHEMAS[table]["file"])
+        prev = tables.get(table)
+        if not os.path.exists(path):
+            if prev is not None:
+                return True
+            continue
+        if prev is None or prev["size"] != os.path.getsize(path) or prev["mtime"] != os.path.getmtime(path):
+            return True
+    return False
+
+
+# ====== 새 행 읽기 ======
+def read_delta(data_dir, table, watermark):
+    """지난 워터마크 이후 CSV 끝에 추가된 행만 읽습니다.
+
+    반환값은 (새 행 DataFrame, 갱신된 파일 상태) 이며, 파일이 잘리거나 앞부분이
+    바뀌어 이어 읽을 수 없으면 (None, None) 을 반환합니다 (전체 재구축 필요).
+    """
+    schema = TABLE_SCHEMAS[table]
+    path = os.path.join(data_dir, schema["file"])
+    prev = watermark.get("tables", {}).get(table)
+    if prev is None or not os.path.exists(path):
+        return None, None
+
+    size = os.path.getsize(path)
+    offset = prev["offset"]
+    if size < offset or _head_digest(path, offset) != prev["head"]:
+        return None, None
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(offset)
+        chunk = f.read(size - offset)
+
+    # 쓰는 중인 마지막 줄은 다음 번에 읽도록 마지막 줄바꿈까지만 사용
+    end = chunk.rfind(b"\n") + 1
+    chunk = chunk[:end]
+
+    columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+    if chunk.strip():
+        df = pd.read_csv(io.BytesIO(chunk), header=None, names=columns, dtype=schema["dtypes"] or None)
+    else:
+        df = pd.read_csv(io.BytesIO(header), dtype=schema["dtypes"] or None)
+    df = apply_schema(df, table)
+    df = df.drop_duplicates(UPSERT_KEYS[table], keep='last')
+    return df, _file_state(path, offset + end)
+
+
+if __name__ == "__main__":
+    from core.facts import update_star
+    from core.ids import load_id_dictionary
+
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_commerce")
+    summary = update_star(target_dir, load_id_dictionary(target_dir))
+    for key, value in summary.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,166 @@
+import os
+import sys
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 컬럼형 캐시 폴더 이름 (원본 CSV와 같은 폴더 아래에 생성)
+COLUMNAR_DIR_NAME = ".columnar"
+
+# 여러 테이블을 동시에 읽을 때 쓰는 최대 스레드 수
+LOADER_THREADS = min(8, os.cpu_count() or 4)
+
+# ====== Olist 원시 테이블 스키마 ======
+# file: data_commerce 내 원본 CSV 파일명
+# dates: 수집 시점에 미리 파싱할 타임스탬프 컬럼
+# categories: 카테고리형으로 인코딩할 저카디널리티 컬럼
+# dtypes: read_csv 단계에서 고정할 숫자형 타입
+TABLE_SCHEMAS = {
+    "orders": {
+        "file": "olist_orders_dataset.csv",
+        "dates": [
+            "order_purchase_timestamp", "order_approved_at",
+            "order_delivered_carrier_date", "order_delivered_customer_date",
+            "order_estimated_delivery_date",
+        ],
+        "categories": ["order_status"],
+        "dtypes": {},
+    },
+    "order_items": {
+        "file": "olist_order_items_dataset.csv",
+        "dates": ["shipping_limit_date"],
+        "categories": [],
+        "dtypes": {"order_item_id": "int16", "price": "float64", "freight_value": "float64"},
+    },
+    "order_payments": {
+        "file": "olist_order_payments_dataset.csv",
+        "dates": [],
+        "categories": ["payment_type"],
+        "dtypes": {"payment_sequential": "int16", "payment_installments": "int16", "payment_value": "float64"},
+    },
+    "order_reviews": {
+        "file": "olist_order_reviews_dataset.csv",
+        "dates": ["review_creation_date", "review_answer_timestamp"],
+        "categories": [],
+        "dtypes": {"review_score": "int8"},
+    },
+    "customers": {
+        "file": "olist_customers_dataset.csv",
+        "dates": [],
+        "categories": ["customer_state"],
+        "dtypes": {},
+    },
+    "products": {
+        "file": "olist_products_dataset.csv",
+        "dates": [],
+        "categories": [],
+        "dtypes": {},
+    },
+    "sellers": {
+        "file": "olist_sellers_dataset.csv",
+        "dates": [],
+        "categories": ["seller_state"],
+        "dtypes": {},
+    },
+    "category_translation": {
+        "file": "product_category_name_translation.csv",
+        "dates": [],
+        "categories": [],
+        "dtypes": {},
+    },
+    "geolocation": {
+        "file": "olist_geolocation_dataset.csv",
+        "dates": [],
+        "categories": ["geolocation_state"],
+        "dtypes": {"geolocation_lat": "float64", "geolocation_lng": "float64"},
+    },
+}
+
+# 스타 스키마를 만드는 원시 테이블 (geolocation 은 셀러 파이프라인만 읽으므로 스타 스키마 캐시 키와 증분 상태에서 제외)
+STAR_SOURCES = tuple(table for table in TABLE_SCHEMAS if table != "geolocation")
+
+
+def columnar_path(csv_path):
+    """CSV 파일에 대응하는 Parquet 캐시 경로를 반환합니다."""
+    folder, file_name = os.path.split(csv_path)
+    base_name = os.path.splitext(file_name)[0]
+    return os.path.join(folder, COLUMNAR_DIR_NAME, base_name + ".parquet")
+
+
+def _is_fresh(csv_path, parquet_path):
+    if not os.path.exists(parquet_path):
+        return False
+    return os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+
+
+def apply_schema(df, table):
+    """read_csv 결과에 날짜 파싱과 카테고리 인코딩을 적용합니다."""
+    schema = TABLE_SCHEMAS[table]
+    for col in schema["dates"]:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in schema["categories"]:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def convert_csv(csv_path, table):
+    """원본 CSV를 타입이 지정된 Parquet 파일로 한 번 변환합니다."""
+    schema = TABLE_SCHEMAS[table]
+    df = apply_schema(pd.read_csv(csv_path, dtype=schema["dtypes"] or None), table)
+
+    parquet_path = columnar_path(csv_path)
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+
+    # 여러 프로세스/스레드가 동시에 변환해도 깨진 파일이 보이지 않도록 임시 파일 후 교체
+    tmp_path = f"{parquet_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def read_typed(csv_path, table, columns=None):
+    """CSV에 대응하는 컬럼형 파일을 읽습니다. 캐시가 없거나 오래됐으면 먼저 변환합니다."""
+    parquet_path = columnar_path(csv_path)
+    if not _is_fresh(csv_path, parquet_path):
+        convert_csv(csv_path, table)
+    return pd.read_parquet(parquet_path, columns=columns)
+
+
+def read_table(data_dir, table, columns=None):
+    """data_commerce 폴더의 Olist 테이블을 컬럼형 캐시에서 읽습니다."""
+    csv_path = os.path.join(data_dir, TABLE_SCHEMAS[table]["file"])
+    return read_typed(csv_path, table, columns=columns)
+
+
+def run_parallel(tasks, max_workers=None):
+    """서로 독립인 읽기 작업 {이름: (함수, 인자...)} 을 스레드 풀에서 동시에 실행합니다.
+
+    Parquet 디코딩과 CSV 파싱은 대부분 GIL 밖에서 돌기 때문에, 전체 시간이
+    파일별 시간의 합이 아니라 가장 느린 파일 하나에 가까워집니다.
+    """
+    if not tasks:
+        return {}
+    workers = max_workers or min(LOADER_THREADS, len(tasks))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(task[0], *task[1:]) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def convert_all(data_dir):
+    """data_commerce 폴더에 있는 모든 Olist CSV를 변환하고 변환된 테이블 목록을 반환합니다."""
+    tasks = {}
+    for table, schema in TABLE_SCHEMAS.items():
+        csv_path = os.path.join(data_dir, schema["file"])
+        if os.path.exists(csv_path) and not _is_fresh(csv_path, columnar_path(csv_path)):
+            tasks[table] = (convert_csv, csv_path, table)
+    return list(run_parallel(tasks))
+
+
+if __name__ == "__main__":
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_commerce")
+    for name in convert_all(target_dir):
+        print(f"converted: {name}")
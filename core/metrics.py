@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.cache_keys import dependency_signature
+from core.facts import STAR_SOURCE_FILES, get_table
+from core.time_index import time_slice
+
+
+# ====== 지표에서 사용하는 컬럼 ======
+METRIC_COLUMNS = {
+    "fact_orders": [
+        'order_id', 'order_status', 'order_purchase_timestamp', 'customer_unique_id', 'customer_state',
+        'payment_value', 'uses_voucher', 'review_score', 'delivery_days', 'delay_days',
+        'items_price', 'items_freight',
+    ],
+    "fact_items": ['seller_id', 'order_status', 'order_purchase_timestamp', 'price'],
+}
+
+# (지표, 기간) 결과를 최근 사용 순으로 유지하는 개수
+METRIC_CACHE_SIZE = 256
+
+BLACK_FRIDAY_DAY = '2017-11-24'
+TOP_SHARE = 0.10              # 상위 10% 셀러/고객
+SELLER_TIER_CUTS = (0.10, 0.50)   # T1: 상위 10%, T2: 10-50%, T3: 나머지
+DELAY_THRESHOLD_DAYS = 2
+HIGH_FREIGHT_RATIO = 0.20
+MIN_GROUP_ORDERS = 30         # 비교 그룹 주문 수가 이보다 적으면 값을 내지 않음
+
+_REGISTRY = {}
+
+
+def register_metric(name):
+    """metric(orders, items) -> dict 함수를 이름으로 등록합니다 (orders/items 는 기간으로 잘린 배송 완료 팩트)."""
+    def decorator(func):
+        _REGISTRY[name] = func
+        return func
+    return decorator
+
+
+def metric_names():
+    return list(_REGISTRY)
+
+
+def load_period(data_dir, start_date, end_date):
+    """구매 시각으로 정렬된 팩트에서 기간을 잘라 배송 완료 주문/상품만 반환합니다."""
+    orders = time_slice(get_table(data_dir, "fact_orders", METRIC_COLUMNS["fact_orders"]), start_date, end_date)
+    items = time_slice(get_table(data_dir, "fact_items", METRIC_COLUMNS["fact_items"]), start_date, end_date)
+    return orders[orders['order_status'] == 'delivered'], items[items['order_status'] == 'delivered']
+
+
+def _top_share(values, share):
+    """값 상위 share 비율 주체가 차지하는 합계 비중."""
+    values = np.sort(np.asarray(values, dtype='float64'))[::-1]
+    total = values.sum()
+    if total <= 0:
+        return None
+    return float(values[:max(1, int(np.ceil(len(values) * share)))].sum() / total)
+
+
+# ====== 지표 ======
+@register_metric("black_friday_lift")
+def black_friday_lift(orders, items):
+    """블랙프라이데이 당일 매출 / 기간 내 다른 날의 일평균 매출."""
+    daily = orders.groupby(orders['order_purchase_timestamp'].dt.normalize())['payment_value'].sum()
+    bf_day = pd.Timestamp(BLACK_FRIDAY_DAY)
+    if bf_day not in daily.index or len(daily) < 2:
+        return {"lift": None}
+    others = daily.drop(bf_day)
+    return {"lift": float(daily[bf_day] / others.mean())}
+
+
+@register_metric("seller_concentration")
+def seller_concentration(orders, items):
+    """상위 10% 셀러 매출 비중과 T1/T2/T3 구간별 매출 비중(%)."""
+    revenue = np.sort(items.groupby('seller_id')['price'].sum().to_numpy())[::-1]
+    if len(revenue) == 0 or revenue.sum() <= 0:
+        return {"top_share": None, "tiers": None}
+    cuts = [int(np.ceil(len(revenue) * c)) for c in SELLER_TIER_CUTS]
+    parts = np.split(revenue, cuts)
+    tiers = [float(part.sum() / revenue.sum() * 100) for part in parts]
+    return {"top_share": _top_share(revenue, TOP_SHARE), "tiers": tiers}
+
+
+@register_metric("vip_share")
+def vip_share(orders, items):
+    """상위 10% 고객(customer_unique_id)의 결제액 비중."""
+    spend = orders.groupby('customer_unique_id')['payment_value'].sum()
+    return {"share": _top_share(spend, TOP_SHARE) if len(spend) else None}
+
+
+@register_metric("voucher_aov")
+def voucher_aov(orders, items):
+    """바우처 사용 주문과 미사용 주문의 평균 결제액."""
+    with_voucher = orders.loc[orders['uses_voucher'], 'payment_value']
+    without = orders.loc[~orders['uses_voucher'], 'payment_value']
+    if len(with_voucher) < MIN_GROUP_ORDERS or len(without) < MIN_GROUP_ORDERS:
+        return {"lift": None, "voucher": None, "regular": None}
+    return {"lift": float(with_voucher.mean() / without.mean() - 1),
+            "voucher": float(with_voucher.mean()), "regular": float(without.mean())}
+
+
+@register_metric("delay_review_drop")
+def delay_review_drop(orders, items):
+    """예정일보다 2일 이상 늦은 주문과 제때 도착한 주문의 평균 리뷰 점수."""
+    delay = orders['delay_days']
+    on_time = orders.loc[delay <= 0, 'review_score'].dropna()
+    delayed = orders.loc[delay >= DELAY_THRESHOLD_DAYS, 'review_score'].dropna()
+    if len(on_time) < MIN_GROUP_ORDERS or len(delayed) < MIN_GROUP_ORDERS:
+        return {"drop": None, "on_time": None, "delayed": None}
+    return {"drop": float(on_time.mean() - delayed.mean()),
+            "on_time": float(on_time.mean()), "delayed": float(delayed.mean())}
+
+
+@register_metric("state_delivery_gap")
+def state_delivery_gap(orders, items):
+    """주문이 충분한 고객 주 가운데 평균 배송 일수가 가장 짧은 주와 가장 긴 주."""
+    stats = orders.groupby('customer_state', observed=True)['delivery_days'].agg(['mean', 'count'])
+    stats = stats[stats['count'] >= MIN_GROUP_ORDERS].dropna()
+    if len(stats) < 2:
+        return {"gap": None, "fastest": None, "slowest": None}
+    fastest, slowest = stats['mean'].idxmin(), stats['mean'].idxmax()
+    return {"gap": float(stats.loc[slowest, 'mean'] - stats.loc[fastest, 'mean']),
+            "fastest": (str(fastest), float(stats.loc[fastest, 'mean'])),
+            "slowest": (str(slowest), float(stats.loc[slowest, 'mean']))}
+
+
+@register_metric("free_shipping_repurchase")
+def free_shipping_repurchase(orders, items):
+    """무료 배송 주문과 배송비 비중이 높은 주문의 재구매율 (기간 내 주문 2건 이상 고객 = 재구매)."""
+    repeat = orders['customer_unique_id'].map(orders['customer_unique_id'].value_counts()) > 1
+    ratio = orders['items_freight'] / orders['items_price']
+    free = repeat[orders['items_freight'] == 0]
+    high = repeat[ratio > HIGH_FREIGHT_RATIO]
+    if len(free) < MIN_GROUP_ORDERS or len(high) < MIN_GROUP_ORDERS:
+        return {"lift": None, "free": None, "high": None}
+    return {"lift": float(free.mean() - high.mean()), "free": float(free.mean()), "high": float(high.mean())}
+
+
+# ====== 조회 ======
+@st.cache_data(show_spinner=False, max_entries=METRIC_CACHE_SIZE)
+def _compute(name, data_dir, source_signature, start_date, end_date):
+    # st.cache_data 는 max_entries 를 넘으면 가장 오래 쓰이지 않은 항목부터 내보냅니다 (LRU)
+    orders, items = load_period(data_dir, start_date, end_date)
+    return _REGISTRY[name](orders, items)
+
+
+def compute_metric(name, data_dir, start_date, end_date):
+    """등록된 지표 하나를 기간에 대해 계산합니다 ((지표, 기간, 데이터 버전)별 캐시)."""
+    if name not in _REGISTRY:
+        raise KeyError(f"등록되지 않은 지표: {name}")
+    signature = dependency_signature(data_dir, STAR_SOURCE_FILES)
+    return _compute(name, data_dir, signature, pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date())
+
+
+def compute_metrics(data_dir, start_date, end_date, names=None):
+    return {name: compute_metric(name, data_dir, start_date, end_date) for name in (names or metric_names())}
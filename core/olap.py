@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from core.time_index import time_slice
+
+
+# ====== 일별 큐브 정의 ======
+# 일 x 셀러 x 카테고리 x 고객 주 x 가격대 그레인의 가산(additive) 측정값
+CUBE_DIMENSIONS = ['day', 'seller_id', 'category_eng', 'customer_state', 'price_bin']
+CUBE_MEASURES = [
+    'gmv', 'order_count', 'item_count', 'price', 'freight_value', 'item_payment_value',
+    'delivery_days_sum', 'delivery_days_count',
+]
+
+PRICE_BINS = [0, 50, 100, 200, 500, 1000, 5000]
+PRICE_LABELS = ['0-50', '50-100', '100-200', '200-500', '500-1k', '1k+']
+
+
+def build_daily_cube(orders, items):
+    """주문/상품 팩트를 큐브 그레인으로 미리 집계합니다.
+
+    상품 측정값(item_count, price, freight_value)은 각 상품 행에서, 주문 측정값(gmv, order_count,
+    delivery_days_*)은 주문의 첫 상품 행에 한 번만 얹어 어떤 조각을 합쳐도 중복 집계되지 않습니다.
+    item_payment_value 는 기존 KPI 탭의 가격대/셀러별 매출과 같도록 상품 행마다 주문 결제액 전체를 얹은 값입니다
+    (상품이 여러 개인 주문은 상품 수만큼 더해지므로 GMV 합계와는 다릅니다).
+    orders: order_id, order_purchase_timestamp, payment_value, delivery_days, customer_state
+    items: order_id, seller_id, category_eng, customer_state, price, freight_value, order_purchase_timestamp
+    """
+    rows = pd.DataFrame({
+        'order_id': items['order_id'].to_numpy(),
+        'day': items['order_purchase_timestamp'].dt.normalize().to_numpy(),
+        'seller_id': items['seller_id'].to_numpy(),
+        'category_eng': items['category_eng'].fillna('unknown').to_numpy(),
+        'customer_state': items['customer_state'].to_numpy(),
+        'price_bin': pd.cut(items['price'], bins=PRICE_BINS, labels=PRICE_LABELS).to_numpy(),
+        'item_count': 1,
+        'price': items['price'].to_numpy(dtype='float64'),
+        'freight_value': items['freight_value'].to_numpy(dtype='float64'),
+        'item_payment_value': items['order_id'].map(orders.set_index('order_id')['payment_value'])
+                              .fillna(0.0).to_numpy(dtype='float64'),
+    })
+
+    # 상품이 없는 주문도 주문 측정값이 빠지지 않도록 빈 상품 차원으로 한 행 추가
+    order_rows = rows.drop_duplicates('order_id')
+    missing = orders[~orders['order_id'].isin(order_rows['order_id'])]
+    order_rows = pd.concat([order_rows[['order_id'] + CUBE_DIMENSIONS], pd.DataFrame({
+        'order_id': missing['order_id'].to_numpy(),
+        'day': missing['order_purchase_timestamp'].dt.normalize().to_numpy(),
+        'seller_id': -1,
+        'category_eng': 'unknown',
+        'customer_state': missing['customer_state'].to_numpy(),
+    })], ignore_index=True)
+    measures = orders.set_index('order_id')[['payment_value', 'delivery_days']]
+    order_rows = order_rows.join(measures, on='order_id', how='inner')
+    order_rows = order_rows.assign(
+        gmv=order_rows['payment_value'].fillna(0.0),
+        order_count=1,
+        delivery_days_sum=order_rows['delivery_days'].fillna(0.0),
+        delivery_days_count=order_rows['delivery_days'].notna().astype('int64'),
+    )
+
+    combined = pd.concat([rows, order_rows], ignore_index=True)
+    for col in CUBE_MEASURES:
+        combined[col] = combined[col].fillna(0)
+    combined['customer_state'] = combined['customer_state'].astype('category')
+    combined['price_bin'] = pd.Categorical(combined['price_bin'], categories=PRICE_LABELS, ordered=True)
+    cube = (combined.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)[CUBE_MEASURES].sum()
+            .reset_index().sort_values('day', kind='stable', ignore_index=True))
+    cube['order_count'] = cube['order_count'].astype('int64')
+    cube['item_count'] = cube['item_count'].astype('int64')
+    return cube
+
+
+def build_delivery_histogram(orders):
+    """일 x 배송 일수별 주문 수 (분포는 합/건수로 복원할 수 없어 별도로 둡니다)."""
+    delivered = orders.dropna(subset=['delivery_days'])
+    return (delivered.assign(day=delivered['order_purchase_timestamp'].dt.normalize())
+            .groupby(['day', 'delivery_days']).size().rename('order_count')
+            .reset_index().sort_values('day', kind='stable', ignore_index=True))
+
+
+class DailyPrefixSums:
+    """달력 일자(빈 날은 0)별 가산 측정값의 누적합. 임의 기간의 합계를 O(1) 로 계산합니다."""
+
+    def __init__(self, cube, measures=CUBE_MEASURES):
+        daily = cube.groupby('day')[list(measures)].sum()
+        days = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+        daily = daily.reindex(days, fill_value=0)
+        self.first_day = days[0]
+        self.n_days = len(days)
+        # 맨 앞에 0 을 붙여 [lo, hi) 구간 합을 sums[hi] - sums[lo] 로 구합니다
+        self.sums = {m: np.concatenate([[0], np.cumsum(daily[m].to_numpy())]) for m in measures}
+
+    def _position(self, date, offset=0):
+        return min(max((pd.Timestamp(date) - self.first_day).days + offset, 0), self.n_days)
+
+    def window(self, start_date, end_date):
+        """[start_date, end_date] 기간의 측정값 합계 {측정값: 합}."""
+        lo = self._position(start_date)
+        hi = max(self._position(end_date, offset=1), lo)
+        return {m: values[hi] - values[lo] for m, values in self.sums.items()}
+
+
+COMPARE_MODES = ("previous", "year")
+
+
+def comparison_window(start_date, end_date, mode):
+    """비교 기간: previous 는 바로 앞의 같은 길이 기간, year 는 1년 전 같은 기간."""
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    if mode == "previous":
+        prev_end = start - pd.Timedelta(days=1)
+        return (prev_end - (end - start)).date(), prev_end.date()
+    if mode == "year":
+        return (start - pd.DateOffset(years=1)).date(), (end - pd.DateOffset(years=1)).date()
+    raise ValueError(f"알 수 없는 비교 방식: {mode}")
+
+
+# ====== 조회 ======
+def slice_days(cube, start_date, end_date):
+    """일자 정렬된 큐브에서 [start_date, end_date] 구간을 이분 탐색으로 잘라냅니다 (복사 없음)."""
+    return time_slice(cube, start_date, end_date, column='day')
+
+
+def rollup(cube, by, measures=None):
+    """큐브 조각을 by 차원으로 다시 합칩니다 (by 는 컬럼명 또는 Series)."""
+    measures = list(measures or CUBE_MEASURES)
+    return cube.groupby(by, observed=True)[measures].sum()
+
+
+def mean_delivery_days(totals):
+    """큐브 조각 또는 window() 합계에서 평균 배송 일수."""
+    count = totals['delivery_days_count'].sum()
+    return totals['delivery_days_sum'].sum() / count if count else float('nan')
@@ -0,0 +1,51 @@
+import numpy as np
+import streamlit as st
+
+
+
+# ====== 셀러별 파티션 인덱스 ======
+class SellerIndex:
+    """seller_id 로 안정 정렬한 프레임과 셀러 코드별 연속 행 구간 [offsets[c], offsets[c + 1]).
+
+    셀러 코드는 ID 사전의 0 부터 시작하는 조밀한 정수이므로 배열 인덱싱 한 번으로 구간을 찾습니다.
+    같은 셀러 안의 행 순서와 원래 인덱스 라벨은 그대로 유지됩니다.
+    """
+
+    def __init__(self, frame, column='seller_id'):
+        codes = frame[column].to_numpy()
+        order = np.argsort(codes, kind='stable')
+        self.frame = frame.iloc[order]
+        self.column = column
+        sorted_codes = codes[order]
+        n_codes = int(sorted_codes[-1]) + 1 if len(sorted_codes) and sorted_codes[-1] >= 0 else 0
+        # 결측 코드(-1)는 맨 앞에 모이고 어떤 구간에도 속하지 않습니다
+        self.offsets = np.searchsorted(sorted_codes, np.arange(n_codes + 1), side='left')
+
+    def __len__(self):
+        return len(self.frame)
+
+    def bounds(self, seller_id):
+        if seller_id is None or not 0 <= seller_id < len(self.offsets) - 1:
+            return 0, 0
+        return int(self.offsets[seller_id]), int(self.offsets[seller_id + 1])
+
+    def get(self, seller_id):
+        lo, hi = self.bounds(seller_id)
+        return self.frame.iloc[lo:hi]
+
+
+def get_seller_slice(index, seller_id):
+    """셀러 한 명의 행 (frame[frame['seller_id'] == seller_id] 와 같은 결과, 복사 없는 조각)."""
+    return index.get(seller_id)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _build_index(name, base_dir, args, source_signature, _loader):
+    frame = _loader(base_dir, *args)
+    return None if frame is None else SellerIndex(frame)
+
+
+def get_seller_index(loader, base_dir, *args):
+    """cached_loader 로더 결과를 셀러별로 한 번만 묶어 둔 인덱스 (산출물이 바뀌면 다시 만듦, 없으면 None)."""
+    signature = loader.signature(base_dir, *args)
+    return _build_index(f"{loader.__module__}.{loader.__name__}", base_dir, args, signature, loader)
@@ -0,0 +1,421 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from core import shared_store
+from core.cash_flow import expand_installments
+from core.dag import Node, run_dag
+from core.facts import update_star
+from core.ids import load_id_dictionary
+from core.ingest import COLUMNAR_DIR_NAME, STAR_SOURCES, TABLE_SCHEMAS, read_table
+
+
+# ====== 셀러 산출물 (draft/seller/output 기준 경로) ======
+SELLER_OUTPUTS = {
+    "cash_flow": ("cash_flow/seller_cash_flow_detailed.csv", "cash_flow/seller_transaction_details.csv"),
+    "tiers": ("seller_tiers/all_sellers_metrics.csv",),
+    "geo": ("risk/seller_geo_stats.csv",),
+    "sales_surge": ("risk/sales_surge_risk.csv", "risk/sales_surge_all.csv", "risk/daily_sales_series.csv"),
+    "scm": ("scm/seller_lead_time_analysis.csv", "scm/route_lead_time_stats.csv"),
+    "sku": ("risk/seller_sku_stats.csv",),
+    "market": ("risk/market_category_trends.csv",),
+}
+
+# 매출/판매량 집계에서 제외하는 주문 상태
+EXCLUDED_STATUSES = ("canceled", "unavailable")
+
+# 등급 구간 (매출 순위 백분위 상한)
+TIER_BINS = [0, 0.01, 0.20, 0.95, 1.0]
+TIER_LABELS = ["Tier 1 (Top 1%)", "Tier 2 (Top 2-20%)", "Tier 3 (Middle 21-95%)", "Tier 4 (Bottom 5%)"]
+
+SERVICE_Z = 1.65          # 안전재고 서비스 수준 (95%)
+SURGE_MEDIUM_Z = 2.0      # 급판매 경보 기준
+SURGE_HIGH_Z = 3.0
+MOVING_WINDOW = 30        # 이동평균 관측치 수
+RESTOCK_DAYS = 7          # 권장 재고 = 7일치 수요 + 안전재고
+MIN_ROUTE_ORDERS = 10     # 경로 통계 출력 최소 주문 수
+
+# 산출 CSV 에 원본 ID 문자열로 되돌려 쓰는 컬럼
+ID_OUTPUT_COLUMNS = ("seller_id", "order_id", "product_id")
+
+# 단계 사이에 넘기는 중간 산출물 (data_commerce/.columnar/pipeline 기준, 단계 프로세스가 mmap 으로 엽니다)
+PIPELINE_DIR_NAME = "pipeline"
+FACTS_FILE = "seller_facts.arrow"
+PAYMENTS_FILE = "seller_payments.arrow"
+GEOLOCATION_FILE = "zip_coordinates.arrow"
+FACT_SOURCES = STAR_SOURCES
+
+
+# ====== 공유 팩트 테이블 ======
+def build_seller_facts(data_dir):
+    """모든 단계가 함께 쓰는 상품 그레인 팩트와 결제 팩트를 한 번에 만듭니다."""
+    ids = load_id_dictionary(data_dir)
+    update_star(data_dir, ids)
+
+    items = shared_store.open_table(data_dir, "fact_items", [
+        'order_id', 'product_id', 'seller_id', 'price', 'freight_value', 'category_eng', 'customer_state',
+        'order_status', 'order_purchase_timestamp', 'order_approved_at',
+        'order_delivered_carrier_date', 'order_delivered_customer_date',
+    ])
+    orders = shared_store.open_table(data_dir, "fact_orders", [
+        'order_id', 'customer_id', 'review_score', 'payment_value', 'items_price', 'items_freight',
+    ])
+    customers = shared_store.open_table(data_dir, "dim_customers", ['customer_id', 'customer_zip_code_prefix'])
+    sellers = shared_store.open_table(data_dir, "dim_sellers", ['seller_id', 'seller_state'])
+    payments = shared_store.open_table(data_dir, "fact_payments", [
+        'order_id', 'payment_type', 'payment_installments', 'payment_value',
+    ])
+
+    facts = (items.merge(orders, on='order_id', how='left')
+             .merge(customers, on='customer_id', how='left')
+             .merge(sellers, on='seller_id', how='left'))
+    facts['category_eng'] = facts['category_eng'].fillna('unknown')
+
+    purchase = facts['order_purchase_timestamp']
+    facts['handling_hours'] = (facts['order_delivered_carrier_date'] - facts['order_approved_at']).dt.total_seconds() / 3600
+    facts['lead_days'] = (facts['order_delivered_customer_date'] - purchase).dt.total_seconds() / 86400
+    facts['date'] = purchase.dt.normalize()
+    facts['month'] = purchase.dt.to_period('M').astype(str)
+
+    # 주문 결제액을 상품(가격+배송비) 비중으로 셀러에게 배분
+    item_value = facts['price'] + facts['freight_value']
+    order_value = facts['items_price'] + facts['items_freight']
+    facts['gmv'] = (facts['payment_value'] * item_value / order_value).fillna(item_value)
+    facts['is_sale'] = ~facts['order_status'].isin(EXCLUDED_STATUSES).to_numpy()
+    return {"facts": facts, "payments": payments, "ids": ids}
+
+
+def load_geolocation(data_dir):
+    """우편번호 앞자리별 평균 좌표 (지오로케이션 CSV 가 없으면 None)."""
+    if not os.path.exists(os.path.join(data_dir, TABLE_SCHEMAS["geolocation"]["file"])):
+        return None
+    geo = read_table(data_dir, "geolocation", columns=['geolocation_zip_code_prefix', 'geolocation_lat', 'geolocation_lng'])
+    return (geo.groupby('geolocation_zip_code_prefix')[['geolocation_lat', 'geolocation_lng']].mean()
+            .rename(columns={'geolocation_lat': 'lat', 'geolocation_lng': 'lng'}))
+
+
+# ====== 단계별 산출 ======
+def stage_cash_flow(facts, payments):
+    """셀러별 월간 명목 GMV 와 할부 정산 기준 실입금액."""
+    sales = facts[facts['is_sale']]
+
+    # 주문 결제 건을 셀러 몫으로 나눈 거래 명세
+    share = sales.groupby(['order_id', 'seller_id'], observed=True)['gmv'].sum().rename('seller_gmv').reset_index()
+    share = share.merge(sales.groupby('order_id')['gmv'].sum().rename('order_gmv'), on='order_id')
+    share = share.merge(sales.drop_duplicates('order_id')[['order_id', 'order_approved_at']], on='order_id')
+    trans = share.merge(payments, on='order_id')
+    trans['payment_value'] = trans['payment_value'] * trans['seller_gmv'] / trans['order_gmv']
+    trans = trans[['seller_id', 'order_id', 'order_approved_at', 'payment_type', 'payment_installments', 'payment_value']]
+
+    # 할부 회차를 한 번에 펼쳐 입금일을 계산 (셀러 탭 현금흐름 시뮬레이션과 같은 정산 규칙)
+    settled = trans.dropna(subset=['order_approved_at'])
+    rows, deposit_at, amount = expand_installments(settled)
+    inflow = pd.DataFrame({
+        'seller_id': settled['seller_id'].to_numpy()[rows],
+        'month': pd.DatetimeIndex(deposit_at).to_period('M').astype(str),
+        'realized_cash': amount,
+    })
+
+    nominal = sales.groupby(['seller_id', 'month'])['gmv'].sum().rename('nominal_gmv')
+    realized = inflow.groupby(['seller_id', 'month'])['realized_cash'].sum()
+    detailed = pd.concat([nominal, realized], axis=1).fillna(0.0).sort_index().reset_index()
+    return {
+        "cash_flow/seller_cash_flow_detailed.csv": detailed[['seller_id', 'month', 'nominal_gmv', 'realized_cash']],
+        "cash_flow/seller_transaction_details.csv": trans,
+    }
+
+
+def stage_tiers(facts):
+    """매출 순위 백분위로 셀러 등급을 매기고 운영 지표를 붙입니다."""
+    revenue = facts.groupby('seller_id')['price'].sum().rename('total_revenue')
+    tiers = revenue.sort_values(ascending=False).reset_index()
+    tiers['rank'] = np.arange(1, len(tiers) + 1, dtype='float64')
+    tiers['percentile'] = tiers['rank'] / len(tiers)
+    tiers['tier'] = pd.cut(tiers['percentile'], bins=TIER_BINS, labels=TIER_LABELS).astype(str)
+
+    per_order = facts.drop_duplicates(['seller_id', 'order_id'])
+    per_order = per_order.assign(is_canceled=(per_order['order_status'] == 'canceled').astype('float64'))
+    ops = per_order.groupby('seller_id').agg(
+        avg_lead_time=('handling_hours', 'mean'),
+        cancellation_rate=('is_canceled', 'mean'),
+        total_orders=('order_id', 'size'),
+        review_score=('review_score', 'mean'),
+    )
+    ops['avg_lead_time'] = ops['avg_lead_time'] / 24
+    tiers = tiers.merge(ops, on='seller_id', how='left')
+    return {"seller_tiers/all_sellers_metrics.csv": tiers}
+
+
+def stage_geo(facts, geolocation):
+    """셀러 x 고객 주(state) 별 주문 수, 평균 리드타임, 고객 평균 좌표."""
+    per_order = facts.drop_duplicates(['seller_id', 'order_id'])
+    if geolocation is not None:
+        per_order = per_order.join(geolocation, on='customer_zip_code_prefix')
+    else:
+        per_order = per_order.assign(lat=np.nan, lng=np.nan)
+    geo = per_order.groupby(['seller_id', 'customer_state'], observed=True).agg(
+        order_count=('order_id', 'size'),
+        avg_lead_time=('lead_days', 'mean'),
+        lat=('lat', 'mean'),
+        lng=('lng', 'mean'),
+    ).reset_index()
+    return {"risk/seller_geo_stats.csv": geo}
+
+
+def _series_stats(daily, keys):
+    """정렬된 일별 시계열에서 평균/표준편차/Z 점수/이동평균을 그룹 단위로 계산합니다."""
+    grouped = daily.groupby(keys, observed=True, sort=False)['sales_count']
+    daily['mean'] = grouped.transform('mean')
+    daily['std'] = grouped.transform('std')
+    daily['z_score'] = (daily['sales_count'] - daily['mean']) / daily['std']
+
+    # 누적합 차이로 최근 MOVING_WINDOW 개 관측치 평균 (그룹별 rolling 반복 없음)
+    csum = grouped.cumsum()
+    lagged = csum.groupby([daily[k] for k in keys], observed=True, sort=False).shift(MOVING_WINDOW).fillna(0)
+    count = np.minimum(grouped.cumcount() + 1, MOVING_WINDOW)
+    daily['moving_avg_30d'] = (csum - lagged) / count
+
+    daily['risk_level'] = np.select(
+        [daily['z_score'] >= SURGE_HIGH_Z, daily['z_score'] >= SURGE_MEDIUM_Z], ['High', 'Medium'], 'Low')
+    return daily
+
+
+def stage_sales_surge(facts, tiers):
+    """셀러 x 카테고리 일별 판매량의 급증(Z 점수)을 찾고 안전재고/권장 재고를 계산합니다."""
+    sales = facts[facts['is_sale']]
+    keys = ['seller_id', 'category_eng']
+    daily = sales.groupby(keys + ['date']).agg(
+        sales_count=('order_id', 'size'),
+        avg_price=('price', 'mean'),
+        avg_review_score=('review_score', 'mean'),
+        avg_shipping_hours=('handling_hours', 'mean'),
+        avg_lead_time=('lead_days', 'mean'),
+    ).reset_index().sort_values(keys + ['date'], ignore_index=True)
+    daily = _series_stats(daily, keys)
+
+    overall = sales.groupby(['seller_id', 'date']).size().rename('sales_count').reset_index()
+    overall['category_eng'] = 'ALL_CATEGORIES'
+    overall = _series_stats(overall.sort_values(['seller_id', 'date'], ignore_index=True), keys)
+
+    # --- 셀러/카테고리 단위 속성 ---
+    seller = sales.groupby('seller_id').agg(
+        seller_total_sales=('order_id', 'size'),
+        seller_avg_shipping_hours=('handling_hours', 'mean'),
+        months_active=('date', 'nunique'),   # 기존 산출물과 같이 판매일 수 기준
+        category_count=('category_eng', 'nunique'),
+    )
+    seller['seller_monthly_avg_orders'] = seller['seller_total_sales'] / seller['months_active']
+    state_counts = sales.groupby(['seller_id', 'customer_state'], observed=True).size().reset_index(name='n')
+    seller['top_state'] = (state_counts.sort_values('n', kind='stable')
+                           .drop_duplicates('seller_id', keep='last').set_index('seller_id')['customer_state'])
+    seller = seller.join(tiers.set_index('seller_id')['tier'])
+
+    tier_hours = seller.groupby('tier')['seller_avg_shipping_hours'].mean()
+    above = {label: tier_hours.get(TIER_LABELS[i - 1]) if i > 0 else np.nan for i, label in enumerate(TIER_LABELS)}
+    seller['tier_above_avg_shipping_hours'] = seller['tier'].map(above)
+
+    sku_counts = sales.groupby(keys + ['product_id']).size().reset_index(name='n')
+    category = sku_counts.groupby(keys)['n'].sum().rename('cat_total_sales').to_frame()
+    category['top_selling_sku'] = (sku_counts.sort_values('n', kind='stable')
+                                   .drop_duplicates(keys, keep='last').set_index(keys)['product_id'])
+
+    risk = daily[daily['z_score'] >= SURGE_MEDIUM_Z]
+    risk = risk.join(category, on=keys).join(seller, on='seller_id')
+    risk['cat_share'] = risk['cat_total_sales'] / risk['seller_total_sales']
+    risk['safety_stock'] = np.ceil(SERVICE_Z * risk['std'] * np.sqrt(risk['seller_avg_shipping_hours'] / 24))
+    risk['restock_recommendation'] = np.ceil(risk['moving_avg_30d'] * RESTOCK_DAYS + risk['safety_stock'])
+    risk = risk.rename(columns={'date': 'month'}).sort_values('z_score', ascending=False)
+    risk['month'] = risk['month'].dt.strftime('%Y-%m-%d')
+    risk = risk[[
+        'seller_id', 'category_eng', 'month', 'sales_count', 'avg_price', 'avg_review_score', 'avg_shipping_hours',
+        'avg_lead_time', 'top_selling_sku', 'seller_total_sales', 'seller_avg_shipping_hours', 'months_active',
+        'category_count', 'seller_monthly_avg_orders', 'top_state', 'cat_total_sales', 'cat_share', 'tier',
+        'tier_above_avg_shipping_hours', 'mean', 'std', 'z_score', 'moving_avg_30d', 'risk_level',
+        'safety_stock', 'restock_recommendation',
+    ]]
+
+    surge_cols = ['seller_id', 'category_eng', 'date', 'sales_count', 'mean', 'std', 'z_score', 'moving_avg_30d', 'risk_level']
+    surge_all = pd.concat([daily[surge_cols], overall[surge_cols]], ignore_index=True).rename(columns={'date': 'month'})
+    surge_all['month'] = surge_all['month'].dt.strftime('%Y-%m-%d')
+
+    series = daily[['seller_id', 'category_eng', 'date', 'sales_count']].rename(columns={'sales_count': 'daily_sales_count'})
+    series['date'] = series['date'].dt.strftime('%Y-%m-%d')
+    return {
+        "risk/sales_surge_risk.csv": risk,
+        "risk/sales_surge_all.csv": surge_all,
+        "risk/daily_sales_series.csv": series,
+    }
+
+
+def stage_scm(facts):
+    """배송 경로(셀러 주 -> 고객 주) 리드타임 통계와, 경로 평균을 예측치로 쓴 셀러별 안전재고 일수."""
+    shipped = facts.dropna(subset=['lead_days']).drop_duplicates(['order_id', 'seller_id', 'category_eng'])
+    route_keys = ['seller_state', 'customer_state']
+    by_route = shipped.groupby(route_keys, observed=True)['lead_days']
+    route = by_route.agg(avg_lead_time='mean', count='size')
+    route.insert(1, 'p95_lead_time', by_route.quantile(0.95))
+    route = route.reset_index()
+
+    shipped = shipped.merge(route[route_keys + ['avg_lead_time']].rename(columns={'avg_lead_time': 'predicted_days'}),
+                            on=route_keys, how='left')
+    lead = shipped.groupby(['seller_id', 'category_eng']).agg(
+        seller_state=('seller_state', 'first'),
+        avg_actual_lead_time=('lead_days', 'mean'),
+        avg_predicted_lead_time=('predicted_days', 'mean'),
+        std_lead_time=('lead_days', 'std'),
+        worst_case_lead_time=('lead_days', 'max'),
+        order_count=('order_id', 'nunique'),
+    ).reset_index()
+    lead['ai_safety_stock_days'] = lead['avg_predicted_lead_time'] + SERVICE_Z * lead['std_lead_time'].fillna(0)
+    lead['traditional_safety_stock_days'] = lead['avg_actual_lead_time']
+    lead['efficiency_gap'] = lead['avg_actual_lead_time'] - lead['avg_predicted_lead_time']
+    return {
+        "scm/seller_lead_time_analysis.csv": lead,
+        "scm/route_lead_time_stats.csv": route[route['count'] >= MIN_ROUTE_ORDERS],
+    }
+
+
+def stage_sku(facts):
+    """셀러 x 카테고리 내 SKU 별 판매 수, 점유율, 평균 평점/가격."""
+    sales = facts[facts['is_sale']]
+    keys = ['seller_id', 'category_eng', 'product_id']
+    sku = sales.groupby(keys).agg(
+        sku_sales_count=('order_id', 'size'),
+        sku_avg_review_score=('review_score', 'mean'),
+        sku_avg_price=('price', 'mean'),
+    ).reset_index()
+    sku['sku_share_in_cat'] = sku['sku_sales_count'] / sku.groupby(keys[:2])['sku_sales_count'].transform('sum')
+    return {"risk/seller_sku_stats.csv": sku}
+
+
+def stage_market(facts):
+    """카테고리 x 월 시장 판매량, 평균 가격, 활동 셀러 수."""
+    sales = facts[facts['is_sale']]
+    market = sales.groupby(['category_eng', 'month']).agg(
+        total_sales=('order_id', 'size'),
+        market_avg_price=('price', 'mean'),
+        seller_count=('seller_id', 'nunique'),
+    ).reset_index()
+    market['market_avg_sales'] = market['total_sales'] / market['seller_count']
+    return {"risk/market_category_trends.csv": market}
+
+
+# ====== 저장 ======
+def write_output(output_dir, rel_path, df, ids):
+    """ID 컬럼을 원본 문자열로 되돌려 CSV 로 저장합니다 (임시 파일 후 교체)."""
+    df = df.copy()
+    for col in ID_OUTPUT_COLUMNS:
+        if col in df.columns and df[col].dtype.kind in 'iu':
+            df[col] = ids.decode(col, df[col])
+    path = os.path.join(output_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+# ====== DAG 노드 ======
+# 각 노드는 입력을 디스크에서 읽고 산출물을 직접 쓰므로 별도 프로세스에서 독립적으로 실행됩니다.
+def pipeline_dir(data_dir):
+    return os.path.join(data_dir, COLUMNAR_DIR_NAME, PIPELINE_DIR_NAME)
+
+
+def _open_work(work_dir, file_name):
+    return shared_store.to_frame(shared_store.read_arrow(os.path.join(work_dir, file_name)))
+
+
+def _open_geolocation(work_dir):
+    geolocation = _open_work(work_dir, GEOLOCATION_FILE)
+    if geolocation.empty:
+        return None
+    return geolocation.set_index('geolocation_zip_code_prefix')
+
+
+def _write_outputs(data_dir, output_dir, outputs):
+    ids = load_id_dictionary(data_dir)
+    for rel_path, df in outputs.items():
+        write_output(output_dir, rel_path, df, ids)
+
+
+def node_facts(data_dir, output_dir, work_dir):
+    shared = build_seller_facts(data_dir)
+    shared_store.write_arrow(os.path.join(work_dir, FACTS_FILE), shared["facts"])
+    shared_store.write_arrow(os.path.join(work_dir, PAYMENTS_FILE), shared["payments"])
+
+
+def node_geolocation(data_dir, output_dir, work_dir):
+    geolocation = load_geolocation(data_dir)
+    if geolocation is None:
+        geolocation = pd.DataFrame({'geolocation_zip_code_prefix': [], 'lat': [], 'lng': []})
+    else:
+        geolocation = geolocation.reset_index()
+    shared_store.write_arrow(os.path.join(work_dir, GEOLOCATION_FILE), geolocation)
+
+
+def node_cash_flow(data_dir, output_dir, work_dir):
+    outputs = stage_cash_flow(_open_work(work_dir, FACTS_FILE), _open_work(work_dir, PAYMENTS_FILE))
+    _write_outputs(data_dir, output_dir, outputs)
+
+
+def node_tiers(data_dir, output_dir, work_dir):
+    _write_outputs(data_dir, output_dir, stage_tiers(_open_work(work_dir, FACTS_FILE)))
+
+
+def node_geo(data_dir, output_dir, work_dir):
+    outputs = stage_geo(_open_work(work_dir, FACTS_FILE), _open_geolocation(work_dir))
+    _write_outputs(data_dir, output_dir, outputs)
+
+
+def node_sales_surge(data_dir, output_dir, work_dir):
+    ids = load_id_dictionary(data_dir)
+    tiers = ids.encode_frame(pd.read_csv(os.path.join(output_dir, SELLER_OUTPUTS["tiers"][0])), append=False)
+    _write_outputs(data_dir, output_dir, stage_sales_surge(_open_work(work_dir, FACTS_FILE), tiers))
+
+
+def node_scm(data_dir, output_dir, work_dir):
+    _write_outputs(data_dir, output_dir, stage_scm(_open_work(work_dir, FACTS_FILE)))
+
+
+def node_sku(data_dir, output_dir, work_dir):
+    _write_outputs(data_dir, output_dir, stage_sku(_open_work(work_dir, FACTS_FILE)))
+
+
+def node_market(data_dir, output_dir, work_dir):
+    _write_outputs(data_dir, output_dir, stage_market(_open_work(work_dir, FACTS_FILE)))
+
+
+SELLER_DAG = (
+    Node("facts", node_facts, (FACTS_FILE, PAYMENTS_FILE), sources=FACT_SOURCES, root="work"),
+    Node("geolocation", node_geolocation, (GEOLOCATION_FILE,), sources=("geolocation",), root="work"),
+    Node("cash_flow", node_cash_flow, SELLER_OUTPUTS["cash_flow"], deps=("facts",)),
+    Node("tiers", node_tiers, SELLER_OUTPUTS["tiers"], deps=("facts",)),
+    Node("geo", node_geo, SELLER_OUTPUTS["geo"], deps=("facts", "geolocation")),
+    Node("sales_surge", node_sales_surge, SELLER_OUTPUTS["sales_surge"], deps=("facts", "tiers")),
+    Node("scm", node_scm, SELLER_OUTPUTS["scm"], deps=("facts",)),
+    Node("sku", node_sku, SELLER_OUTPUTS["sku"], deps=("facts",)),
+    Node("market", node_market, SELLER_OUTPUTS["market"], deps=("facts",)),
+)
+
+
+def run_pipeline(data_dir, output_dir, force=False, max_workers=None):
+    """data_commerce 원시 데이터에서 셀러 산출물을 다시 만들고 노드별 상태/소요 시간을 반환합니다.
+
+    입력(원시 CSV, 선행 산출물, 코드)이 지난 실행과 같은 노드는 건너뜁니다. force=True 이면 전부 다시 만듭니다.
+    """
+    return run_dag(SELLER_DAG, data_dir, output_dir, pipeline_dir(data_dir), force=force, max_workers=max_workers)
+
+
+if __name__ == "__main__":
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    target_dir = args[0] if len(args) > 0 else os.path.join(root_dir, "data_commerce")
+    out_dir = args[1] if len(args) > 1 else os.path.join(root_dir, "draft", "seller", "output")
+    started = time.perf_counter()
+    report = run_pipeline(target_dir, out_dir, force="--force" in sys.argv)
+    for name, row in report.items():
+        print(f"{row['seconds']:8.3f}s  {name:<12} {row['status']} {row.get('error', '')}")
+    print(f"{time.perf_counter() - started:8.3f}s  total")
+    sys.exit(0 if all(row["status"] in ("built", "skipped") for row in report.values()) else 1)
@@ -0,0 +1,90 @@
+import pandas as pd
+
+
+# ====== 셀러 프로필 테이블 ======
+PROFILE_COLUMNS = [
+    'tier', 'total_orders', 'monthly_avg', 'avg_review', 'avg_handling', 'avg_delivery', 'top_state', 'top_category',
+]
+
+# 프로필이 없는 셀러의 기본값 (운영 리스크 탭 요약 카드와 동일)
+EMPTY_PROFILE = pd.Series({
+    'tier': "-", 'total_orders': 0, 'monthly_avg': 0.0, 'avg_review': 0.0,
+    'avg_handling': 0.0, 'avg_delivery': 0.0, 'top_state': "-", 'top_category': "-",
+})
+
+# fact_items 에서 출고/배송 시간을 계산하는 컬럼
+PROFILE_ITEM_COLUMNS = [
+    'seller_id', 'order_purchase_timestamp', 'order_delivered_carrier_date', 'order_delivered_customer_date',
+]
+
+
+def lead_times(items):
+    """상품 행별 출고 시간(구매 -> 택배사 인계)과 배송 시간(구매 -> 고객 수령), 일 단위."""
+    purchased = items['order_purchase_timestamp']
+    return pd.DataFrame({
+        'seller_id': items['seller_id'].to_numpy(),
+        'handling_days': ((items['order_delivered_carrier_date'] - purchased).dt.total_seconds() / 86400).to_numpy(),
+        'delivery_days': ((items['order_delivered_customer_date'] - purchased).dt.total_seconds() / 86400).to_numpy(),
+    })
+
+
+def _first_by_max(frame, key, value, label):
+    """key 별로 value 가 가장 큰 행의 label (동률이면 먼저 나온 행)."""
+    ranked = frame.sort_values(value, ascending=False, kind='stable').drop_duplicates(key)
+    return ranked.set_index(key)[label]
+
+
+def build_seller_profiles(tiers=None, sku=None, agg=None, geo=None, items=None):
+    """셀러별 요약 지표를 한 번에 계산한 테이블 (seller_id 인덱스, PROFILE_COLUMNS).
+
+    tiers: seller_id, tier / sku: seller_id, category_eng, sku_sales_count, sku_avg_review_score
+    agg: seller_id, month / geo: seller_id, customer_state, order_count / items: PROFILE_ITEM_COLUMNS
+    주문 수와 만족도는 SKU 판매 건수 가중, 월 평균 주문은 현금흐름 산출물의 활동 월 수 기준입니다.
+    """
+    parts = {}
+    if tiers is not None:
+        parts['tier'] = tiers.drop_duplicates('seller_id').set_index('seller_id')['tier']
+    if sku is not None and len(sku):
+        counts = sku['sku_sales_count']
+        by_seller = sku.assign(weighted=sku['sku_avg_review_score'] * counts).groupby('seller_id').agg(
+            total_orders=('sku_sales_count', 'sum'), weighted=('weighted', 'sum'), mean_review=('sku_avg_review_score', 'mean'))
+        parts['total_orders'] = by_seller['total_orders']
+        # 판매 건수가 0 이면 단순 평균
+        parts['avg_review'] = (by_seller['weighted'] / by_seller['total_orders']).where(
+            by_seller['total_orders'] > 0, by_seller['mean_review'])
+        category_sales = sku.groupby(['seller_id', 'category_eng'])['sku_sales_count'].sum().reset_index()
+        parts['top_category'] = _first_by_max(category_sales, 'seller_id', 'sku_sales_count', 'category_eng')
+    if agg is not None:
+        parts['active_months'] = agg.groupby('seller_id')['month'].nunique()
+    if geo is not None and len(geo):
+        geo = geo.assign(order_count=pd.to_numeric(geo['order_count'], errors='coerce'))
+        parts['top_state'] = _first_by_max(geo, 'seller_id', 'order_count', 'customer_state').astype(str)
+    if items is not None:
+        times = lead_times(items).groupby('seller_id')[['handling_days', 'delivery_days']].mean()
+        parts['avg_handling'] = times['handling_days']
+        parts['avg_delivery'] = times['delivery_days']
+
+    profiles = pd.DataFrame(parts)
+    profiles.index.name = 'seller_id'
+    months = profiles.pop('active_months') if 'active_months' in profiles else None
+    profiles = profiles.reindex(columns=PROFILE_COLUMNS)
+    profiles['total_orders'] = profiles['total_orders'].fillna(0).astype('int64')
+    if months is not None:
+        profiles['monthly_avg'] = (profiles['total_orders'] / months).where(months > 0)
+    return profiles.fillna(EMPTY_PROFILE.to_dict())
+
+
+def tier_benchmarks(items, tiers):
+    """티어별 평균 출고/배송 시간 (해당 티어 셀러의 모든 상품 행 평균)."""
+    tier_map = tiers.drop_duplicates('seller_id').set_index('seller_id')['tier']
+    times = lead_times(items)
+    times['tier'] = times['seller_id'].map(tier_map)
+    return times.dropna(subset=['tier']).groupby('tier').agg(
+        sellers=('seller_id', 'nunique'), avg_handling=('handling_days', 'mean'), avg_delivery=('delivery_days', 'mean'))
+
+
+def seller_profile(profiles, seller_id):
+    """셀러 한 명의 프로필 행 (없으면 EMPTY_PROFILE)."""
+    if seller_id is not None and seller_id in profiles.index:
+        return profiles.loc[seller_id]
+    return EMPTY_PROFILE
@@ -0,0 +1,96 @@
+import os
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from core.ingest import COLUMNAR_DIR_NAME, STAR_SOURCES, TABLE_SCHEMAS
+
+
+# 공유 폴더 위치를 바꾸고 싶을 때 (예: /dev/shm/olist) 지정하는 환경 변수
+SHARED_DIR_ENV = "OLIST_SHARED_DIR"
+SHARED_DIR_NAME = "shared"
+ARROW_SUFFIX = ".arrow"
+
+
+# ====== 공유 폴더 / 신선도 ======
+def shared_dir(data_dir):
+    """같은 호스트의 대시보드 프로세스들이 함께 여는 Arrow IPC 폴더."""
+    return os.environ.get(SHARED_DIR_ENV) or os.path.join(data_dir, COLUMNAR_DIR_NAME, SHARED_DIR_NAME)
+
+
+def table_path(data_dir, name):
+    return os.path.join(shared_dir(data_dir), name + ARROW_SUFFIX)
+
+
+def _source_mtime(data_dir):
+    """원본 CSV 중 가장 최근 수정 시각 (공유 파일이 이보다 오래되면 다시 만듭니다)."""
+    paths = [os.path.join(data_dir, TABLE_SCHEMAS[table]["file"]) for table in STAR_SOURCES]
+    mtimes = [os.path.getmtime(path) for path in paths if os.path.exists(path)]
+    return max(mtimes) if mtimes else 0.0
+
+
+def is_fresh(data_dir, names):
+    source_mtime = _source_mtime(data_dir)
+    for name in names:
+        path = table_path(data_dir, name)
+        if not os.path.exists(path) or os.path.getmtime(path) < source_mtime:
+            return False
+    return True
+
+
+# ====== 쓰기 / 열기 ======
+def write_arrow(path, df):
+    """DataFrame 하나를 비압축 Arrow IPC 파일로 씁니다 (mmap 으로 그대로 열 수 있는 형식)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # 다른 프로세스가 읽는 중이어도 깨진 파일이 보이지 않도록 임시 파일 후 교체
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_table(data_dir, name, df):
+    return write_arrow(table_path(data_dir, name), df)
+
+
+def read_arrow(path):
+    """Arrow 파일을 메모리 매핑으로 엽니다 (아직 아무 컬럼도 메모리에 올리지 않음)."""
+    source = pa.memory_map(path, "r")
+    return ipc.open_file(source).read_all()
+
+
+def open_arrow(data_dir, name):
+    return read_arrow(table_path(data_dir, name))
+
+
+def to_frame(table, columns=None):
+    """필요한 컬럼만 골라 DataFrame 으로 바꿉니다.
+
+    결측 없는 숫자/정수 코드/날짜 컬럼은 매핑된 페이지를 그대로 가리키므로(zero-copy)
+    여러 프로세스가 같은 물리 메모리를 공유합니다. 반환된 프레임은 읽기 전용입니다.
+    """
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def open_table(data_dir, name, columns=None):
+    return to_frame(open_arrow(data_dir, name), columns)
+
+
+def write_tables(data_dir, tables):
+    for name, df in tables.items():
+        write_table(data_dir, name, df)
+
+
+def open_tables(data_dir, names):
+    return {name: open_table(data_dir, name) for name in names}
+
+
+def touch_tables(data_dir, names):
+    """내용은 그대로 두고 수정 시각만 갱신합니다 (원본 mtime 만 바뀐 경우)."""
+    for name in names:
+        os.utime(table_path(data_dir, name))
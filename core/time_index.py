@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+
+# 팩트 테이블을 정렬해 두는 기준 시각
+TIME_COLUMN = 'order_purchase_timestamp'
+
+
+def sort_by_time(df, column=TIME_COLUMN, tie_breakers=()):
+    """시각 오름차순(결측은 맨 뒤)으로 정렬한 새 프레임. 같은 시각은 tie_breakers 순서로 고정합니다."""
+    return df.sort_values([column, *tie_breakers], kind='stable', na_position='last', ignore_index=True)
+
+
+def range_bounds(values, start_date, end_date):
+    """정렬된 datetime64 배열에서 [start_date, end_date] 날짜 구간의 (시작, 끝) 위치.
+
+    end_date 는 그날 하루 전체를 포함합니다. 이분 탐색 두 번이므로 O(log n) 입니다.
+    """
+    start = np.datetime64(pd.Timestamp(start_date))
+    stop = np.datetime64(pd.Timestamp(end_date) + pd.Timedelta(days=1))
+    return int(np.searchsorted(values, start, side='left')), int(np.searchsorted(values, stop, side='left'))
+
+
+def time_slice(df, start_date, end_date, column=TIME_COLUMN):
+    """column 으로 정렬된 프레임에서 날짜 구간 행만 잘라 반환합니다.
+
+    위치 기반 iloc 조각이라 행 단위 비교나 복사가 없습니다 (수정하려면 .copy() 하세요).
+    """
+    lo, hi = range_bounds(df[column].to_numpy(), start_date, end_date)
+    return df.iloc[lo:hi]
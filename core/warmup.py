@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import importlib
+import streamlit as st
+
+from core.ingest import COLUMNAR_DIR_NAME, run_parallel
+
+
+# ====== 워밍업 대상 ======
+# warmup_tasks(base_dir, data_dir) -> {로더 이름: (함수, 인자...)} 를 제공하는 탭 모듈
+WARMUP_MODULES = (
+    "tabs.tab_total_kpi_v1_3",
+    "tabs.tab_price_v1_3",
+    "tabs.tab_delivery_v1_3",
+    "tabs.tab_seller_v1_3",
+    "tabs.tab_strategy_v1_3",
+)
+
+WARMUP_STATUS_FILE = "warmup_status.json"
+SKIPPED = "skipped"           # 로더가 None 을 반환 (입력 파일 없음)
+
+
+def warmup_status_path(data_dir):
+    """워밍업 결과 파일 (배포 시 이 파일의 ready 값으로 트래픽 투입 여부를 판단)."""
+    return os.path.join(data_dir, COLUMNAR_DIR_NAME, WARMUP_STATUS_FILE)
+
+
+def collect_tasks(base_dir, data_dir):
+    tasks = {}
+    for module_name in WARMUP_MODULES:
+        module = importlib.import_module(module_name)
+        for name, task in module.warmup_tasks(base_dir, data_dir).items():
+            tasks[f"{module_name.split('.')[-1]}.{name}"] = task
+    return tasks
+
+
+def _timed(func, *args):
+    """(소요 시간, 상태) - 상태는 ok, 로더가 None 을 반환하면 skipped (입력 파일 없음 등), 예외면 오류 메시지."""
+    start = time.perf_counter()
+    try:
+        status = "ok" if func(*args) is not None else SKIPPED
+    except Exception as e:
+        status = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - start, status
+
+
+def run_warmup(base_dir, data_dir):
+    """공유 스타 스키마를 먼저 만들고, 등록된 탭 로더를 모두 실행해 캐시를 채웁니다.
+
+    로더별 소요 시간과 상태를 담은 목록을 반환하고 warmup_status.json 에 기록합니다.
+    None 을 반환한 로더는 입력이 없어 채운 캐시가 없으므로 skipped 로 따로 모읍니다 (ready 는 오류가 없을 때).
+    """
+    from core.facts import load_star
+
+    started = time.perf_counter()
+    # 탭 로더 대부분이 스타 스키마를 읽으므로 먼저 단독으로 준비
+    results = {"core.load_star": _timed(load_star, data_dir)}
+    tasks = collect_tasks(base_dir, data_dir)
+    results.update(run_parallel({name: (_timed,) + task for name, task in tasks.items()}))
+
+    timings = [
+        {"loader": name, "seconds": round(seconds, 3), "status": status}
+        for name, (seconds, status) in results.items()
+    ]
+    status = {
+        "ready": not any(row["status"] not in ("ok", SKIPPED) for row in timings),
+        "skipped": [row["loader"] for row in timings if row["status"] == SKIPPED],
+        "total_seconds": round(time.perf_counter() - started, 3),
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "timings": timings,
+    }
+    path = warmup_status_path(data_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return status
+
+
+@st.cache_resource(show_spinner="대시보드 데이터를 준비하는 중입니다...")
+def warm_up(base_dir, data_dir):
+    """프로세스당 한 번만 실행되는 워밍업 (대시보드 시작 시 호출)."""
+    return run_warmup(base_dir, data_dir)
+
+
+if __name__ == "__main__":
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(root_dir, "data_commerce")
+    report = run_warmup(root_dir, target_dir)
+    for row in report["timings"]:
+        print(f"{row['seconds']:8.3f}s  {row['loader']:<45} {row['status']}")
+    print(f"{report['total_seconds']:8.3f}s  total (ready={report['ready']}, skipped={len(report['skipped'])})")
+    sys.exit(0 if report["ready"] else 1)
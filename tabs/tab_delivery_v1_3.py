@@ -3,6 +3,29 @@ import pandas as pd
 import os
 import plotly.express as px
 
+from core.delivery_engine import DEFAULT_FREIGHT_THRESHOLD, get_delivery_engine
+
+
+def live_delivery_tables(data_dir, threshold):
+    """원시 주문 팩트에서 임계값 기준 그룹 요약을 바로 계산합니다 (기존 CSV 와 같은 컬럼명)."""
+    engine, states = get_delivery_engine(data_dir)
+    groups = engine.group_stats(threshold)
+    return {
+        'repurchase_analysis_summary.csv': groups[['group', 'repurchase']].rename(
+            columns={'group': '배송비 비중 그룹', 'repurchase': '재구매율'}),
+        'delivery_speed_comparison_stats.csv': groups[['group', 'delivery_days']].rename(
+            columns={'group': '배송비 비중 그룹', 'delivery_days': '평균 배송 기간(일)'}),
+        'descriptive_stats_groups.csv': groups[['group', 'price', 'freight_value', 'review_score']].rename(
+            columns={'group': 'freight_ratio_group'}),
+        'state_repurchase_analysis.csv': states[['customer_state', 'repurchase', 'review_score']].rename(
+            columns={'customer_state': '주(State)', 'repurchase': '재구매율', 'review_score': '평균 리뷰 점수'}),
+    }
+
+
+def warmup_tasks(base_dir, data_dir):
+    """서버 워밍업 단계에서 미리 실행할 로더."""
+    return {"delivery_engine": (get_delivery_engine, data_dir)}
+
 
 def render(base_dir, data_dir):
     """배송 분석 탭 렌더링"""
@@ -90,18 +113,37 @@ def render(base_dir, data_dir):
     del_sub_menu = st.session_state["delivery_sub_menu"]
     st.markdown("---")
 
+    # 배송비 비중 임계값: 원시 주문 팩트가 있으면 슬라이더 값으로 바로 다시 계산, 없으면 저장된 CSV(20%)
+    threshold_pct, threshold = int(DEFAULT_FREIGHT_THRESHOLD * 100), DEFAULT_FREIGHT_THRESHOLD
+    live_tables = {}
+    try:
+        get_delivery_engine(data_dir)
+    except FileNotFoundError:
+        # 저장된 CSV 는 20% 기준으로만 계산돼 있으므로 슬라이더를 보여주지 않음
+        st.caption(f"ℹ️ 원시 주문 데이터가 없어 저장된 분석 결과(배송비 비중 {threshold_pct}% 기준)를 표시합니다.")
+    else:
+        threshold_pct = st.slider("배송비 비중 임계값 (%)", min_value=5, max_value=50,
+                                  value=threshold_pct, step=1, key="freight_ratio_threshold")
+        threshold = threshold_pct / 100
+        live_tables = live_delivery_tables(data_dir, threshold)
+
+    def load_group_data(file_name):
+        if file_name in live_tables:
+            return live_tables[file_name]
+        return load_delivery_data(file_name)
+
     # 데이터 로드
-    repurchase_sum = load_delivery_data('repurchase_analysis_summary.csv')
-    speed_sum = load_delivery_data('delivery_speed_comparison_stats.csv')
+    repurchase_sum = load_group_data('repurchase_analysis_summary.csv')
+    speed_sum = load_group_data('delivery_speed_comparison_stats.csv')
 
     if del_sub_menu == "📉 여정의 불편: 배송 지연 진단":
         # 1. 메인 타이틀
         st.markdown("### 📑 여정의 불편: 물류 단계의 심리적 불안 구간 (Fulfillment)")
         
         # 2. 요약 배경 박스
-        st.info("""
+        st.info(f"""
         **분석 요약:** 본 분석은 Olist 데이터셋을 바탕으로 '저가 생필품' 카테고리의 물류 효율성을 진단했습니다. 
-        특히 배송비 비중이 20%를 초과할 때 발생하는 재구매 저항선과 물류 소외 지역의 페인포인트를 중점적으로 다룹니다.
+        특히 배송비 비중이 {threshold_pct}%를 초과할 때 발생하는 재구매 저항선과 물류 소외 지역의 페인포인트를 중점적으로 다룹니다.
         """)
 
         # 3. 주요 KPI 요약 (고정 수치 반영)
@@ -125,7 +167,7 @@ def render(base_dir, data_dir):
             if repurchase_sum is not None:
                 fig = px.bar(repurchase_sum, x='배송비 비중 그룹', y='재구매율',
                              text=repurchase_sum['재구매율'].apply(lambda x: f'{x:.2%}'),
-                             title='배송비 비중(20% 임계점)에 따른 재구매율 차이',
+                             title=f'배송비 비중({threshold_pct}% 임계점)에 따른 재구매율 차이',
                              color='배송비 비중 그룹', color_discrete_sequence=['#9fc16e', '#94d8cf'])
                 fig.update_layout(yaxis_tickformat='.1%')
                 st.plotly_chart(fig, use_container_width=True)
@@ -140,7 +182,7 @@ def render(base_dir, data_dir):
 
     elif del_sub_menu == "💎 경험의 가치: 물류 체감 가치":
         st.header("💎 경험의 가치: 데이터로 증명된 물류 체감 가치")
-        desc_sum = load_delivery_data('descriptive_stats_groups.csv')
+        desc_sum = load_group_data('descriptive_stats_groups.csv')
         if desc_sum is not None:
             st.subheader("📊 그룹별 주요 지표 평균")
             st.dataframe(desc_sum.style.format({'price': '{:.1f}', 'freight_value': '{:.1f}', 'review_score': '{:.2f}'}))
@@ -159,7 +201,7 @@ def render(base_dir, data_dir):
             with col1:
                 fig = px.bar(repurchase_sum, x='배송비 비중 그룹', y='재구매율',
                              text=repurchase_sum['재구매율'].apply(lambda x: f'{x:.2%}'),
-                             title='배송비 비중(20% 임계점)에 따른 재구매율 차이',
+                             title=f'배송비 비중({threshold_pct}% 임계점)에 따른 재구매율 차이',
                              color='배송비 비중 그룹', color_discrete_sequence=['#0b134a', '#0c29d0'])
                 fig.update_layout(yaxis_tickformat='.1%')
                 st.plotly_chart(fig, use_container_width=True)
@@ -195,7 +237,7 @@ def render(base_dir, data_dir):
 
         with col2:
             st.subheader("🗺️ 지역별 재구매 및 만족도")
-            state_data = load_delivery_data('state_repurchase_analysis.csv')
+            state_data = load_group_data('state_repurchase_analysis.csv')
             if state_data is not None:
                 fig_state = px.scatter(state_data, x='재구매율', y='평균 리뷰 점수', text='주(State)',
                                       title='지역별 물류 성과 매트릭스 (재구매 vs 만족도)',
@@ -6,19 +6,32 @@ import plotly.graph_objects as go
 import os
 from datetime import datetime
 
-
-@st.cache_data
+from core.binning import histogram_bins, histogram_edges
+from core.cache_keys import cached_loader
+from core.downsample import downsample
+from core.elasticity import get_elasticities
+from core.facts import STAR_SOURCE_FILES, get_table
+from core.ids import get_id_dictionary
+from core.ingest import read_typed
+from core.time_index import sort_by_time, time_slice
+
+
+@cached_loader(
+    "olist_orders_cleansed.csv", "olist_order_items_cleansed.csv",
+    "data/olist_products_dataset.csv", "data/product_category_name_translation.csv", "data/olist_customers_dataset.csv",
+    "final_refined_elasticity_results.csv", "price_elasticity_results.csv", "category_elasticity_analysis.csv",
+    "rfm_segment_elasticity.csv", "furniture_price_deepdive.csv", "vip_paradox_verification.csv",
+    "freight_distance_deepdive.csv",
+)
 def load_price_data(price_data_dir):
     """가격 분석 전용 데이터를 로드합니다."""
     data_sub = os.path.join(price_data_dir, "data")
 
-    orders = pd.read_csv(os.path.join(price_data_dir, "olist_orders_cleansed.csv"))
-    items = pd.read_csv(os.path.join(price_data_dir, "olist_order_items_cleansed.csv"))
-    products = pd.read_csv(os.path.join(data_sub, "olist_products_dataset.csv"))
-    translations = pd.read_csv(os.path.join(data_sub, "product_category_name_translation.csv"))
-    customers = pd.read_csv(os.path.join(data_sub, "olist_customers_dataset.csv"))
-
-    orders['order_purchase_timestamp'] = pd.to_datetime(orders['order_purchase_timestamp'])
+    orders = sort_by_time(read_typed(os.path.join(price_data_dir, "olist_orders_cleansed.csv"), "orders"))
+    items = read_typed(os.path.join(price_data_dir, "olist_order_items_cleansed.csv"), "order_items")
+    products = read_typed(os.path.join(data_sub, "olist_products_dataset.csv"), "products")
+    translations = read_typed(os.path.join(data_sub, "product_category_name_translation.csv"), "category_translation")
+    customers = read_typed(os.path.join(data_sub, "olist_customers_dataset.csv"), "customers")
 
     refined_elas = pd.read_csv(os.path.join(price_data_dir, "final_refined_elasticity_results.csv"))
     raw_elas = pd.read_csv(os.path.join(price_data_dir, "price_elasticity_results.csv"))
@@ -37,6 +50,29 @@ def load_price_data(price_data_dir):
     return orders, items, products, translations, refined_elas, raw_elas, cat_elas, rfm_elas, furn_deep, vip_para, dist_df, customers
 
 
+@cached_loader(*STAR_SOURCE_FILES)
+def load_live_elasticities(data_dir):
+    """스타 스키마에서 다시 추정한 탄력성 테이블 (CSV 와 같은 컬럼, 상품 ID 는 원본 문자열).
+
+    카테고리 이름도 스타 스키마의 dim_products 에서 붙여, 가격 탭 추출본(draft/price)과 섞지 않습니다.
+    """
+    tables = get_elasticities(data_dir)
+    ids = get_id_dictionary(data_dir)
+    products = get_table(data_dir, "dim_products", ['product_id', 'product_category_name', 'product_category_name_english'])
+
+    def with_category(df):
+        df = pd.merge(df, products, on='product_id', how='left')
+        return df.assign(product_id=ids.decode('product_id', df['product_id']))
+
+    return with_category(tables['refined']), with_category(tables['raw']), tables['category'], tables['rfm']
+
+
+def warmup_tasks(base_dir, data_dir):
+    """서버 워밍업 단계에서 미리 실행할 로더."""
+    price_data_dir = os.path.join(base_dir, "draft", "price", "dashboard data")
+    return {"load_price_data": (load_price_data, price_data_dir), "elasticities": (load_live_elasticities, data_dir)}
+
+
 def render(base_dir, data_dir):
     """가격/탄력성 분석 탭 렌더링"""
 
@@ -90,6 +126,15 @@ def render(base_dir, data_dir):
         st.info("💡 `draft/price/dashboard data/` 폴더에 분석 결과 CSV 파일들이 필요합니다.")
         return
 
+    # 원시 주문 데이터가 있으면 탄력성을 다시 추정해 저장된 CSV 결과 대신 사용
+    try:
+        refined_elas, raw_elas, cat_elas, rfm_elas = load_live_elasticities(data_dir)
+        st.caption("ℹ️ 탄력성 결과는 data_commerce 원시 데이터에서 다시 추정한 값이며, 주문/매출 차트는 가격 분석 추출본 기준입니다.")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        st.warning(f"탄력성 재추정 중 오류 발생, 저장된 분석 결과를 사용합니다: {e}")
+
     # --- 기간 필터 (메인 영역 - 고도화된 레이아웃) ---
     all_min_date = orders['order_purchase_timestamp'].min().date()
     all_max_date = orders['order_purchase_timestamp'].max().date()
@@ -111,8 +156,7 @@ def render(base_dir, data_dir):
     else:
         start_date, end_date = all_min_date, all_max_date
 
-    f_orders = orders[(orders['order_purchase_timestamp'].dt.date >= start_date) &
-                      (orders['order_purchase_timestamp'].dt.date <= end_date)]
+    f_orders = time_slice(orders, start_date, end_date)
     f_items = items[items['order_id'].isin(f_orders['order_id'])]
 
     with col_summary:
@@ -194,11 +238,13 @@ def render(base_dir, data_dir):
         st.subheader("선택 기간 주문 트렌드 (7일 이동평균 포함)")
         daily_sales = f_orders.set_index('order_purchase_timestamp').resample('D').size().reset_index(name='order_count')
         daily_sales['7d_ma'] = daily_sales['order_count'].rolling(window=7).mean()
+        # 이동평균은 전체 일자로 계산한 뒤, 차트에는 LTTB 로 줄인 점만 보냅니다
+        plot_sales = downsample(daily_sales, 'order_purchase_timestamp', ['order_count', '7d_ma'])
 
         fig_main = go.Figure()
-        fig_main.add_trace(go.Scatter(x=daily_sales['order_purchase_timestamp'], y=daily_sales['order_count'],
+        fig_main.add_trace(go.Scatter(x=plot_sales['order_purchase_timestamp'], y=plot_sales['order_count'],
                                       name='일별 주문수', line=dict(color='#d1d1e3', width=1), opacity=0.5))
-        fig_main.add_trace(go.Scatter(x=daily_sales['order_purchase_timestamp'], y=daily_sales['7d_ma'],
+        fig_main.add_trace(go.Scatter(x=plot_sales['order_purchase_timestamp'], y=plot_sales['7d_ma'],
                                       name='7일 이동평균', line=dict(color='#0c29d0', width=3)))
 
         holidays = [
@@ -223,11 +269,16 @@ def render(base_dir, data_dir):
         st.header("💎 경험의 가치: 시장 변동성 속의 본질적 가격 가치")
 
         st.subheader("탄력성 분포 변화: RAW vs REFINED (Overlay)")
+        # 두 분포를 같은 구간으로 서버에서 나눠 구간별 개수만 차트로 보냅니다
+        raw_vals = raw_elas[raw_elas.iloc[:, 1].between(-10, 5)].iloc[:, 1]
+        refined_vals = refined_elas[refined_elas.iloc[:, 1].between(-10, 5)].iloc[:, 1]
+        elas_edges = histogram_edges(pd.concat([raw_vals, refined_vals]), bins=60)
         fig_ovl = go.Figure()
-        fig_ovl.add_trace(go.Histogram(x=raw_elas[raw_elas.iloc[:, 1].between(-10, 5)].iloc[:, 1],
-                                       name='조정 전 (Raw)', marker_color='#d1d1e3', opacity=0.6))
-        fig_ovl.add_trace(go.Histogram(x=refined_elas[refined_elas.iloc[:, 1].between(-10, 5)].iloc[:, 1],
-                                       name='조정 후 (Refined)', marker_color='#0c29d0', opacity=0.7))
+        for vals, name, color, opacity in [(raw_vals, '조정 전 (Raw)', '#d1d1e3', 0.6),
+                                           (refined_vals, '조정 후 (Refined)', '#0c29d0', 0.7)]:
+            elas_bins = histogram_bins(vals, bins=elas_edges)
+            fig_ovl.add_trace(go.Bar(x=elas_bins['bin_mid'], y=elas_bins['count'], width=elas_bins['bin_end'] - elas_bins['bin_start'],
+                                     name=name, marker_color=color, opacity=opacity))
 
         fig_ovl.update_layout(barmode='overlay', template='plotly_white', xaxis_title="탄력성 지수", yaxis_title="빈도",
                               legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
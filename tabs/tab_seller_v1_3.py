@@ -6,45 +6,79 @@ import plotly.express as px
 import plotly.graph_objects as go
 import os
 
+from core.advance import DEFAULT_MONTHLY_RATES, AdvancePricer, portfolio_totals
+from core.binning import histogram_bins
+from core.cache_keys import cached_loader, dependency_signature, file_signature
+from core.cash_flow import COST_RATIO, ReceivablesEngine, monthly_net_flow
+from core.downsample import downsample
+from core.facts import STAR_SOURCE_FILES, get_table
+from core.ids import get_id_dictionary, id_dictionary_path
+from core.seller_index import get_seller_index, get_seller_slice
+from core.seller_profile import EMPTY_PROFILE, PROFILE_ITEM_COLUMNS, build_seller_profiles, seller_profile, tier_benchmarks
+
 
 # ====== 데이터 로드 함수 ======
-@st.cache_data
-def load_agg_data(seller_dir):
+def _encode_ids(df, data_dir):
+    """셀러 산출물의 ID 컬럼을 전역 ID 사전의 정수 코드로 바꿉니다.
+
+    data_commerce 에 없는(또는 오래된 원본에 아직 없는) ID 는 사전에 추가해 바로 저장하므로
+    모든 프로세스가 같은 코드를 쓰고, 셀러가 결측 코드 하나로 뭉치지 않습니다.
+    """
+    return get_id_dictionary(data_dir).register_frame(df)
+
+
+def _id_signature(seller_dir, data_dir):
+    """ID 사전 파일 상태 (다른 프로세스가 사전을 늘리면 인코딩된 산출물 캐시도 새 키로 다시 읽음)."""
+    return file_signature(id_dictionary_path(data_dir))
+
+
+def _encoded_loader(*relative_paths):
+    """ID 를 정수 코드로 바꿔 반환하는 산출물 로더: 파일 상태와 함께 ID 사전 상태도 캐시 키에 넣습니다."""
+    return cached_loader(*relative_paths, extra_signature=_id_signature)
+
+
+def _seller_label(data_dir, seller_code):
+    """정수 셀러 코드를 표시용 원본 ID 로 되돌립니다."""
+    return get_id_dictionary(data_dir).decode_one('seller_id', seller_code)
+
+
+@_encoded_loader("output/cash_flow/seller_cash_flow_detailed.csv")
+def load_agg_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "cash_flow", "seller_cash_flow_detailed.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_transaction_data(seller_dir):
+@_encoded_loader("output/cash_flow/seller_transaction_details.csv")
+def load_transaction_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "cash_flow", "seller_transaction_details.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_tier_data(seller_dir):
+@_encoded_loader("output/seller_tiers/all_sellers_metrics.csv")
+def load_tier_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "seller_tiers", "all_sellers_metrics.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_risk_data(seller_dir):
+@_encoded_loader("output/risk/sales_surge_risk.csv")
+def load_risk_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "risk", "sales_surge_risk.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_risk_all_data(seller_dir):
+@_encoded_loader("output/risk/sales_surge_all.csv")
+def load_risk_all_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "risk", "sales_surge_all.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_market_cat_data(seller_dir):
+@_encoded_loader("output/risk/market_category_trends.csv")
+def load_market_cat_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "risk", "market_category_trends.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
+@cached_loader("product_category_name_translation.csv")
 def load_category_translation(seller_dir):
     path = os.path.join(seller_dir, "product_category_name_translation.csv")
     if os.path.exists(path):
@@ -52,57 +86,116 @@ def load_category_translation(seller_dir):
         except: pass
     return None
 
-@st.cache_data
-def load_forecast_data(seller_dir):
+@_encoded_loader("output/risk/daily_sales_series.csv")
+def load_forecast_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "risk", "daily_sales_series.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_scm_data(seller_dir):
+@_encoded_loader("output/scm/seller_lead_time_analysis.csv")
+def load_scm_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "scm", "seller_lead_time_analysis.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_route_data(seller_dir):
+@_encoded_loader("output/scm/route_lead_time_stats.csv")
+def load_route_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "scm", "route_lead_time_stats.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_geo_data(seller_dir):
+@_encoded_loader("output/risk/seller_geo_stats.csv")
+def load_geo_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "risk", "seller_geo_stats.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
-def load_sku_data(seller_dir):
-    # Cache invalidation: 2026-02-18
+@_encoded_loader("output/risk/seller_sku_stats.csv")
+def load_sku_data(seller_dir, data_dir):
     path = os.path.join(seller_dir, "output", "risk", "seller_sku_stats.csv")
-    if os.path.exists(path): return pd.read_csv(path)
+    if os.path.exists(path): return _encode_ids(pd.read_csv(path), data_dir)
     return None
 
-@st.cache_data
+# fact_items columns used by the SKU / lead-time views
+RAW_COMMERCE_COLUMNS = [
+    'order_id', 'seller_id', 'category_eng', 'price', 'order_purchase_timestamp',
+    'order_delivered_carrier_date', 'order_delivered_customer_date',
+]
+
 def load_raw_commerce_data(data_dir):
-    """Load raw data for dynamic SKU analysis."""
+    """Shared item-grain fact table for dynamic SKU analysis."""
     try:
-        _items = pd.read_csv(os.path.join(data_dir, 'olist_order_items_dataset.csv'))
-        _orders = pd.read_csv(os.path.join(data_dir, 'olist_orders_dataset.csv'))
-        _products = pd.read_csv(os.path.join(data_dir, 'olist_products_dataset.csv'))
-        _trans = pd.read_csv(os.path.join(data_dir, 'product_category_name_translation.csv'))
-
-        _orders['order_purchase_timestamp'] = pd.to_datetime(_orders['order_purchase_timestamp'], errors='coerce')
-        _orders['order_delivered_carrier_date'] = pd.to_datetime(_orders['order_delivered_carrier_date'], errors='coerce')
-        _orders['order_delivered_customer_date'] = pd.to_datetime(_orders['order_delivered_customer_date'], errors='coerce')
-
-        df = _items.merge(_orders, on='order_id', how='left')
-        df = df.merge(_products[['product_id', 'product_category_name']], on='product_id', how='left')
-        df = df.merge(_trans, on='product_category_name', how='left')
-        df.rename(columns={'product_category_name_english': 'category_eng'}, inplace=True)
-        return df
-    except Exception:
+        return get_table(data_dir, "fact_items", RAW_COMMERCE_COLUMNS)
+    except FileNotFoundError:
+        return None
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_receivables(seller_dir, data_dir, source_signature):
+    trans = load_transaction_data(seller_dir, data_dir)
+    if trans is None:
         return None
+    tiers = load_tier_data(seller_dir, data_dir)
+    tier_map = tiers.drop_duplicates('seller_id').set_index('seller_id')['tier'] if tiers is not None else None
+    return ReceivablesEngine(trans, tier_map)
+
+def load_receivables(seller_dir, data_dir):
+    """Platform-wide installment schedule over every seller transaction (rebuilt when the CSVs change)."""
+    signature = load_transaction_data.signature(seller_dir, data_dir) + load_tier_data.signature(seller_dir, data_dir)
+    return _load_receivables(seller_dir, data_dir, signature)
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_advance_pricer(seller_dir, data_dir, source_signature):
+    receivables = load_receivables(seller_dir, data_dir)
+    return None if receivables is None else AdvancePricer(receivables)
+
+def load_advance_pricer(seller_dir, data_dir):
+    """Per-seller pending-installment totals for Tier 1/2 cash-advance quotes."""
+    signature = load_transaction_data.signature(seller_dir, data_dir) + load_tier_data.signature(seller_dir, data_dir)
+    return _load_advance_pricer(seller_dir, data_dir, signature)
+
+PROFILE_LOADERS = (load_tier_data, load_sku_data, load_agg_data, load_geo_data)
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_seller_profiles(seller_dir, data_dir, source_signature):
+    tiers, sku, agg, geo = (loader(seller_dir, data_dir) for loader in PROFILE_LOADERS)
+    try:
+        items = get_table(data_dir, "fact_items", PROFILE_ITEM_COLUMNS)
+    except FileNotFoundError:
+        items = None
+    profiles = build_seller_profiles(tiers, sku, agg, geo, items)
+    benchmarks = tier_benchmarks(items, tiers) if items is not None and tiers is not None else None
+    return profiles, benchmarks
+
+def load_seller_profiles(seller_dir, data_dir):
+    """Materialized per-seller summary table and per-tier lead-time benchmarks (rebuilt when any input changes)."""
+    signature = sum((loader.signature(seller_dir, data_dir) for loader in PROFILE_LOADERS), ())
+    signature += dependency_signature(data_dir, STAR_SOURCE_FILES)
+    return _load_seller_profiles(seller_dir, data_dir, signature)
+
+def _seller_rows(loader, seller_dir, data_dir, seller_id):
+    """One seller's rows from a loader's output via the cached per-seller index (None if the file is missing)."""
+    index = get_seller_index(loader, seller_dir, data_dir)
+    return None if index is None else get_seller_slice(index, seller_id)
+
+def warmup_tasks(base_dir, data_dir):
+    """Loaders pre-built by the server warm-up stage."""
+    seller_dir = os.path.join(base_dir, "draft", "seller")
+    tasks = {
+        loader.__name__: (loader, seller_dir, data_dir)
+        for loader in (
+            load_agg_data, load_transaction_data, load_tier_data, load_risk_data, load_risk_all_data,
+            load_market_cat_data, load_forecast_data, load_scm_data, load_route_data, load_geo_data, load_sku_data,
+        )
+    }
+    for loader in (load_agg_data, load_transaction_data, load_tier_data, load_risk_all_data,
+                   load_forecast_data, load_scm_data, load_geo_data, load_sku_data):
+        tasks[f"seller_index.{loader.__name__}"] = (get_seller_index, loader, seller_dir, data_dir)
+    tasks["load_receivables"] = (load_receivables, seller_dir, data_dir)
+    tasks["load_advance_pricer"] = (load_advance_pricer, seller_dir, data_dir)
+    tasks["load_seller_profiles"] = (load_seller_profiles, seller_dir, data_dir)
+    tasks["load_category_translation"] = (load_category_translation, seller_dir)
+    tasks["load_raw_commerce_data"] = (load_raw_commerce_data, data_dir)
+    return tasks
 
 
 # ====== 메인 렌더 함수 ======
@@ -149,8 +242,8 @@ def render(base_dir, data_dir):
 
 
     # === 데이터 로드 및 전처리에 필요한 설정 ===
-    df_agg = load_agg_data(SELLER_DIR)
-    df_tier = load_tier_data(SELLER_DIR)
+    df_agg = load_agg_data(SELLER_DIR, data_dir)
+    df_tier = load_tier_data(SELLER_DIR, data_dir)
     cat_trans = load_category_translation(SELLER_DIR)
 
     if df_agg is None or df_tier is None:
@@ -159,15 +252,16 @@ def render(base_dir, data_dir):
 
     # Tier & Risk mapping for formatting
     tier_map = dict(zip(df_tier['seller_id'], df_tier['tier']))
-    df_risks_data = load_risk_data(SELLER_DIR)
-    risk_list = df_risks_data['seller_id'].unique().tolist() if df_risks_data is not None else []
+    df_risks_data = load_risk_data(SELLER_DIR, data_dir)
+    risk_list = set(df_risks_data['seller_id'].unique().tolist()) if df_risks_data is not None else set()
 
-    def format_seller(s_id):
+    def format_seller(s_code):
+        s_id = _seller_label(data_dir, s_code) or ""
         labels = []
-        if s_id in tier_map:
-            t = str(tier_map[s_id])
+        if s_code in tier_map:
+            t = str(tier_map[s_code])
             if 'Tier 1' in t: labels.append("💎 T1")
-        if s_id in risk_list: labels.append("🚨 Risk")
+        if s_code in risk_list: labels.append("🚨 Risk")
         return f"{s_id[:12]} ({', '.join(labels)})" if labels else s_id[:15]
 
     # === 통합 싱글 로우 헤더 (Simplified Widgets) ===
@@ -180,9 +274,14 @@ def render(base_dir, data_dir):
 
     # 선택 영역 (우측 1/2)
     with col_select:
-        available_sellers = sorted(df_agg['seller_id'].unique().tolist())
+        # 정렬/검색은 표시용 ID 문자열 기준, 선택 값은 정수 코드
+        seller_codes = df_agg['seller_id'].unique()
+        seller_names = get_id_dictionary(data_dir).decode('seller_id', seller_codes).astype(str)
+        order = np.argsort(seller_names)
+        seller_codes, seller_names = seller_codes[order], seller_names[order]
         if seller_search:
-            available_sellers = [s for s in available_sellers if seller_search.lower() in s.lower()]
+            seller_codes = seller_codes[np.char.find(np.char.lower(seller_names), seller_search.lower()) >= 0]
+        available_sellers = [int(c) for c in seller_codes]
         
         st.markdown('<p style="font-size:13px; font-weight:700; color:#50557c; margin-bottom:8px; display:flex; align-items:center;"><span style="margin-right:8px;">🎯</span> 분석 대상 셀러 선택</p>', unsafe_allow_html=True)
         if available_sellers:
@@ -223,19 +322,19 @@ def render(base_dir, data_dir):
 
     # --- 서브 메뉴 콘텐츠 기반 조건부 렌더링 ---
     if sub_menu == "📉 여정의 불편: 운영 리스크 진단":
-        _render_risk_tab(SELLER_DIR, data_dir, selected_seller, df_agg, df_tier)
+        _render_risk_tab(SELLER_DIR, data_dir, selected_seller)
 
     # --- Tab: Cash Flow Cycle ---
     elif sub_menu == "💎 경험의 가치: 정산 및 유동성":
         st.header("💎 경험의 가치: 파트너 정산 및 자금 유동성 분석")
         st.markdown("할부 결제로 인한 **명목 매출(GMV)**과 **실제 현금 유입(Realized Cash)** 간의 시차(Gap)를 분석합니다.")
 
-        st.caption(f"Currently Analyzing: **{selected_seller}**")
+        st.caption(f"Currently Analyzing: **{_seller_label(data_dir, selected_seller)}**")
         st.divider()
 
         # Promotion Banner for Tier 1 Sellers
         if df_tier is not None:
-            current_tier_info = df_tier[df_tier['seller_id'] == selected_seller]
+            current_tier_info = _seller_rows(load_tier_data, SELLER_DIR, data_dir, selected_seller)
             if not current_tier_info.empty:
                 tier_str = str(current_tier_info['tier'].iloc[0])
                 if str(tier_str).startswith("Tier 1"):
@@ -260,7 +359,7 @@ def render(base_dir, data_dir):
         # Monthly Cash Flow Cycle
         st.subheader("📉 월별 현금 흐름 사이클 (Monthly Overview)")
 
-        data = df_agg[df_agg['seller_id'] == selected_seller].copy()
+        data = _seller_rows(load_agg_data, SELLER_DIR, data_dir, selected_seller).copy()
         data['month'] = pd.to_datetime(data['month'])
         data['nominal_gmv'] = pd.to_numeric(data['nominal_gmv'], errors='coerce').fillna(0)
         data['realized_cash'] = pd.to_numeric(data['realized_cash'], errors='coerce').fillna(0)
@@ -292,42 +391,20 @@ def render(base_dir, data_dir):
 
         # Monthly Net Cash Flow
         st.subheader("📆 월별 순 현금 흐름 (Monthly Net Cash Flow)")
-        st.info("💡 **가정**: 주문 시점에 매출액의 **70%가 선지출(비용)**된다고 가정하여, 실제 현금 흐름(입금-출금)을 **월 단위**로 시뮬레이션합니다.")
+        st.info(f"💡 **가정**: 주문 시점에 매출액의 **{COST_RATIO:.0%}가 선지출(비용)**된다고 가정하여, 실제 현금 흐름(입금-출금)을 **월 단위**로 시뮬레이션합니다.")
 
-        df_trans = load_transaction_data(SELLER_DIR)
-        if df_trans is not None:
-            sel_trans = df_trans[df_trans['seller_id'] == selected_seller].copy()
+        sel_trans = _seller_rows(load_transaction_data, SELLER_DIR, data_dir, selected_seller)
+        if sel_trans is not None:
+            sel_trans = sel_trans.copy()
 
             if not sel_trans.empty:
                 sel_trans['order_approved_at'] = pd.to_datetime(sel_trans['order_approved_at'], errors='coerce')
                 sel_trans = sel_trans.dropna(subset=['order_approved_at'])
 
-                flow_rows = []
-                cost_ratio = 0.70
-
-                for _, row in sel_trans.iterrows():
-                    p_val = row['payment_value']
-                    inst = int(row['payment_installments'])
-                    if inst <= 0: inst = 1
-                    base_date = row['order_approved_at']
-
-                    flow_rows.append({'date': base_date, 'amount': -1 * p_val * cost_ratio, 'type': 'Outflow'})
-
-                    if row['payment_type'] == 'credit_card':
-                        unit_val = p_val / inst
-                        for i in range(1, inst + 1):
-                            deposit_dt = base_date + pd.Timedelta(days=30*i)
-                            flow_rows.append({'date': deposit_dt, 'amount': unit_val, 'type': 'Inflow'})
-                    else:
-                        deposit_dt = base_date + pd.Timedelta(days=3)
-                        flow_rows.append({'date': deposit_dt, 'amount': p_val, 'type': 'Inflow'})
-
-                if flow_rows:
-                    df_flow = pd.DataFrame(flow_rows)
-                    df_flow['date'] = pd.to_datetime(df_flow['date'])
-
-                    df_monthly = df_flow.set_index('date').resample('MS')['amount'].sum().reset_index()
+                # Installments are expanded and bucketed by month in one array pass
+                df_monthly = monthly_net_flow(sel_trans)
 
+                if not df_monthly.empty:
                     monthly_chart = alt.Chart(df_monthly).mark_bar().encode(
                         x=alt.X('date:T', title='월 (Month)', axis=alt.Axis(format='%Y-%m')),
                         y=alt.Y('amount:Q', title='순 현금 흐름 (BRL)'),
@@ -350,6 +427,82 @@ def render(base_dir, data_dir):
         else:
             st.warning("상세 데이터 파일을 찾을 수 없습니다.")
 
+        st.divider()
+
+        # Platform-wide receivables: every seller's installments expanded in one batch
+        st.subheader("🏦 플랫폼 정산 예정액 및 미지급 잔액 (Receivables Projection)")
+        receivables = load_receivables(SELLER_DIR, data_dir)
+        if receivables is not None and len(receivables) > 0:
+            as_of = receivables.as_of
+            due_by_tier = receivables.outstanding(by='tier')
+            due_by_seller = receivables.outstanding(by='seller_id')
+            tier1_due = due_by_tier[due_by_tier.index.str.startswith('Tier 1')].sum()
+
+            col_r1, col_r2, col_r3 = st.columns(3)
+            col_r1.metric("플랫폼 전체 미지급 정산금", f"R$ {receivables.outstanding():,.0f}")
+            col_r2.metric("Tier 1 선입금 소요 재원", f"R$ {tier1_due:,.0f}")
+            col_r3.metric("선택 셀러 미지급 잔액", f"R$ {due_by_seller.get(selected_seller, 0.0):,.0f}")
+            st.caption(f"기준일 **{as_of:%Y-%m-%d}** (마지막 승인일) 기준, 승인됐지만 아직 입금되지 않은 할부 정산금입니다.")
+
+            liability_chart = alt.Chart(receivables.liability_curve(by='tier')).mark_area(opacity=0.7).encode(
+                x=alt.X('date:T', title='날짜'),
+                y=alt.Y('outstanding:Q', title='미지급 잔액 (BRL)', stack=True),
+                color=alt.Color('group:N', title='티어'),
+                tooltip=[alt.Tooltip('date:T', title='날짜'), alt.Tooltip('group:N', title='티어'),
+                         alt.Tooltip('outstanding:Q', format=',.0f', title='미지급 잔액')]
+            )
+            as_of_rule = alt.Chart(pd.DataFrame({'date': [as_of]})).mark_rule(color='red', strokeDash=[4, 4]).encode(x='date:T')
+            st.altair_chart((liability_chart + as_of_rule).properties(height=300), use_container_width=True)
+
+            st.markdown("###### 📅 기준일 이후 월별 지급 예정액 (티어별)")
+            future = receivables.payouts(by='tier', freq='MS', after=as_of)
+            payout_chart = alt.Chart(future).mark_bar().encode(
+                x=alt.X('date:T', title='월', axis=alt.Axis(format='%Y-%m')),
+                y=alt.Y('payout:Q', title='지급 예정액 (BRL)'),
+                color=alt.Color('group:N', title='티어'),
+                tooltip=[alt.Tooltip('date', format='%Y-%m', title='월'), alt.Tooltip('group:N', title='티어'),
+                         alt.Tooltip('payout:Q', format=',.0f', title='지급 예정액')]
+            ).properties(height=260)
+            st.altair_chart(payout_chart, use_container_width=True)
+        else:
+            st.warning("정산 예정액을 계산할 거래 내역이 없습니다.")
+
+        st.divider()
+
+        # Cash-advance quotes: totals are pre-aggregated, so every slider move reprices all sellers at once
+        st.subheader("💸 선입금 견적 (Cash Advance Quote)")
+        pricer = load_advance_pricer(SELLER_DIR, data_dir)
+        if pricer is not None and len(pricer) > 0:
+            col_f1, col_f2, col_f3 = st.columns(3)
+            rate_t1 = col_f1.slider("Tier 1 월 할인율 (%)", 0.5, 5.0, DEFAULT_MONTHLY_RATES["Tier 1"] * 100, 0.01, key="advance_rate_t1")
+            rate_t2 = col_f2.slider("Tier 2 월 할인율 (%)", 0.5, 5.0, DEFAULT_MONTHLY_RATES["Tier 2"] * 100, 0.01, key="advance_rate_t2")
+            advance_pct = col_f3.slider("선입금 비율 (%)", 10, 100, 100, 5, key="advance_ratio")
+            rates = {"Tier 1": rate_t1 / 100, "Tier 2": rate_t2 / 100}
+            quotes = pricer.quotes(rates, advance_pct / 100)
+
+            my_quote = quotes[quotes['seller_id'] == selected_seller]
+            if not my_quote.empty:
+                q = my_quote.iloc[0]
+                col_q1, col_q2, col_q3, col_q4 = st.columns(4)
+                col_q1.metric("미지급 정산금", f"R$ {q['receivable']:,.2f}", f"평균 {q['avg_days']:.0f}일 후 입금", delta_color="off")
+                col_q2.metric("선입금 실지급액", f"R$ {q['advance_amount']:,.2f}")
+                col_q3.metric("할인 비용", f"R$ {q['discount_cost']:,.2f}")
+                col_q4.metric("실효 월 금리", f"{q['effective_rate']:.2%}" if pd.notna(q['effective_rate']) else "-")
+            else:
+                st.info("선택한 셀러는 선입금 대상(Tier 1/2)이 아니거나 기준일 이후 입금될 정산금이 없습니다.")
+
+            st.markdown(f"###### 📦 포트폴리오 합계 (기준일 {pricer.as_of:%Y-%m-%d}, 대상 셀러 {len(quotes):,}명)")
+            portfolio = portfolio_totals(quotes).reset_index().rename(columns={
+                'tier': '티어', 'sellers': '셀러 수', 'receivable': '미지급 정산금', 'gross_amount': '선입금 총액',
+                'discount_cost': '할인 수익', 'advance_amount': '실지급액',
+            })
+            st.dataframe(
+                portfolio.style.format({'미지급 정산금': 'R$ {:,.0f}', '선입금 총액': 'R$ {:,.0f}', '할인 수익': 'R$ {:,.0f}', '실지급액': 'R$ {:,.0f}'}),
+                use_container_width=True, hide_index=True
+            )
+        else:
+            st.info("선입금 견적을 낼 Tier 1/2 셀러의 미지급 정산금이 없습니다.")
+
     elif sub_menu == "🚀 성장의 개선: 재고 및 판매 기회":
         _render_turnover_tab(SELLER_DIR, data_dir, selected_seller)
 
@@ -362,14 +515,14 @@ def _render_turnover_tab(SELLER_DIR, data_dir, selected_seller):
     st.header("🚀 성장의 개선: 재고 리스크 및 판매 골든타임 분석")
     st.markdown("**재고 소진 위험(Stockout Risk)**이 높은 '급판매(Sales Surge)' 구간을 탐지하여 최적의 발주 시점을 제시합니다.")
 
-    df_risk = load_risk_data(SELLER_DIR)
-    df_all = load_risk_all_data(SELLER_DIR)
-    df_market = load_market_cat_data(SELLER_DIR)
+    df_risk = load_risk_data(SELLER_DIR, data_dir)
+    seller_all = _seller_rows(load_risk_all_data, SELLER_DIR, data_dir, selected_seller)
+    df_market = load_market_cat_data(SELLER_DIR, data_dir)
 
-    if df_risk is not None and df_all is not None:
-        st.subheader(f"분석 대상: {selected_seller}")
+    if df_risk is not None and seller_all is not None:
+        st.subheader(f"분석 대상: {_seller_label(data_dir, selected_seller)}")
 
-        risk_sellers = df_risk['seller_id'].unique().tolist()
+        risk_sellers = set(df_risk['seller_id'].unique().tolist())
         if selected_seller in risk_sellers:
             st.error(f"🚨 **위기 감지(Risk Detected)**: 최근 급판매 혹은 재고 소진 위험이 높은 셀러입니다.")
         else:
@@ -381,7 +534,7 @@ def _render_turnover_tab(SELLER_DIR, data_dir, selected_seller):
         st.divider()
         st.subheader("📈 판매 트렌드 확인 (카테고리별/전체)")
 
-        seller_all = df_all[df_all['seller_id'] == selected_seller].copy()
+        seller_all = seller_all.copy()
         raw_cats = seller_all['category_eng'].unique().tolist()
         display_cats = []
         if 'ALL_CATEGORIES' in raw_cats:
@@ -411,12 +564,16 @@ def _render_turnover_tab(SELLER_DIR, data_dir, selected_seller):
         if pd.isna(max_y) or max_y == 0: max_y = 10 
         y_domain = [0, max_y * 1.10]
 
-        line = alt.Chart(chart_data).mark_line(point=True, color='#3b82f6').encode(
+        # LTTB-downsample the trend lines; risk points below still come from the full series
+        trend_cols = [c for c in ['sales_count', 'moving_avg_30d'] if c in chart_data.columns]
+        trend_data = downsample(chart_data, 'month_dt', trend_cols)
+
+        line = alt.Chart(trend_data).mark_line(point=True, color='#3b82f6').encode(
             x=alt.X('month_dt:T', title='월'),
             y=alt.Y('sales_count:Q', title='판매량', scale=alt.Scale(domain=y_domain)),
             tooltip=['month', 'sales_count', 'z_score']
         )
-        ma_line = alt.Chart(chart_data).mark_line(strokeDash=[5,5], color='#60a5fa', opacity=0.7).encode(
+        ma_line = alt.Chart(trend_data).mark_line(strokeDash=[5,5], color='#60a5fa', opacity=0.7).encode(
             x='month_dt:T', y='moving_avg_30d:Q'
         )
         layers = [line, ma_line]
@@ -485,91 +642,44 @@ def _render_turnover_tab(SELLER_DIR, data_dir, selected_seller):
 
 
 
-def _render_risk_tab(SELLER_DIR, data_dir, selected_seller, df_agg, df_tier):
+def _render_risk_tab(SELLER_DIR, data_dir, selected_seller):
     """종합 운영 리스크 분석 탭"""
     st.header("📉 여정의 불편: 셀러 운영 건전성 및 리스크 진단")
 
-    df_sku = load_sku_data(SELLER_DIR)
-    if df_sku is not None:
+    sku_index = get_seller_index(load_sku_data, SELLER_DIR, data_dir)
+    if sku_index is not None:
         sel_op = selected_seller
-        st.caption(f"Currently Analyzing: **{sel_op}**")
+        st.caption(f"Currently Analyzing: **{_seller_label(data_dir, sel_op)}**")
 
         # Seller Profile & Risk Summary (7 Key Metrics)
         st.markdown("##### 📋 실무 인사이트 요약")
 
-        # 1. Tier Info
-        tier_val = "-"
-        if df_tier is not None:
-            t_row = df_tier[df_tier['seller_id'] == sel_op]
-            if not t_row.empty: tier_val = t_row['tier'].iloc[0]
-
-        # 2. Total Orders & Review Score & Top Category
-        total_orders = 0
-        avg_review = 0.0
-        top_cat = "-"
-
-        sku_subset = df_sku[df_sku['seller_id'] == sel_op]
-        if not sku_subset.empty:
-            total_orders = sku_subset['sku_sales_count'].sum()
-            if total_orders > 0:
-                avg_review = (sku_subset['sku_avg_review_score'] * sku_subset['sku_sales_count']).sum() / total_orders
-            else:
-                avg_review = sku_subset['sku_avg_review_score'].mean()
-            top_cat = sku_subset.groupby('category_eng')['sku_sales_count'].sum().idxmax()
-
-        # 3. Monthly Avg Orders
-        monthly_avg = 0
-        if df_agg is not None:
-            agg_subset = df_agg[df_agg['seller_id'] == sel_op]
-            if not agg_subset.empty:
-                months_count = agg_subset['month'].nunique()
-                if months_count > 0:
-                    monthly_avg = total_orders / months_count
-
-        # 4. Avg Handling & Delivery Time
-        avg_handling = 0.0
-        avg_delivery = 0.0
-        delta_val = None
-        top_state = "-"
-
+        # Seven summary metrics are a single row of the cached profile table
         try:
-            if os.path.exists(data_dir):
-                _items = pd.read_csv(os.path.join(data_dir, 'olist_order_items_dataset.csv'))
-                _orders = pd.read_csv(os.path.join(data_dir, 'olist_orders_dataset.csv'))
-
-                sel_items = _items[_items['seller_id'] == sel_op]
-                sel_raw_direct = sel_items.merge(_orders, on='order_id', how='left')
-
-                if not sel_raw_direct.empty:
-                    sel_raw_direct['p'] = pd.to_datetime(sel_raw_direct['order_purchase_timestamp'])
-                    sel_raw_direct['c'] = pd.to_datetime(sel_raw_direct['order_delivered_carrier_date'])
-                    sel_raw_direct['d'] = pd.to_datetime(sel_raw_direct['order_delivered_customer_date'])
-
-                    avg_handling = ((sel_raw_direct['c'] - sel_raw_direct['p']).dt.total_seconds() / 86400).mean()
-                    avg_delivery = ((sel_raw_direct['d'] - sel_raw_direct['p']).dt.total_seconds() / 86400).mean()
-
-            # Benchmark (Tier 1)
-            raw_df_profile = load_raw_commerce_data(data_dir)
-            if raw_df_profile is not None and df_tier is not None:
-                tier1_ids = df_tier[df_tier['tier'].astype(str).str.contains('Tier 1', na=False)]['seller_id'].unique()
-                if len(tier1_ids) > 0:
-                    t1_raw = raw_df_profile[raw_df_profile['seller_id'].isin(tier1_ids)]
-                    if not t1_raw.empty:
-                        t1_d_days = (t1_raw['order_delivered_customer_date'] - t1_raw['order_purchase_timestamp']).dt.total_seconds() / (24*3600)
-                        tier1_avg = t1_d_days.mean()
-                        if pd.notna(tier1_avg) and pd.notna(avg_delivery):
-                            diff = avg_delivery - tier1_avg
-                            delta_val = f"{diff:+.1f}일 (vs Tier 1)"
+            profiles, benchmarks = load_seller_profiles(SELLER_DIR, data_dir)
+            profile = seller_profile(profiles, sel_op)
         except Exception as e:
             st.error(f"Time Calc Error: {e}")
+            profile, benchmarks = EMPTY_PROFILE, None
+        tier_val = profile['tier']
+        total_orders = profile['total_orders']
+        monthly_avg = profile['monthly_avg']
+        avg_review = profile['avg_review']
+        avg_handling = profile['avg_handling']
+        avg_delivery = profile['avg_delivery']
+        top_state = profile['top_state']
+        top_cat = profile['top_category']
+
+        # Benchmark (Tier 1)
+        delta_val = None
+        if benchmarks is not None:
+            tier1 = benchmarks[benchmarks.index.astype(str).str.contains('Tier 1', na=False)]
+            if not tier1.empty:
+                tier1_avg = tier1['avg_delivery'].iloc[0]
+                if pd.notna(tier1_avg) and pd.notna(avg_delivery):
+                    delta_val = f"{avg_delivery - tier1_avg:+.1f}일 (vs Tier 1)"
 
-        # 5. Top State from Geo Data
-        df_geo_tmp = load_geo_data(SELLER_DIR)
-        if df_geo_tmp is not None:
-            g_rows = df_geo_tmp[df_geo_tmp['seller_id'] == sel_op]
-            if not g_rows.empty:
-                top_rec = g_rows.sort_values('order_count', ascending=False).iloc[0]
-                top_state = f"{top_rec['customer_state']}"
+        sku_subset = get_seller_slice(sku_index, sel_op)
 
         # Display Metrics
         # Display Metrics (Custom HTML for Equal Height)
@@ -675,7 +785,7 @@ def _render_risk_tab(SELLER_DIR, data_dir, selected_seller, df_agg, df_tier):
 
         st.divider()
         st.subheader("🔍 카테고리 내 SKU별 성과")
-        sku_filtered = df_sku[df_sku['seller_id'] == sel_op].copy()
+        sku_filtered = sku_subset.copy()
 
         my_cats = sku_filtered['category_eng'].unique().tolist()
         my_cats = ['ALL_CATEGORIES'] + sorted(my_cats)
@@ -686,6 +796,7 @@ def _render_risk_tab(SELLER_DIR, data_dir, selected_seller, df_agg, df_tier):
 
         if not sku_filtered.empty:
             top_skus = sku_filtered.sort_values('sku_sales_count', ascending=False).head(10)
+            top_skus['product_id'] = get_id_dictionary(data_dir).decode('product_id', top_skus['product_id'])
             st.dataframe(
                 top_skus[['product_id', 'sku_sales_count', 'sku_share_in_cat', 'sku_avg_review_score', 'sku_avg_price']]
                 .style
@@ -718,12 +829,15 @@ def _render_risk_tab(SELLER_DIR, data_dir, selected_seller, df_agg, df_tier):
                 if not cat_items.empty:
                     p95 = cat_items['price'].quantile(0.95)
                     market_prices = cat_items[cat_items['price'] <= p95]
-                    hist_chart = alt.Chart(market_prices).mark_bar(color='#e2e8f0').encode(
-                        x=alt.X('price:Q', bin=alt.Bin(maxbins=50), title='가격대 (BRL)'),
-                        y=alt.Y('count()', title='상품 수')
+                    # Bin on the server so only edges and counts reach the browser
+                    price_bins = histogram_bins(market_prices['price'], bins=50)
+                    hist_chart = alt.Chart(price_bins).mark_bar(color='#e2e8f0').encode(
+                        x=alt.X('bin_start:Q', title='가격대 (BRL)'),
+                        x2='bin_end:Q',
+                        y=alt.Y('count:Q', title='상품 수')
                     )
 
-                    my_skus_pp = df_sku[(df_sku['seller_id'] == sel_op) & (df_sku['category_eng'] == target_cat_pp)]
+                    my_skus_pp = sku_subset[sku_subset['category_eng'] == target_cat_pp]
                     my_avg = my_skus_pp['sku_avg_price'].mean()
 
                     if pd.notna(my_avg):
@@ -756,9 +870,9 @@ def _render_risk_tab(SELLER_DIR, data_dir, selected_seller, df_agg, df_tier):
         st.divider()
         st.subheader("🗺️ 지역별 고객 분포 및 물류 효율 (Geo Distribution)")
 
-        df_geo = load_geo_data(SELLER_DIR)
+        df_geo = load_geo_data(SELLER_DIR, data_dir)
         if df_geo is not None:
-            seller_geo = df_geo[df_geo['seller_id'] == sel_op].copy()
+            seller_geo = _seller_rows(load_geo_data, SELLER_DIR, data_dir, sel_op).copy()
 
             if not seller_geo.empty:
                 seller_geo['order_count'] = pd.to_numeric(seller_geo['order_count'], errors='coerce').fillna(0)
@@ -871,7 +985,7 @@ def _render_scm_tab(SELLER_DIR, data_dir, selected_seller, df_tier):
     # 1. Access Check
     has_access = False
     if df_tier is not None:
-        t_info = df_tier[df_tier['seller_id'] == selected_seller]
+        t_info = _seller_rows(load_tier_data, SELLER_DIR, data_dir, selected_seller)
         if not t_info.empty:
             tier_s = str(t_info['tier'].iloc[0])
             if 'Tier 1' in tier_s or 'Tier 2' in tier_s:
@@ -905,17 +1019,17 @@ def _render_scm_tab(SELLER_DIR, data_dir, selected_seller, df_tier):
         """)
         return
 
-    df_forecast = load_forecast_data(SELLER_DIR)
+    forecast_index = get_seller_index(load_forecast_data, SELLER_DIR, data_dir)
 
     sel_f = selected_seller
-    if df_forecast is not None:
-        st.caption(f"Currently Analyzing: **{sel_f}**")
+    if forecast_index is not None:
+        st.caption(f"Currently Analyzing: **{_seller_label(data_dir, sel_f)}**")
     else:
         st.error("예측 데이터 파일이 없어 셀러 목록을 불러올 수 없습니다.")
 
     st.subheader("1️⃣ AI 수요 예측 및 발주 추천")
-    if sel_f and df_forecast is not None:
-        seller_data = df_forecast[df_forecast['seller_id'] == sel_f]
+    if sel_f is not None and forecast_index is not None:
+        seller_data = get_seller_slice(forecast_index, sel_f)
 
         if not seller_data.empty:
             cats_f = seller_data['category_eng'].dropna().unique().tolist()
@@ -966,7 +1080,8 @@ def _render_scm_tab(SELLER_DIR, data_dir, selected_seller, df_tier):
                         'upper': future_upper
                     })
 
-                    df_hist = ts_daily[['date', 'daily_sales_count']].rename(columns={'daily_sales_count': 'value'})
+                    # History is LTTB-downsampled for the chart; the fit above uses every day
+                    df_hist = downsample(ts_daily, 'date', ['daily_sales_count'])[['date', 'daily_sales_count']].rename(columns={'daily_sales_count': 'value'})
                     df_hist['type'] = 'History'
 
                     chart_df = pd.concat([df_hist, df_future], ignore_index=True)
@@ -996,20 +1111,19 @@ def _render_scm_tab(SELLER_DIR, data_dir, selected_seller, df_tier):
             else:
                 st.warning("⚠️ 예측 가능한 카테고리가 없습니다.")
         else:
-            st.warning(f"⚠️ 선택하신 셀러 **'{sel_f}'**의 시계열 판매 데이터(Sales Series)가 존재하지 않습니다.")
+            st.warning(f"⚠️ 선택하신 셀러 **'{_seller_label(data_dir, sel_f)}'**의 시계열 판매 데이터(Sales Series)가 존재하지 않습니다.")
     else:
         st.warning("📉 예측 데이터를 로드할 수 없습니다.")
 
     st.divider()
     st.subheader("2️⃣ 배송 리스크 및 안전재고 최적화")
 
-    scm_path = os.path.join(SELLER_DIR, "output", "scm", "seller_lead_time_analysis.csv")
     route_path = os.path.join(SELLER_DIR, "output", "scm", "route_lead_time_stats.csv")
+    scm_index = get_seller_index(load_scm_data, SELLER_DIR, data_dir)
 
-    if sel_f and os.path.exists(scm_path) and os.path.exists(route_path) and df_forecast is not None:
-        df_scm = pd.read_csv(scm_path)
-        my_scm = df_scm[df_scm['seller_id'] == sel_f].copy()
-        seller_data_local = df_forecast[df_forecast['seller_id'] == sel_f]
+    if sel_f is not None and scm_index is not None and os.path.exists(route_path) and forecast_index is not None:
+        my_scm = get_seller_slice(scm_index, sel_f).copy()
+        seller_data_local = get_seller_slice(forecast_index, sel_f)
 
         if not my_scm.empty:
             # Pre-calculate AI Forecast for ALL categories
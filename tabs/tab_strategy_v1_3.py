@@ -5,6 +5,8 @@ import matplotlib.pyplot as plt
 import matplotlib
 import os
 
+from core.facts import get_table
+
 # 한글 폰트 설정 (matplotlib)
 matplotlib.rcParams['font.family'] = 'Malgun Gothic'
 matplotlib.rcParams['axes.unicode_minus'] = False
@@ -19,36 +21,21 @@ OLIST_ACCENT_RED = '#ef4444'
 OLIST_ACCENT_GREEN = '#10b981'
 
 
-@st.cache_data
+# 탭에서 사용하는 fact_orders 컬럼
+STRATEGY_COLUMNS = [
+    'order_id', 'customer_unique_id', 'customer_state', 'order_status', 'order_purchase_timestamp',
+    'payment_value', 'uses_voucher', 'review_score', 'delivery_days',
+]
+
+
 def load_merged_data(data_dir):
-    """data_commerce 폴더에서 데이터를 로드하여 병합합니다."""
-    orders = pd.read_csv(os.path.join(data_dir, "olist_orders_dataset.csv"))
-    items = pd.read_csv(os.path.join(data_dir, "olist_order_items_dataset.csv"))
-    customers = pd.read_csv(os.path.join(data_dir, "olist_customers_dataset.csv"))
-    products = pd.read_csv(os.path.join(data_dir, "olist_products_dataset.csv"))
-    reviews = pd.read_csv(os.path.join(data_dir, "olist_order_reviews_dataset.csv"))
-    payments = pd.read_csv(os.path.join(data_dir, "olist_order_payments_dataset.csv"))
-
-    # 날짜 변환
-    for col in ['order_purchase_timestamp', 'order_delivered_customer_date', 'order_estimated_delivery_date']:
-        if col in orders.columns:
-            orders[col] = pd.to_datetime(orders[col], errors='coerce')
-
-    # 병합
-    df = orders.merge(items, on='order_id', how='inner')
-    df = df.merge(products, on='product_id', how='left')
-    df = df.merge(customers, on='customer_id', how='left')
-    df = df.merge(reviews, on='order_id', how='left')
-    df = df.merge(payments, on='order_id', how='left')
-
-    # 배송 관련 파생 컬럼
-    df['delivery_days'] = (df['order_delivered_customer_date'] - df['order_purchase_timestamp']).dt.days
-    df['estimated_days'] = (df['order_estimated_delivery_date'] - df['order_purchase_timestamp']).dt.days
-    df['delay_days'] = df['delivery_days'] - df['estimated_days']
-    df['freight_ratio'] = df['freight_value'] / (df['price'] + df['freight_value'])
-    df['total_cost'] = df['price'] + df['freight_value']
-
-    return df
+    """공유 팩트 모델에서 주문 그레인 팩트를 가져옵니다 (상품 x 결제 x 리뷰 중복 없음)."""
+    return get_table(data_dir, "fact_orders", STRATEGY_COLUMNS)
+
+
+def warmup_tasks(base_dir, data_dir):
+    """서버 워밍업 단계에서 미리 실행할 로더."""
+    return {"load_merged_data": (load_merged_data, data_dir)}
 
 
 def render(base_dir, data_dir):
@@ -164,7 +151,7 @@ def render(base_dir, data_dir):
 
     valid_df = df.dropna(subset=['delivery_days', 'customer_state'])
     if not valid_df.empty:
-        state_stats = valid_df.groupby('customer_state').agg(
+        state_stats = valid_df.groupby('customer_state', observed=True).agg(
             avg_delivery=('delivery_days', 'mean'),
             avg_review=('review_score', 'mean')
         ).reset_index().sort_values('avg_delivery', ascending=False)
@@ -234,8 +221,8 @@ def render(base_dir, data_dir):
     st.markdown('<div class="mck-section-title">🚀 개선의 순환: 객단가 증대를 위한 인센티브 최적화 전략</div>', unsafe_allow_html=True)
     st.markdown("#### \"바우처는 신규 획득보다 기존 고객의 구매 규모(AOV)를 확대하는 도구로 유효함\"")
 
-    voucher_df = df[df['payment_type'] == 'voucher'].copy()
-    non_voucher_df = df[df['payment_type'] != 'voucher'].copy()
+    voucher_df = df[df['uses_voucher']]
+    non_voucher_df = df[~df['uses_voucher']]
     
     if not voucher_df.empty:
         col_v1, col_v2 = st.columns([3, 2])
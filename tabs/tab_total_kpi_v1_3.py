@@ -4,67 +4,72 @@ import plotly.express as px
 import plotly.graph_objects as go
 import os
 
+from core.binning import histogram_bins
+from core.cache_keys import dependency_signature
+from core.facts import STAR_SOURCE_FILES, get_table
+from core.hll import DistinctCounter
+from core.metrics import compute_metrics
+from core.olap import (
+    DailyPrefixSums, build_daily_cube, build_delivery_histogram, comparison_window, mean_delivery_days, rollup, slice_days,
+)
+
+
+# ====== 탭에서 사용하는 컬럼 ======
+KPI_COLUMNS = {
+    "fact_orders": ['order_id', 'order_status', 'order_purchase_timestamp', 'payment_value', 'delivery_days', 'customer_state',
+                    'customer_unique_id'],
+    "fact_items": ['order_id', 'seller_id', 'category_eng', 'customer_state', 'order_status', 'order_purchase_timestamp',
+                   'price', 'freight_value'],
+}
+
 
-@st.cache_data
 def load_data(data_dir):
-    """data_commerce 폴더에서 원시 데이터를 로드하고 병합합니다."""
-    orders = pd.read_csv(os.path.join(data_dir, "olist_orders_dataset.csv"))
-    items = pd.read_csv(os.path.join(data_dir, "olist_order_items_dataset.csv"))
-    payments = pd.read_csv(os.path.join(data_dir, "olist_order_payments_dataset.csv"))
-    reviews = pd.read_csv(os.path.join(data_dir, "olist_order_reviews_dataset.csv"))
-    products = pd.read_csv(os.path.join(data_dir, "olist_products_dataset.csv"))
-    customers = pd.read_csv(os.path.join(data_dir, "olist_customers_dataset.csv"))
+    """공유 팩트 모델에서 배송 완료된 주문/상품 팩트를 가져옵니다."""
+    orders = get_table(data_dir, "fact_orders", KPI_COLUMNS["fact_orders"])
+    items = get_table(data_dir, "fact_items", KPI_COLUMNS["fact_items"])
 
-    # 번역 파일 탐색 (여러 위치 시도)
-    trans_path = None
-    candidates = [
-        os.path.join(data_dir, "product_category_name_translation.csv"),
-        os.path.join(os.path.dirname(data_dir), "draft", "seller", "product_category_name_translation.csv"),
-    ]
-    for p in candidates:
-        if os.path.exists(p):
-            trans_path = p
-            break
+    # 완료된 주문만
+    orders = orders[orders['order_status'] == 'delivered']
+    items = items[items['order_status'] == 'delivered']
+    return orders, items
 
-    if trans_path:
-        category_trans = pd.read_csv(trans_path)
-    else:
-        category_trans = pd.DataFrame(columns=['product_category_name', 'product_category_name_english'])
 
-    # 날짜 컬럼 변환
-    date_cols = [
-        'order_purchase_timestamp', 'order_approved_at',
-        'order_delivered_carrier_date', 'order_delivered_customer_date',
-        'order_estimated_delivery_date'
-    ]
-    for col in date_cols:
-        if col in orders.columns:
-            orders[col] = pd.to_datetime(orders[col], errors='coerce')
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_cube(data_dir, source_signature):
+    orders, items = load_data(data_dir)
+    cube = build_daily_cube(orders, items)
+    return {
+        "cube": cube,
+        "delivery_hist": build_delivery_histogram(orders),
+        "prefix": DailyPrefixSums(cube),
+        # 고유 개수(주문/고객/셀러)는 일별로 합산할 수 없으므로, 짧은 구간은 정확히 세고 긴 구간은 일별 HyperLogLog 스케치로 추정
+        "order_distinct": DistinctCounter(orders, ['order_id', 'customer_unique_id']),
+        "seller_distinct": DistinctCounter(items, ['seller_id']),
+    }
 
-    # 데이터 병합
-    df = orders.merge(items, on='order_id', how='left')
-    df = df.merge(payments, on=['order_id'], how='left')
-    df = df.merge(customers, on='customer_id', how='left')
-    df = df.merge(products, on='product_id', how='left')
-    df = df.merge(category_trans, on='product_category_name', how='left')
 
-    df['category'] = df['product_category_name_english'].fillna(df['product_category_name'])
+def load_cube(data_dir):
+    """KPI 카드용 일별 큐브, 배송 일수 분포, 일별 누적합, 기간별 고유 주문/고객/셀러 수 (스타 스키마가 바뀔 때만 다시 집계)."""
+    return _load_cube(data_dir, dependency_signature(data_dir, STAR_SOURCE_FILES))
 
-    # 배송 시간 계산
-    df['delivery_time'] = (df['order_delivered_customer_date'] - df['order_purchase_timestamp']).dt.days
-    df['estimated_delivery_time'] = (df['order_estimated_delivery_date'] - df['order_purchase_timestamp']).dt.days
 
-    # 완료된 주문만
-    df = df[df['order_status'] == 'delivered'].copy()
+def _full_period_metrics(data_dir):
+    cube = load_cube(data_dir)["cube"]
+    return compute_metrics(data_dir, cube['day'].iloc[0].date(), cube['day'].iloc[-1].date())
+
 
-    return df
+def warmup_tasks(base_dir, data_dir):
+    """서버 워밍업 단계에서 미리 실행할 로더."""
+    return {"load_cube": (load_cube, data_dir), "metrics": (_full_period_metrics, data_dir)}
 
 
 def render(base_dir, data_dir):
     """전체 KPI 탭 렌더링 - 통합 경영 대시보드 (Cross-Domain)"""
 
     try:
-        df = load_data(data_dir)
+        kpi_data = load_cube(data_dir)
+        cube, delivery_hist, prefix = kpi_data["cube"], kpi_data["delivery_hist"], kpi_data["prefix"]
+        order_distinct, seller_distinct = kpi_data["order_distinct"], kpi_data["seller_distinct"]
     except Exception as e:
         st.error(f"데이터 로드 중 오류 발생: {e}")
         st.info("💡 `data_commerce/` 폴더에 Olist 데이터셋 CSV 파일들이 필요합니다.")
@@ -93,6 +98,11 @@ def render(base_dir, data_dir):
             color: #0b134a;
             margin-bottom: 2px;
         }
+        .kpi-delta-text {
+            font-size: 13px;
+            font-weight: 700;
+            margin-left: 8px;
+        }
         .kpi-desc-text {
             font-size: 12px;
             color: #8b8fb0;
@@ -230,11 +240,15 @@ def render(base_dir, data_dir):
         st.session_state["main_menu"] = page_name
         st.rerun()
 
-    def kpi_card_header(title, value, desc, tooltip):
+    def kpi_card_header(title, value, desc, tooltip, delta=None):
+        # delta: (표시 문자열, 좋아진 변화인지) - 비교 모드에서만 값 옆에 표시
+        delta_html = ""
+        if delta is not None:
+            delta_html = f'<span class="kpi-delta-text" style="color: {"#16a34a" if delta[1] else "#ef4444"};">{delta[0]}</span>'
         st.markdown(f'''
             <div class="kpi-card-container">
                 <div class="kpi-title-text">{title}</div>
-                <div class="kpi-val-text">{value}</div>
+                <div class="kpi-val-text">{value}{delta_html}</div>
                 <div class="kpi-desc-text">{desc}</div>
                 <span class="kpi-tooltip">
                     <strong style="color: #3b82f6; font-size: 22px; display: block; margin-bottom: 16px;">💡 핵심 통찰</strong>
@@ -244,49 +258,81 @@ def render(base_dir, data_dir):
         ''', unsafe_allow_html=True)
 
     # --- 상단 필터 ---
-    min_date = df['order_purchase_timestamp'].min().date()
-    max_date = df['order_purchase_timestamp'].max().date()
+    min_date = cube['day'].iloc[0].date()
+    max_date = cube['day'].iloc[-1].date()
     
     st.write("") # 간격 조절
     col_date, col_empty = st.columns([1, 2])
     with col_date:
         date_range = st.date_input("📅 분석 기간 설정", value=(min_date, max_date), key="kpi_master_date")
+    compare_modes = {"비교 안 함": None, "직전 기간 대비": "previous", "전년 동기 대비": "year"}
+    with col_empty:
+        compare_label = st.radio("📊 비교 기준", list(compare_modes), horizontal=True, key="kpi_compare_mode")
 
     if len(date_range) == 2:
         start_date, end_date = date_range
-        mask = (df['order_purchase_timestamp'].dt.date >= start_date) & (df['order_purchase_timestamp'].dt.date <= end_date)
-        df_filtered = df.loc[mask].copy()
     else:
-        df_filtered = df.copy()
+        start_date, end_date = min_date, max_date
+    # 모든 카드는 기간으로 자른 큐브 조각을 다시 합쳐서 계산
+    cube_f = slice_days(cube, start_date, end_date)
+    delivery_f = slice_days(delivery_hist, start_date, end_date)
+    metrics = compute_metrics(data_dir, start_date, end_date)
+
+    # 가산 측정값은 누적합 배열에서 기간 합계를 바로 읽으므로 비교 기간이 추가돼도 계산량이 거의 같음
+    current = prefix.window(start_date, end_date)
+    compare_mode = compare_modes[compare_label]
+    previous, prev_sellers = None, None
+    if compare_mode is not None:
+        prev_start, prev_end = comparison_window(start_date, end_date, compare_mode)
+        previous = prefix.window(prev_start, prev_end)
+        prev_sellers = seller_distinct.count('seller_id', prev_start, prev_end)
+
+    def pct_delta(cur, prev, up_is_good=True):
+        if prev is None or not prev:
+            return None
+        change = cur / prev - 1
+        return (f"{'▲' if change >= 0 else '▼'} {abs(change):.1%}", (change >= 0) == up_is_good)
+
+    def diff_delta(cur, prev, unit, up_is_good=True):
+        if prev is None or pd.isna(prev) or pd.isna(cur):
+            return None
+        change = cur - prev
+        return (f"{'▲' if change >= 0 else '▼'} {abs(change):.1f}{unit}", (change >= 0) == up_is_good)
+
+    def fmt(value, pattern, missing="-", scale=1):
+        return missing if value is None else pattern.format(value * scale)
 
     # --- 1. 경영 실적 및 상품 전략 (Core & Product) ---
     st.markdown('<div class="section-header">📉 여정의 불편: 병목 구간 진단 (경영 및 제품)</div>', unsafe_allow_html=True)
     r1_c1, r1_c2, r1_c3, r1_c4 = st.columns(4)
     with r1_c1:
         with st.container(border=True):
-            total_rev = df_filtered['payment_value'].sum()
-            kpi_card_header("💰 총 매출액 (GMV)", f"R$ {total_rev:,.0f}", "전체 거래 규모 트렌드", "2017년 11월 블랙프라이데이에 역대 최대 매출을 기록했습니다.")
+            total_rev = current['gmv']
+            kpi_card_header("💰 총 매출액 (GMV)", f"R$ {total_rev:,.0f}", "전체 거래 규모 트렌드", "2017년 11월 블랙프라이데이에 역대 최대 매출을 기록했습니다.",
+                            pct_delta(total_rev, previous and previous['gmv']))
             # 버튼 영역 (상세보기 추가 - 비활성화로 숨김 처리)
             with st.container():
                 st.button("상세보기 ➔", key="nav_gmv", type="secondary", disabled=True)
-            df_filtered['month'] = df_filtered['order_purchase_timestamp'].dt.to_period('M').astype(str)
-            m_s = df_filtered.groupby('month')['payment_value'].sum().reset_index()
-            fig1 = px.area(m_s, x='month', y='payment_value', template='plotly_white', height=160)
+            m_s = rollup(cube_f, cube_f['day'].dt.to_period('M').astype(str).rename('month'), ['gmv']).reset_index()
+            fig1 = px.area(m_s, x='month', y='gmv', template='plotly_white', height=160)
             fig1.update_traces(line_color='#0c29d0', fillcolor='rgba(12, 41, 208, 0.1)')
             fig1.update_layout(margin=dict(l=5, r=5, t=5, b=25), xaxis_title=None, yaxis_title=None, xaxis=dict(showgrid=False, showticklabels=False), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig1, use_container_width=True, config={'displayModeBar': False})
     with r1_c2:
         with st.container(border=True):
-            total_ord = df_filtered['order_id'].nunique()
-            kpi_card_header("📦 총 주문 건수", f"{total_ord:,}건", "요일별 주문 및 구매 패턴", "금요일 오후 2시~4시 사이에 주문이 가장 집중되는 경향이 있습니다.")
+            total_ord = int(current['order_count'])
+            # 주문은 하루에만 속하므로 큐브 합계가 정확하고, 고객은 여러 날에 걸치므로 고유 개수 스케치로 계산
+            total_cust = order_distinct.count('customer_unique_id', start_date, end_date)
+            cust_prefix = "≈ " if order_distinct.is_estimate(start_date, end_date) else ""
+            kpi_card_header("📦 총 주문 건수", f"{total_ord:,}건", f"고유 고객 {cust_prefix}{total_cust:,}명 · 요일별 주문 패턴", "금요일 오후 2시~4시 사이에 주문이 가장 집중되는 경향이 있습니다.",
+                            pct_delta(total_ord, previous and previous['order_count']))
             # 버튼 영역 (상세보기 추가 - 비활성화로 숨김 처리)
             with st.container():
                 st.button("상세보기 ➔", key="nav_ord", type="secondary", disabled=True)
             day_m = {'Monday': '월', 'Tuesday': '화', 'Wednesday': '수', 'Thursday': '목', 'Friday': '금', 'Saturday': '토', 'Sunday': '일'}
             day_o = ['월', '화', '수', '목', '금', '토', '일']
-            df_filtered['dow'] = df_filtered['order_purchase_timestamp'].dt.day_name().map(day_m)
-            d_c = df_filtered.groupby('dow')['order_id'].nunique().reindex(day_o).reset_index()
-            fig2 = px.bar(d_c, x='dow', y='order_id', template='plotly_white', height=160)
+            d_c = rollup(cube_f, cube_f['day'].dt.day_name().map(day_m).rename('dow'), ['order_count']).reindex(day_o).reset_index()
+            fig2 = px.bar(d_c, x='dow', y='order_count', template='plotly_white', height=160)
             fig2.update_traces(marker_color='#0c29d0')
             fig2.update_layout(margin=dict(l=10, r=10, t=5, b=30), xaxis_title=None, yaxis_title=None, xaxis=dict(showgrid=False, showticklabels=True, tickfont=dict(size=12, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig2, use_container_width=True, config={'displayModeBar': False})
@@ -296,21 +342,19 @@ def render(base_dir, data_dir):
             # 버튼 영역 (Wrapper 제거, 순수 버튼만 랜더링)
             with st.container():
                 if st.button("상세보기 ➔", key="nav_price", type="secondary"): nav_to("💳 구매 전환 (Decision)")
-            price_bins = [0, 50, 100, 200, 500, 1000, 5000]
-            price_labels = ['0-50', '50-100', '100-200', '200-500', '500-1k', '1k+']
-            df_filtered['p_bin'] = pd.cut(df_filtered['price'], bins=price_bins, labels=price_labels)
-            p_rev = df_filtered.groupby('p_bin', observed=False)['payment_value'].sum().reset_index()
-            fig3 = px.bar(p_rev, x='p_bin', y='payment_value', template='plotly_white', height=160)
+            p_rev = cube_f.groupby('price_bin', observed=False)['item_payment_value'].sum().reset_index()
+            fig3 = px.bar(p_rev, x='price_bin', y='item_payment_value', template='plotly_white', height=160)
             fig3.update_traces(marker_color='#50557c')
             fig3.update_layout(margin=dict(l=10, r=10, t=5, b=35), xaxis_title=None, yaxis_title=None, xaxis=dict(showgrid=False, showticklabels=True, tickfont=dict(size=11, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig3, use_container_width=True, config={'displayModeBar': False})
     with r1_c4:
         with st.container(border=True):
-            kpi_card_header("🚀 블랙 프라이데이", "11.4배 성장", "시즌 매출 폭발적 매출 증대", "BF 당일 1시간 매출이 평소 하루 매출보다 많아 전용 인프라가 필수적입니다.")
+            bf_lift = metrics["black_friday_lift"]["lift"]
+            kpi_card_header("🚀 블랙 프라이데이", fmt(bf_lift, "{:.1f}배 성장", "기간 외"), "시즌 매출 폭발적 매출 증대", "BF 당일 1시간 매출이 평소 하루 매출보다 많아 전용 인프라가 필수적입니다.")
             # 버튼 영역
             with st.container():
                 if st.button("상세보기 ➔", key="nav_bf", type="secondary"): nav_to("💳 구매 전환 (Decision)")
-            bf_data = pd.DataFrame({'구분': ['평시', 'BF'], '매출': [1, 11.4]})
+            bf_data = pd.DataFrame({'구분': ['평시', 'BF'], '매출': [1, bf_lift or 0]})
             fig4 = px.bar(bf_data, x='구분', y='매출', text_auto='.1f', template='plotly_white', height=160)
             fig4.update_traces(marker_color=['#d1d1e3', '#0c29d0'])
             fig4.update_layout(margin=dict(l=10, r=10, t=5, b=30), xaxis_title=None, yaxis_title=None, xaxis=dict(showticklabels=True, tickfont=dict(size=12, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))
@@ -321,43 +365,50 @@ def render(base_dir, data_dir):
     r2_c1, r2_c2, r2_c3, r2_c4 = st.columns(4)
     with r2_c1:
         with st.container(border=True):
-            kpi_card_header("🔄 무료 배송 효과", "+5.3%p 상승", "저가 생필품 재구매율 증대", "무료 배송 제공 시 고객의 플랫폼 고착 효과(Retention)가 뚜렷하게 나타납니다.")
+            free_ship = metrics["free_shipping_repurchase"]
+            kpi_card_header("🔄 무료 배송 효과", fmt(free_ship["lift"], "{:+.1f}%p 차이", scale=100), "저가 생필품 재구매율 증대", "무료 배송 제공 시 고객의 플랫폼 고착 효과(Retention)가 뚜렷하게 나타납니다.")
             with st.container():
                 if st.button("상세보기 ➔", key="nav_free", type="secondary"): nav_to("🚚 물류 및 경험 (Fulfillment)")
-            re_data = pd.DataFrame({'배송비': ['높음', '무료'], '재구매율': [3.1, 8.4]})
+            re_data = pd.DataFrame({'배송비': ['높음', '무료'], '재구매율': [(free_ship["high"] or 0) * 100, (free_ship["free"] or 0) * 100]})
             fig5 = px.line(re_data, x='배송비', y='재구매율', markers=True, template='plotly_white', height=160)
             fig5.update_traces(line_color='#0c29d0', line_width=4)
             fig5.update_layout(margin=dict(l=20, r=20, t=5, b=30), xaxis_title=None, yaxis_title=None, xaxis=dict(showticklabels=True, tickfont=dict(size=12, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig5, use_container_width=True, config={'displayModeBar': False})
     with r2_c2:
         with st.container(border=True):
-            avg_d = df_filtered['delivery_time'].mean()
-            kpi_card_header("⏱️ 평균 배송 일수", f"{avg_d:.1f}일", "배송 지연 시 만족도 급감", "평균 배송 기간이 12일을 초과할 경우 불만족 리뷰 비율이 2.4배 증가합니다.")
+            avg_d = mean_delivery_days(current)
+            kpi_card_header("⏱️ 평균 배송 일수", f"{avg_d:.1f}일", "배송 지연 시 만족도 급감", "평균 배송 기간이 12일을 초과할 경우 불만족 리뷰 비율이 2.4배 증가합니다.",
+                            diff_delta(avg_d, previous and mean_delivery_days(previous), "일", up_is_good=False))
             with st.container():
                 if st.button("상세보기 ➔", key="nav_del", type="secondary"): nav_to("🚚 물류 및 경험 (Fulfillment)")
-            fig6 = px.histogram(df_filtered[df_filtered['delivery_time']>=0], x='delivery_time', nbins=30, template='plotly_white', height=160)
-            fig6.update_traces(marker_color='#50557c', opacity=0.8)
+            delivered_f = delivery_f[delivery_f['delivery_days']>=0]
+            delivery_bins = histogram_bins(delivered_f['delivery_days'], bins=30, weights=delivered_f['order_count'])
+            fig6 = px.bar(delivery_bins, x='bin_mid', y='count', template='plotly_white', height=160)
+            fig6.update_traces(marker_color='#50557c', opacity=0.8, width=delivery_bins['bin_end'] - delivery_bins['bin_start'])
             fig6.update_layout(margin=dict(l=10, r=10, t=5, b=30), xaxis_title=None, yaxis_title=None, xaxis=dict(showgrid=False, showticklabels=True, tickfont=dict(size=12, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig6, use_container_width=True, config={'displayModeBar': False})
     with r2_c3:
         with st.container(border=True):
-            total_sellers = df_filtered['seller_id'].nunique()
-            kpi_card_header("🏪 활성 셀러 수", f"{total_sellers:,}개", "매출 발생 중인 파트너사", "전체 셀러의 약 15%가 플랫폼 거래액의 대부분을 발생시키고 있습니다.")
+            total_sellers = seller_distinct.count('seller_id', start_date, end_date)
+            seller_prefix = "≈ " if seller_distinct.is_estimate(start_date, end_date) else ""
+            kpi_card_header("🏪 활성 셀러 수", f"{seller_prefix}{total_sellers:,}개", "매출 발생 중인 파트너사", "전체 셀러의 약 15%가 플랫폼 거래액의 대부분을 발생시키고 있습니다.",
+                            pct_delta(total_sellers, prev_sellers))
             with st.container():
                 if st.button("상세보기 ➔", key="nav_sel", type="secondary"): nav_to("🏢 파트너십 가치 (Partnership)")
-            s_rev = df_filtered.groupby('seller_id')['payment_value'].sum().sort_values(ascending=False).reset_index()
-            s_rev['cumulative_rev'] = s_rev['payment_value'].cumsum() / s_rev['payment_value'].sum() * 100
+            s_rev = rollup(cube_f, 'seller_id', ['item_payment_value'])['item_payment_value'].sort_values(ascending=False).reset_index()
+            s_rev['cumulative_rev'] = s_rev['item_payment_value'].cumsum() / s_rev['item_payment_value'].sum() * 100
             fig_s1 = px.line(s_rev.head(100), y='cumulative_rev', template='plotly_white', height=160)
             fig_s1.update_traces(line_color='#0c29d0', fill='tozeroy', fillcolor='rgba(12, 41, 208, 0.1)')
             fig_s1.update_layout(margin=dict(l=10, r=10, t=5, b=25), xaxis_title=None, yaxis_title=None, xaxis=dict(showgrid=False, showticklabels=False), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig_s1, use_container_width=True, config={'displayModeBar': False})
     with r2_c4:
         with st.container(border=True):
-            kpi_card_header("📊 셀러 집중도", "Top 10%가 72%", "상위 셀러 매출 견인 구조", "핵심 셀러(Tier 1)의 이탈은 플랫폼 매출에 직접적인 리스크를 초래합니다.")
+            conc = metrics["seller_concentration"]
+            kpi_card_header("📊 셀러 집중도", fmt(conc["top_share"], "Top 10%가 {:.0f}%", scale=100), "상위 셀러 매출 견인 구조", "핵심 셀러(Tier 1)의 이탈은 플랫폼 매출에 직접적인 리스크를 초래합니다.")
             with st.container():
                 if st.button("상세보기 ➔", key="nav_conc", type="secondary"): nav_to("🏢 파트너십 가치 (Partnership)")
-            tier_data = pd.DataFrame({'등급': ['T1', 'T2', 'T3'], '비중': [72, 20, 8]})
-            fig_s2 = px.bar(tier_data, x='등급', y='비중', text_auto=True, template='plotly_white', height=160)
+            tier_data = pd.DataFrame({'등급': ['T1', 'T2', 'T3'], '비중': conc["tiers"] or [0, 0, 0]})
+            fig_s2 = px.bar(tier_data, x='등급', y='비중', text_auto='.0f', template='plotly_white', height=160)
             fig_s2.update_traces(marker_color=['#0c29d0', '#50557c', '#d1d1e3'])
             fig_s2.update_layout(margin=dict(l=10, r=10, t=5, b=30), xaxis_title=None, yaxis_title=None, xaxis=dict(showticklabels=True, tickfont=dict(size=12, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig_s2, use_container_width=True, config={'displayModeBar': False})
@@ -367,39 +418,44 @@ def render(base_dir, data_dir):
     r3_c1, r3_c2, r3_c3, r3_c4 = st.columns(4)
     with r3_c1:
         with st.container(border=True):
-            kpi_card_header("💎 VIP 매출 기여도", "35% 차지", "상위 10% 고객사 기여 비중", "VIP 고객군을 위한 전용 멤버십이나 배송 혜택 강화가 매출 성장의 핵심입니다.")
+            vip = metrics["vip_share"]["share"]
+            kpi_card_header("💎 VIP 매출 기여도", fmt(vip, "{:.0f}% 차지", scale=100), "상위 10% 고객사 기여 비중", "VIP 고객군을 위한 전용 멤버십이나 배송 혜택 강화가 매출 성장의 핵심입니다.")
             with st.container():
                 if st.button("상세보기 ➔", key="nav_vip", type="secondary"): nav_to("💎 로열티 및 개선 (Loyalty)")
-            seg_data = pd.DataFrame({'그룹': ['기타', 'VIP'], '비중': [65, 35]})
+            seg_data = pd.DataFrame({'그룹': ['기타', 'VIP'], '비중': [100 - (vip or 0) * 100, (vip or 0) * 100]})
             fig7 = px.pie(seg_data, values='비중', names='그룹', hole=0.6, color_discrete_sequence=['#e6eeff', '#0c29d0'], height=160)
             fig7.update_layout(margin=dict(l=0, r=0, t=0, b=0), showlegend=False)
             st.plotly_chart(fig7, use_container_width=True, config={'displayModeBar': False})
     with r3_c2:
         with st.container(border=True):
-            kpi_card_header("🎟️ 바우처 효과", "12% 증가", "바우처 사용 시 객단가 상승", "바우처는 신규 유입보다는 기존 고객의 객단가(AOV)를 높이는 데 더 효과적입니다.")
+            voucher = metrics["voucher_aov"]
+            kpi_card_header("🎟️ 바우처 효과", fmt(voucher["lift"], "{:+.0f}% 차이", scale=100), "바우처 사용 시 객단가 상승", "바우처는 신규 유입보다는 기존 고객의 객단가(AOV)를 높이는 데 더 효과적입니다.")
             with st.container():
                 if st.button("상세보기 ➔", key="nav_vouch", type="secondary"): nav_to("💎 로열티 및 개선 (Loyalty)")
-            v_data = pd.DataFrame({'구분': ['일반', '바우처'], '객단가': [100, 112]})
+            v_data = pd.DataFrame({'구분': ['일반', '바우처'], '객단가': [voucher["regular"] or 0, voucher["voucher"] or 0]})
             fig8 = px.bar(v_data, x='구분', y='객단가', template='plotly_white', height=160)
             fig8.update_traces(marker_color=['#d1d1e3', '#0c29d0'])
             fig8.update_layout(margin=dict(l=10, r=10, t=5, b=30), xaxis_title=None, yaxis_title=None, xaxis=dict(showticklabels=True, tickfont=dict(size=12, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig8, use_container_width=True, config={'displayModeBar': False})
     with r3_c3:
         with st.container(border=True):
-            kpi_card_header("📉 지연 만족도 하락", "1.5점 급감", "2일 이상 지연 시 리뷰 하락", "배송 예정 기한보다 2일 이상 늦어지면 고객의 이탈 의향이 급격히 높아집니다.")
+            delay = metrics["delay_review_drop"]
+            kpi_card_header("📉 지연 만족도 하락", fmt(delay["drop"], "{:.1f}점 차이"), "2일 이상 지연 시 리뷰 하락", "배송 예정 기한보다 2일 이상 늦어지면 고객의 이탈 의향이 급격히 높아집니다.")
             with st.container():
                 if st.button("상세보기 ➔", key="nav_sat", type="secondary"): nav_to("🚚 물류 및 경험 (Fulfillment)")
-            delay_data = pd.DataFrame({'지연': ['정시', '지연'], '점수': [4.8, 3.3]})
+            delay_data = pd.DataFrame({'지연': ['정시', '지연'], '점수': [delay["on_time"] or 0, delay["delayed"] or 0]})
             fig9 = px.bar(delay_data, x='지연', y='점수', template='plotly_white', height=160)
             fig9.update_traces(marker_color=['#0c29d0', '#ef4444'])
             fig9.update_layout(margin=dict(l=10, r=10, t=5, b=30), xaxis_title=None, yaxis_title=None, xaxis=dict(showticklabels=True, tickfont=dict(size=12, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))
             st.plotly_chart(fig9, use_container_width=True, config={'displayModeBar': False})
     with r3_c4:
         with st.container(border=True):
-            kpi_card_header("🗺️ 지역별 배송 격차", "최대 8.5일", "북동부 vs 남동부 성능 차이", "북동부(AM) 지역의 높은 물류 비용과 배송 기간은 플랫폼 확장의 장애물입니다.")
+            geo = metrics["state_delivery_gap"]
+            kpi_card_header("🗺️ 지역별 배송 격차", fmt(geo["gap"], "최대 {:.1f}일"), "평균 배송 최장 주 vs 최단 주", "북동부(AM) 지역의 높은 물류 비용과 배송 기간은 플랫폼 확장의 장애물입니다.")
             with st.container():
                 if st.button("상세보기 ➔", key="nav_geo", type="secondary"): nav_to("🚚 물류 및 경험 (Fulfillment)")
-            geo_diff = pd.DataFrame({'지역': ['SP(남동)', 'AM(북부)'], '일수': [10.2, 18.7]})
+            fast, slow = geo["fastest"] or ("-", 0), geo["slowest"] or ("-", 0)
+            geo_diff = pd.DataFrame({'지역': [f"{fast[0]}(최단)", f"{slow[0]}(최장)"], '일수': [fast[1], slow[1]]})
             fig10 = px.bar(geo_diff, x='지역', y='일수', template='plotly_white', height=160)
             fig10.update_traces(marker_color=['#0c29d0', '#50557c'])
             fig10.update_layout(margin=dict(l=10, r=10, t=5, b=35), xaxis_title=None, yaxis_title=None, xaxis=dict(showticklabels=True, tickfont=dict(size=11, color='#50557c')), yaxis=dict(showgrid=False, showticklabels=False))